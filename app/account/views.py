@@ -141,12 +141,7 @@ class ProfileEditView(LoginRequiredMixin, UpdateView):
         ctx["is_owner"] = prof.is_owner
         ctx["is_guest"] = prof.is_guest
 
-        # Sugerencias de ciudades en <datalist> (si tienes Commune)
-        try:
-            from app.places.models import Commune
-            ctx["cities"] = list(Commune.objects.order_by("name").values_list("name", flat=True)[:300])
-        except Exception:
-            ctx["cities"] = []
+        # Sugerencias de ciudades en <datalist>: se cargan desde commune_catalog_url
         return ctx
 
     def form_valid(self, form):
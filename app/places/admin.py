@@ -1,6 +1,6 @@
 # app/core/admin.py
 from django.contrib import admin
-from .models import Commune, Tag, Venue, Event, Photo
+from .models import Commune, Tag, Venue, Event, Photo, Promo
 
 # --- Inlines ---
 class PhotoInline(admin.TabularInline):
@@ -45,4 +45,14 @@ class EventAdmin(admin.ModelAdmin):
     list_editable = ("is_featured", "is_published")
     readonly_fields = ("clicks_count", "last_clicked_at")
     date_hierarchy = "start_at"
-    ordering = ("-clicks_count", "-start_at")
\ No newline at end of file
+    ordering = ("-clicks_count", "-start_at")
+
+
+# --- Promo ---
+@admin.register(Promo)
+class PromoAdmin(admin.ModelAdmin):
+    list_display = ("text", "venue", "Commune", "valid_from", "valid_until", "weekdays", "sort_order", "legacy_slot")
+    list_filter = ("Commune",)
+    search_fields = ("text", "venue__name")
+    raw_id_fields = ("venue",)
+    ordering = ("venue", "sort_order")
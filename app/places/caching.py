@@ -0,0 +1,108 @@
+# app/places/caching.py
+"""
+Helpers de caché para las vistas de places.
+
+- Versión por comuna: los signals de Venue/Event/Commune la cambian y cada
+  payload cacheado guarda la versión con la que se construyó, así cualquier
+  cambio en la comuna invalida sus payloads sin tener que conocer las claves.
+- Versión por catálogo: lo mismo para estructuras que dependen de una tabla
+  completa (ej. el índice de n-gramas de comunas) y que cada worker arma en
+  memoria.
+- Los signals cambian versiones con bump_on_commit: recién después del
+  commit, para que ningún worker reconstruya con datos que todavía pueden
+  revertirse y los selle con la versión nueva.
+- get_or_build: lectura con protección anti-estampida. Cuando la copia está
+  vencida, un solo worker la reconstruye (lock con cache.add) y el resto sigue
+  sirviendo la copia anterior mientras tanto.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+COMMUNE_VERSION_KEY = "communever:{commune_id}"
+CATALOG_VERSION_KEY = "catalogver:{name}"
+
+# Segundos que un worker puede tener tomado el lock de reconstrucción
+REBUILD_LOCK_TIMEOUT = 30
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _version(key) -> int:
+    version = cache.get(key)
+    if version is None:
+        # Si la clave se perdió (reinicio/evicción) partimos con un sello nuevo:
+        # nunca coincide con un payload anterior.
+        cache.add(key, _now_ms(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def commune_version(commune_id) -> int:
+    """Versión vigente de los datos cacheados de una comuna."""
+    return _version(COMMUNE_VERSION_KEY.format(commune_id=commune_id))
+
+
+def bump_commune_version(commune_id):
+    """Invalida todos los payloads cacheados de la comuna."""
+    if not commune_id:
+        return
+    cache.set(COMMUNE_VERSION_KEY.format(commune_id=commune_id), _now_ms(), timeout=None)
+
+
+def catalog_version(name) -> int:
+    """Versión de un catálogo completo (ej. "communes", "venue_names")."""
+    return _version(CATALOG_VERSION_KEY.format(name=name))
+
+
+def bump_catalog_version(name):
+    cache.set(CATALOG_VERSION_KEY.format(name=name), _now_ms(), timeout=None)
+
+
+def bump_on_commit(commune_ids=(), catalogs=()):
+    """Cambia versiones de comunas y catálogos al confirmar la transacción en curso."""
+    commune_ids = {c for c in commune_ids if c}
+    catalogs = tuple(catalogs)
+
+    def _bump():
+        for commune_id in commune_ids:
+            bump_commune_version(commune_id)
+        for name in catalogs:
+            bump_catalog_version(name)
+
+    transaction.on_commit(_bump)
+
+
+def get_or_build(key, version, builder, fresh_for=60, keep_for=60 * 60):
+    """
+    Devuelve el payload guardado en `key` si es de la `version` pedida y sigue
+    fresco; si no, lo reconstruye con `builder()`.
+
+    - fresh_for: segundos que el payload se sirve sin reconstruir.
+    - keep_for: segundos que la copia vencida se conserva para servirla
+      mientras otro worker reconstruye.
+    """
+    entry = cache.get(key)
+    if entry and entry["version"] == version and entry["fresh_until"] > time.time():
+        return entry["data"]
+
+    lock_key = f"{key}:lock"
+    locked = cache.add(lock_key, 1, timeout=REBUILD_LOCK_TIMEOUT)
+    if not locked and entry is not None:
+        # Otro worker está reconstruyendo: servimos la copia que tenemos
+        return entry["data"]
+
+    try:
+        data = builder()
+        cache.set(
+            key,
+            {"version": version, "fresh_until": time.time() + fresh_for, "data": data},
+            timeout=keep_for,
+        )
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return data
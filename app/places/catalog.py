@@ -0,0 +1,101 @@
+# app/places/catalog.py
+"""
+Catálogo de comunas como JSON inmutable + autocompletado en servidor.
+
+- commune_catalog_url(): `/comunas/catalogo.<hash>.json`, servido por la
+  vista `commune_catalog_json` en el mismo origen que las páginas (un fetch
+  al CDN sería cross-origin y el bucket no tiene CORS). El nombre lleva el
+  hash del contenido, así que la respuesta se cachea un año con `immutable`;
+  cuando cambia una Commune (signals -> catalog_version("communes")) cambia
+  el hash. Las páginas solo referencian la URL en vez de incrustar ~200 nombres.
+- autocomplete_communes(): búsqueda por prefijo sin tildes sobre un trie en
+  memoria, derivado del snapshot de refdata (uno por worker y versión).
+"""
+import hashlib
+import json
+
+from django.urls import reverse
+
+from .refdata import communes, normalize
+
+# La URL cambia con el contenido: el navegador y el CDN la guardan un año
+CATALOG_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _build_catalog(snapshot):
+    rows = [{"id": c.pk, "name": c.name, "slug": c.slug} for c in snapshot.rows]
+    payload = json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode()
+    return hashlib.sha256(payload).hexdigest()[:12], payload
+
+
+def commune_catalog():
+    """(hash, bytes JSON) del catálogo vigente; uno por worker y versión de refdata."""
+    return communes.get().derived("catalog", _build_catalog)
+
+
+def commune_catalog_url():
+    """URL (content-hashed, mismo origen) del catálogo vigente."""
+    return reverse("commune_catalog", kwargs={"digest": commune_catalog()[0]})
+
+
+# -------------------------
+# Autocompletado (trie)
+# -------------------------
+class CommuneTrie:
+    """
+    Trie de nombres sin tildes. Cada comuna se indexa por su nombre completo
+    (rank 0) y por cada palabra siguiente (rank 1), así "serena" encuentra
+    "La Serena" pero "la s" la prioriza.
+    """
+
+    def __init__(self, rows):
+        self._root = {}
+        for row in rows:
+            folded = normalize(row["name"])
+            words = folded.split()
+            for i in range(len(words)):
+                self._insert(" ".join(words[i:]), (0 if i == 0 else 1, row["name"], row["slug"]))
+
+    def _insert(self, key, entry):
+        node = self._root
+        for ch in key:
+            node = node.setdefault(ch, {})
+        node.setdefault(None, []).append(entry)
+
+    def search(self, prefix, limit=10):
+        node = self._root
+        for ch in normalize(prefix):
+            node = node.get(ch)
+            if node is None:
+                return []
+
+        found = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            for key, child in current.items():
+                if key is None:
+                    found.extend(child)
+                else:
+                    stack.append(child)
+
+        results, seen = [], set()
+        for _rank, name, slug in sorted(found):
+            if slug in seen:
+                continue
+            seen.add(slug)
+            results.append({"name": name, "slug": slug})
+            if len(results) == limit:
+                break
+        return results
+
+
+def _build_trie(snapshot):
+    return CommuneTrie({"name": c.name, "slug": c.slug} for c in snapshot.rows)
+
+
+def autocomplete_communes(prefix, limit=10):
+    prefix = (prefix or "").strip()
+    if not prefix:
+        return []
+    return communes.get().derived("trie", _build_trie).search(prefix, limit=limit)
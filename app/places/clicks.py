@@ -0,0 +1,275 @@
+# app/places/clicks.py
+"""
+Write-behind de contadores de clicks y series de tiempo para insights.
+
+track_click inserta una fila en PendingClick y flush_pending_clicks() las
+agrega por (kind, object_id) y aplica el total a clicks_count/last_clicked_at
+con un solo UPDATE por modelo; en la misma pasada suma los clicks a
+ClickHourly. Aplicar y borrar el lote ocurre en la misma transacción: si el
+proceso muere a mitad de camino no se aplica nada y el lote sigue pendiente
+para el siguiente flush (no hay dobles conteos).
+
+rollup_clicks() recalcula ClickRollup (día/semana) desde ClickHourly y
+prune_hourly() borra las horas que ya quedaron fuera de la retención.
+"""
+from bisect import bisect_left
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from zoneinfo import ZoneInfo
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Max, Sum
+from django.db.models.functions import Coalesce, Greatest, TruncDate, TruncHour
+from django.utils import timezone
+
+from .models import ClickHourly, ClickRollup, Event, PendingClick, Venue
+
+LOCAL_TZ = ZoneInfo("America/Santiago")
+
+# Días de ClickHourly que se conservan (los rollups diarios se recalculan
+# dentro de esta ventana, nunca fuera de ella).
+HOURLY_RETENTION_DAYS = 35
+
+CLICK_MODELS = {
+    "venue": Venue,
+    "event": Event,
+}
+
+
+def record_click(kind: str, object_id: int):
+    """Camino del request: un INSERT append-only, sin tocar la fila del venue/evento."""
+    PendingClick.objects.create(kind=kind, object_id=object_id)
+
+
+def _apply_totals_postgres(model, totals):
+    """UPDATE ... FROM (VALUES ...) con todos los totales del modelo."""
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    values_sql = ", ".join(["(%s, %s, %s::timestamptz)"] * len(totals))
+    params = []
+    for object_id, n, last in totals:
+        params.extend([object_id, n, last])
+
+    sql = (
+        f"UPDATE {table} AS t "
+        f"SET {qn('clicks_count')} = t.{qn('clicks_count')} + v.n, "
+        f"{qn('last_clicked_at')} = GREATEST(COALESCE(t.{qn('last_clicked_at')}, v.last), v.last) "
+        f"FROM (VALUES {values_sql}) AS v(id, n, last) "
+        f"WHERE t.{qn('id')} = v.id"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _apply_totals_generic(model, totals):
+    for object_id, n, last in totals:
+        model.objects.filter(pk=object_id).update(
+            clicks_count=F("clicks_count") + n,
+            last_clicked_at=Greatest(Coalesce("last_clicked_at", last), last),
+        )
+
+
+def _upsert_hourly(hourly):
+    """Suma los clicks a ClickHourly (INSERT ... ON CONFLICT, PostgreSQL y SQLite)."""
+    qn = connection.ops.quote_name
+    table = qn(ClickHourly._meta.db_table)
+    values_sql = ", ".join(["(%s, %s, %s, %s)"] * len(hourly))
+    params = []
+    for (kind, object_id, hour), n in hourly.items():
+        params.extend([kind, object_id, connection.ops.adapt_datetimefield_value(hour), n])
+
+    sql = (
+        f"INSERT INTO {table} ({qn('kind')}, {qn('object_id')}, {qn('hour')}, {qn('count')}) "
+        f"VALUES {values_sql} "
+        f"ON CONFLICT ({qn('kind')}, {qn('object_id')}, {qn('hour')}) "
+        f"DO UPDATE SET {qn('count')} = {table}.{qn('count')} + excluded.{qn('count')}"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def flush_pending_clicks(batch_size=5000) -> int:
+    """
+    Aplica hasta `batch_size` clicks pendientes. Devuelve cuántos se procesaron.
+    Se puede correr en paralelo: en PostgreSQL cada flusher toma filas distintas
+    (FOR UPDATE SKIP LOCKED).
+    """
+    with transaction.atomic():
+        pending = PendingClick.objects.order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            pending = pending.select_for_update(skip_locked=True)
+        ids = list(pending.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return 0
+
+        rows = (
+            PendingClick.objects
+            .filter(id__in=ids)
+            .values("kind", "object_id", hour=TruncHour("clicked_at", tzinfo=dt_timezone.utc))
+            .annotate(n=Count("id"), last=Max("clicked_at"))
+            .order_by()
+        )
+
+        # (kind, object_id) -> [total, último click]; (kind, object_id, hora) -> total
+        totals = {}
+        hourly = {}
+        for r in rows:
+            key = (r["kind"], r["object_id"])
+            acc = totals.setdefault(key, [0, r["last"]])
+            acc[0] += r["n"]
+            acc[1] = max(acc[1], r["last"])
+            hourly[(r["kind"], r["object_id"], r["hour"])] = r["n"]
+
+        totals_by_kind = {}
+        for (kind, object_id), (n, last) in totals.items():
+            totals_by_kind.setdefault(kind, []).append((object_id, n, last))
+
+        apply = _apply_totals_postgres if connection.vendor == "postgresql" else _apply_totals_generic
+        for kind, kind_totals in totals_by_kind.items():
+            model = CLICK_MODELS.get(kind)
+            if model is not None:
+                apply(model, kind_totals)
+        _upsert_hourly(hourly)
+
+        PendingClick.objects.filter(id__in=ids).delete()
+    return len(ids)
+
+
+# =============================
+# --- Rollups ---
+# =============================
+def _commune_ids(kind, object_ids):
+    model = CLICK_MODELS[kind]
+    return dict(model.objects.filter(pk__in=object_ids).values_list("pk", "Commune_id"))
+
+
+def rollup_clicks(days=2, today=None) -> int:
+    """
+    Recalcula los rollups diarios de los últimos `days` días locales (incluido
+    hoy) y los semanales de las semanas que los contienen. Es idempotente: los
+    totales se reemplazan, no se suman.
+    """
+    # Las semanas se recalculan completas (desde el lunes), así que dejamos
+    # margen para que el lunes siga dentro de la retención de ClickHourly
+    days = max(1, min(days, HOURLY_RETENTION_DAYS - 7))
+    today = today or timezone.localdate(timezone=LOCAL_TZ)
+    first_day = today - timedelta(days=days - 1)
+    first_monday = first_day - timedelta(days=first_day.weekday())
+    since = datetime.combine(first_monday, time.min, tzinfo=LOCAL_TZ)
+
+    daily = (
+        ClickHourly.objects
+        .filter(hour__gte=since)
+        .annotate(day=TruncDate("hour", tzinfo=LOCAL_TZ))
+        .filter(day__lte=today)
+        .values("kind", "object_id", "day")
+        .annotate(n=Sum("count"))
+        .order_by()
+    )
+
+    day_rows = {}
+    week_rows = {}
+    for r in daily:
+        key = (r["kind"], r["object_id"])
+        monday = r["day"] - timedelta(days=r["day"].weekday())
+        week_rows[key + (monday,)] = week_rows.get(key + (monday,), 0) + r["n"]
+        if r["day"] >= first_day:
+            day_rows[key + (r["day"],)] = r["n"]
+
+    communes = {}
+    for kind in CLICK_MODELS:
+        ids = {oid for (k, oid, _) in week_rows if k == kind}
+        if ids:
+            communes[kind] = _commune_ids(kind, ids)
+
+    objs = []
+    for period, source in ((ClickRollup.DAY, day_rows), (ClickRollup.WEEK, week_rows)):
+        for (kind, object_id, bucket), n in source.items():
+            commune_id = communes.get(kind, {}).get(object_id)
+            if commune_id is None:
+                continue  # objeto borrado
+            objs.append(ClickRollup(
+                kind=kind, object_id=object_id, commune_id=commune_id,
+                period=period, bucket=bucket, count=n,
+            ))
+
+    ClickRollup.objects.bulk_create(
+        objs,
+        batch_size=1000,
+        update_conflicts=True,
+        unique_fields=["kind", "object_id", "period", "bucket"],
+        update_fields=["count", "commune"],
+    )
+    return len(objs)
+
+
+def prune_hourly(retention_days=HOURLY_RETENTION_DAYS) -> int:
+    cutoff = timezone.now() - timedelta(days=retention_days)
+    deleted, _ = ClickHourly.objects.filter(hour__lt=cutoff).delete()
+    return deleted
+
+
+# =============================
+# --- Insights (solo rollups) ---
+# =============================
+def venue_insights(venue, days=30, weeks=12):
+    """
+    Serie diaria/semanal de clicks de un venue y su posición frente al resto
+    de los venues de la comuna, calculado solo desde ClickRollup.
+    """
+    today = timezone.localdate(timezone=LOCAL_TZ)
+    first_day = today - timedelta(days=days - 1)
+    this_monday = today - timedelta(days=today.weekday())
+    first_monday = this_monday - timedelta(weeks=weeks - 1)
+
+    own = dict(
+        ClickRollup.objects
+        .filter(kind="venue", object_id=venue.pk, period=ClickRollup.DAY,
+                bucket__gte=first_day, bucket__lte=today)
+        .values_list("bucket", "count")
+    )
+    own_weeks = dict(
+        ClickRollup.objects
+        .filter(kind="venue", object_id=venue.pk, period=ClickRollup.WEEK,
+                bucket__gte=first_monday, bucket__lte=this_monday)
+        .values_list("bucket", "count")
+    )
+
+    daily = []
+    for i in range(days):
+        d = first_day + timedelta(days=i)
+        daily.append({"date": d.isoformat(), "clicks": own.get(d, 0)})
+    weekly = []
+    for i in range(weeks):
+        w = first_monday + timedelta(weeks=i)
+        weekly.append({"week": w.isoformat(), "clicks": own_weeks.get(w, 0)})
+
+    # Totales de la ventana para todos los venues de la comuna (una query agrupada)
+    commune_totals = dict(
+        ClickRollup.objects
+        .filter(commune_id=venue.Commune_id, kind="venue", period=ClickRollup.DAY,
+                bucket__gte=first_day, bucket__lte=today)
+        .values("object_id")
+        .annotate(n=Sum("count"))
+        .order_by()
+        .values_list("object_id", "n")
+    )
+    venues_in_commune = Venue.objects.filter(Commune_id=venue.Commune_id).count()
+    # Los venues sin clicks en la ventana cuentan como 0
+    totals = sorted(commune_totals.values())
+    zeros = max(venues_in_commune - len(totals), 0)
+    mine = sum(r["clicks"] for r in daily)
+
+    below = zeros + bisect_left(totals, mine) if mine else 0
+    percentile = round(100 * below / venues_in_commune, 1) if venues_in_commune else None
+    commune_avg = round(sum(totals) / venues_in_commune, 2) if venues_in_commune else 0
+
+    return {
+        "venue": venue.slug,
+        "days": days,
+        "daily": daily,
+        "weekly": weekly,
+        "total": mine,
+        "commune_avg": commune_avg,
+        "vs_commune_avg": round(mine / commune_avg, 2) if commune_avg else None,
+        "percentile": percentile,
+    }
@@ -0,0 +1,7 @@
+# app/places/context_processors.py
+from .catalog import commune_catalog_url
+
+
+def commune_catalog(request):
+    # Se pasa la función: el template la evalúa solo si usa la variable
+    return {"commune_catalog_url": commune_catalog_url}
@@ -0,0 +1,47 @@
+# app/places/dates.py
+"""
+Fechas locales (America/Santiago) para filtros y calendario de eventos.
+
+Event.start_date_local guarda el día local de start_at, así los filtros
+"hoy", "mañana", "finde", etc. son rangos de fechas sobre un índice
+compuesto (Commune, is_published, start_date_local) en vez de armar
+rangos aware de start_at en cada request.
+"""
+from datetime import date, timedelta
+
+from django.utils import timezone
+
+
+def local_date(value):
+    """Día local (TIME_ZONE del proyecto) de un datetime aware."""
+    return timezone.localtime(value, timezone.get_default_timezone()).date()
+
+
+def today_local():
+    return local_date(timezone.now())
+
+
+def when_date_range(when, today=None):
+    """(desde, hasta) exclusivo en fechas locales, o None si `when` no es por días."""
+    today = today or today_local()
+    if when == "hoy":
+        return today, today + timedelta(days=1)
+    if when == "manana":
+        return today + timedelta(days=1), today + timedelta(days=2)
+    if when == "esta_semana":
+        monday = today - timedelta(days=today.weekday())
+        return monday, monday + timedelta(days=7)
+    if when == "proxima_semana":
+        monday = today + timedelta(days=(7 - today.weekday()) % 7 or 7)
+        return monday, monday + timedelta(days=7)
+    if when == "finde":
+        friday = today - timedelta(days=today.weekday()) + timedelta(days=4)
+        return friday, friday + timedelta(days=3)  # hasta lunes (exclusivo)
+    return None
+
+
+def month_range(year, month):
+    """(primer día del mes, primer día del mes siguiente)."""
+    first = date(year, month, 1)
+    nxt = date(year + (month == 12), month % 12 + 1, 1)
+    return first, nxt
@@ -0,0 +1,132 @@
+# app/places/fuzzy.py
+"""
+"¿Quisiste decir...?" para comunas y venues.
+
+- PostgreSQL: similitud por trigramas (pg_trgm) sobre índices GIN
+  gin_trgm_ops en Commune.name/slug y Venue.name; una sola query indexada
+  con el operador % y orden por similitud.
+- Otros motores (db.sqlite3 de desarrollo): índice invertido de trigramas en
+  memoria (NgramIndex) con la misma fórmula de similitud que pg_trgm,
+  derivado del snapshot de refdata y reconstruido cuando cambia su versión
+  (los signals la cambian al guardar/borrar Commune o Venue).
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.text import slugify
+
+from .models import Commune, Venue
+from .refdata import Registry, communes, normalize
+
+# Mismo umbral por defecto que pg_trgm.similarity_threshold
+SIMILARITY_THRESHOLD = 0.3
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def trigrams(value: str) -> set:
+    """Trigramas al estilo pg_trgm: por palabra, con 2 espacios antes y 1 después."""
+    grams = set()
+    for word in _WORD_RE.findall(normalize(value)):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """Índice invertido trigrama -> ids, para buscar el texto más parecido."""
+
+    def __init__(self, entries):
+        # entries: iterable de (id, [textos]); un id puede tener varios textos (nombre, slug)
+        self._grams = {}      # (id, i) -> set de trigramas
+        self._inverted = {}   # trigrama -> set de (id, i)
+        for obj_id, texts in entries:
+            for i, text in enumerate(texts):
+                grams = trigrams(text)
+                if not grams:
+                    continue
+                self._grams[(obj_id, i)] = grams
+                for g in grams:
+                    self._inverted.setdefault(g, set()).add((obj_id, i))
+
+    def best(self, value: str, threshold=SIMILARITY_THRESHOLD):
+        """(id, similitud) del texto más parecido sobre el umbral, o None."""
+        query = trigrams(value)
+        if not query:
+            return None
+
+        shared = {}
+        for g in query:
+            for key in self._inverted.get(g, ()):
+                shared[key] = shared.get(key, 0) + 1
+
+        best = None
+        for key, n in shared.items():
+            sim = n / (len(query) + len(self._grams[key]) - n)
+            if sim >= threshold and (best is None or sim > best[1]):
+                best = (key[0], sim)
+        return best
+
+
+# Nombres de venues: no son datos de referencia, pero el índice se arma igual
+venue_names = Registry("venue_names", lambda: Venue.objects.only("id", "name"))
+
+
+def _commune_ngrams(snapshot):
+    return NgramIndex((c.pk, [c.name, c.slug]) for c in snapshot.rows)
+
+
+def _venue_ngrams(snapshot):
+    return NgramIndex((v.pk, [v.name]) for v in snapshot.rows)
+
+
+def _trigram_enabled() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def closest_commune(raw: str):
+    """Comuna más parecida a `raw` (typos, sin tildes, prefijos) o None."""
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+
+    if _trigram_enabled():
+        from django.contrib.postgres.search import TrigramSimilarity
+        from django.db.models.functions import Greatest
+
+        slug_guess = slugify(raw)
+        return (
+            Commune.objects
+            .filter(Q(slug__trigram_similar=slug_guess) | Q(name__trigram_similar=raw))
+            .annotate(sim=Greatest(TrigramSimilarity("slug", slug_guess), TrigramSimilarity("name", raw)))
+            .order_by("-sim", "name")
+            .first()
+        )
+
+    snapshot = communes.get()
+    hit = snapshot.derived("ngrams", _commune_ngrams).best(raw)
+    return snapshot.by_id.get(hit[0]) if hit else None
+
+
+def closest_venue_name(raw: str):
+    """Nombre de venue más parecido a `raw` (para "¿Quisiste decir...?") o None."""
+    raw = (raw or "").strip()
+    if not raw:
+        return None
+
+    if _trigram_enabled():
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        return (
+            Venue.objects
+            .filter(name__trigram_similar=raw)
+            .annotate(sim=TrigramSimilarity("name", raw))
+            .order_by("-sim", "name")
+            .values_list("name", flat=True)
+            .first()
+        )
+
+    snapshot = venue_names.get()
+    hit = snapshot.derived("ngrams", _venue_ngrams).best(raw)
+    return snapshot.by_id[hit[0]].name if hit else None
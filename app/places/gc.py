@@ -0,0 +1,129 @@
+# app/places/gc.py
+"""
+Recolección de archivos huérfanos del storage de media (ver `gc_media`).
+
+Sin cargar nombres en memoria: el listado del storage y los nombres
+referenciados se recorren como dos secuencias ordenadas y se cruzan en una
+sola pasada (merge), igual que un merge join.
+
+- Referenciados: cada columna FileField/ImageField de todos los modelos,
+  MediaVariant.name y Blob.key. Las columnas se ordenan en la BD por bytes
+  (COLLATE "C" en PostgreSQL, BINARY en SQLite) y se leen con .iterator():
+  un cursor por columna, mezclados con heapq.merge.
+- Storage: R2/S3 con list_objects_v2 paginado (las claves ya vienen en
+  orden de bytes); filesystem con os.scandir por carpeta, ordenando solo
+  las entradas de esa carpeta ("a/" se compara como "a/" para que "a-b"
+  quede antes que "a/x", igual que en S3).
+- Lo que no está referenciado y es más viejo que el período de gracia es
+  huérfano (el período cubre uploads cuya fila aún no hizo commit).
+"""
+import heapq
+import os
+from datetime import datetime, timezone as dt_timezone
+
+from django.apps import apps
+from django.db import connection, models
+from django.db.models import Exists, OuterRef
+from django.db.models.functions import Collate
+
+from .media import IMAGE_FIELDS
+from .models import Blob, MediaVariant
+
+# Collation que ordena igual que str (código de carácter = orden de bytes UTF-8)
+_BYTE_COLLATIONS = {"postgresql": "C", "sqlite": "BINARY"}
+
+DELETE_BATCH = 1000  # máximo de delete_objects en S3
+
+
+def file_columns():
+    """[(modelo, campo)] de todos los FileField/ImageField instalados."""
+    return [
+        (model, field.name)
+        for model in apps.get_models()
+        for field in model._meta.concrete_fields
+        if isinstance(field, models.FileField)
+    ]
+
+
+def _sorted_column(model, field):
+    qs = model._default_manager.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+    collation = _BYTE_COLLATIONS.get(connection.vendor)
+    order = Collate(field, collation) if collation else field
+    return qs.order_by(order).values_list(field, flat=True).iterator(chunk_size=2000)
+
+
+def referenced_names():
+    """Nombres referenciados, en orden y sin repetir."""
+    columns = [_sorted_column(model, field) for model, field in file_columns()]
+    columns.append(_sorted_column(MediaVariant, "name"))
+    columns.append(_sorted_column(Blob, "key"))
+    previous = None
+    for name in heapq.merge(*columns):
+        if name != previous:
+            yield name
+            previous = name
+
+
+# -------------------------
+# Listado del storage: (nombre, bytes, modificado) en orden
+# -------------------------
+def _walk_filesystem(root, prefix=""):
+    base = os.path.join(root, prefix) if prefix else root
+    if not os.path.isdir(base):
+        return
+    with os.scandir(base) as it:
+        entries = sorted(it, key=lambda e: e.name + ("/" if e.is_dir(follow_symlinks=False) else ""))
+    for entry in entries:
+        name = f"{prefix}/{entry.name}" if prefix else entry.name
+        if entry.is_dir(follow_symlinks=False):
+            yield from _walk_filesystem(root, name)
+        elif entry.is_file(follow_symlinks=False):
+            st = entry.stat()
+            yield name, st.st_size, datetime.fromtimestamp(st.st_mtime, dt_timezone.utc)
+
+
+def _walk_bucket(storage, prefix=""):
+    location = f"{storage.location.strip('/')}/" if storage.location else ""
+    paginator = storage.connection.meta.client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=location + prefix):
+        for obj in page.get("Contents", ()):
+            yield obj["Key"][len(location):], obj["Size"], obj["LastModified"]
+
+
+def list_storage(storage, prefix=""):
+    if hasattr(storage, "bucket_name"):
+        return _walk_bucket(storage, prefix)
+    return _walk_filesystem(storage.location, prefix.strip("/"))
+
+
+def find_orphans(storage, cutoff, prefix=""):
+    """(nombre, bytes) de lo que está en el storage, sin referencias y modificado antes de `cutoff`."""
+    refs = referenced_names()
+    ref = next(refs, None)
+    for name, size, modified in list_storage(storage, prefix):
+        while ref is not None and ref < name:
+            ref = next(refs, None)
+        if ref == name or modified >= cutoff:
+            continue
+        yield name, size
+
+
+def delete_names(storage, names):
+    """Borra un lote: un solo delete_objects en S3, uno por uno en filesystem."""
+    if hasattr(storage, "bucket_name"):
+        location = f"{storage.location.strip('/')}/" if storage.location else ""
+        storage.bucket.delete_objects(
+            Delete={"Objects": [{"Key": location + n} for n in names], "Quiet": True}
+        )
+    else:
+        for name in names:
+            storage.delete(name)
+
+
+def stale_variants(cutoff):
+    """MediaVariant cuyo original ya no usa ninguna fila (creadas antes de `cutoff`)."""
+    qs = MediaVariant.objects.filter(created_at__lt=cutoff)
+    for model, fields in IMAGE_FIELDS.items():
+        for field in fields:
+            qs = qs.filter(~Exists(model._default_manager.filter(**{field: OuterRef("source")})))
+    return qs
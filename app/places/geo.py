@@ -0,0 +1,159 @@
+# app/places/geo.py
+"""
+Coordenadas de venues: geohash + consultas por bbox para el mapa.
+
+Sin PostGIS: cada Venue guarda latitude/longitude y su geohash (base32,
+GEOHASH_PRECISION caracteres), indexado. Un bbox se cubre con unos pocos
+prefijos de geohash (bbox_cells) y la query es `geohash LIKE 'p%' OR ...`
+sobre el índice, refinada con el rango exacto de lat/lon.
+
+A zoom bajo los puntos se agrupan en servidor por prefijo de geohash
+(cluster_precision): una fila por celda con su conteo y centroide, en vez
+de mandar todos los puntos al navegador.
+"""
+import math
+
+from django.db.models import Avg, Count, Min, Q
+from django.db.models.functions import Substr
+
+GEOHASH_PRECISION = 9  # ~5 m
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Desde este zoom (Leaflet/OSM) se devuelven puntos individuales
+CLUSTER_MAX_ZOOM = 14
+
+# Tope de puntos por respuesta (a zoom alto igual se corta)
+MAX_POINTS = 500
+
+
+def geohash_encode(lat: float, lon: float, precision=GEOHASH_PRECISION) -> str:
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    chars, bits, ch, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            ch = (ch << 1) | (lon >= mid)
+            lon_lo, lon_hi = (mid, lon_hi) if lon >= mid else (lon_lo, mid)
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            ch = (ch << 1) | (lat >= mid)
+            lat_lo, lat_hi = (mid, lat_hi) if lat >= mid else (lat_lo, mid)
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[ch])
+            bits, ch = 0, 0
+    return "".join(chars)
+
+
+def cell_size(precision):
+    """(alto en grados de latitud, ancho en grados de longitud) de una celda."""
+    lon_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bbox_cells(bbox, max_cells=16):
+    """
+    Prefijos de geohash que cubren bbox = (oeste, sur, este, norte), con la
+    mayor precisión que no pase de max_cells celdas.
+    """
+    west, south, east, north = bbox
+    best = [""]  # sin prefijo = todo el mundo
+    for precision in range(1, GEOHASH_PRECISION + 1):
+        lat_step, lon_step = cell_size(precision)
+        rows = math.floor(north / lat_step) - math.floor(south / lat_step) + 1
+        cols = math.floor(east / lon_step) - math.floor(west / lon_step) + 1
+        if rows * cols > max_cells:
+            break
+        cells = set()
+        for r in range(rows):
+            lat = min(south + r * lat_step, north)
+            for c in range(cols):
+                lon = min(west + c * lon_step, east)
+                cells.add(geohash_encode(lat, lon, precision))
+            cells.add(geohash_encode(lat, east, precision))
+        for c in range(cols):
+            cells.add(geohash_encode(north, min(west + c * lon_step, east), precision))
+        cells.add(geohash_encode(north, east, precision))
+        best = sorted(cells)
+    return best
+
+
+def parse_bbox(raw):
+    """"oeste,sur,este,norte" -> tupla de floats, o None si no es válido."""
+    try:
+        west, south, east, north = (float(x) for x in (raw or "").split(","))
+    except ValueError:
+        return None
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        return None
+    return west, south, east, north
+
+
+def in_bbox(qs, bbox):
+    """Filtra venues dentro del bbox: prefijos de geohash (índice) + rango exacto."""
+    west, south, east, north = bbox
+    prefixes = Q()
+    for cell in bbox_cells(bbox):
+        if cell:
+            prefixes |= Q(geohash__startswith=cell)
+    return qs.filter(
+        prefixes,
+        latitude__gte=south, latitude__lte=north,
+        longitude__gte=west, longitude__lte=east,
+    )
+
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> float:
+    """Distancia de gran círculo en km."""
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bbox(lat, lon, radius_km):
+    """bbox (oeste, sur, este, norte) que contiene el círculo; recortado al mundo."""
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    dlon = dlat / max(math.cos(math.radians(lat)), 0.01)
+    return (
+        max(-180.0, lon - dlon), max(-90.0, lat - dlat),
+        min(180.0, lon + dlon), min(90.0, lat + dlat),
+    )
+
+
+def cluster_precision(zoom: int) -> int:
+    """Largo de prefijo para agrupar: celdas de unos ~60 px en pantalla."""
+    # zoom 4 -> 2 caracteres ... zoom 13 -> 6 caracteres
+    return max(1, min(GEOHASH_PRECISION - 1, zoom * 2 // 5 + 1))
+
+
+def clusters(qs, zoom):
+    """Una fila por celda: {cell, count, lat, lon, slug}; slug solo si hay 1 venue."""
+    precision = cluster_precision(zoom)
+    rows = (
+        qs.order_by()
+        .annotate(cell=Substr("geohash", 1, precision))
+        .values("cell")
+        .annotate(
+            count=Count("id"),
+            lat=Avg("latitude"),
+            lon=Avg("longitude"),
+            any_slug=Min("slug"),
+        )
+    )
+    return [
+        {
+            "cell": r["cell"],
+            "count": r["count"],
+            "lat": float(r["lat"]),
+            "lon": float(r["lon"]),
+            "slug": r["any_slug"] if r["count"] == 1 else None,
+        }
+        for r in rows
+    ]
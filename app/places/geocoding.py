@@ -0,0 +1,221 @@
+# app/places/geocoding.py
+"""
+Geocodificación por lotes de Venue.address (ver `geocode_venues`).
+
+- Las direcciones se normalizan (sin tildes, sin "Chile" / "Región
+  Metropolitana" / código postal) y esa clave se memoiza en GeocodeCache,
+  incluidos los "no encontrados": cada dirección se consulta una sola vez.
+- El proveedor es enchufable (settings.GEOCODER_PROVIDER):
+    gazetteer  offline; centro de la comuna nombrada en la dirección
+               (Commune.lat/lon + el JSON de GEOCODER_GAZETTEER).
+    http       servicio compatible con Nominatim (GEOCODER_URL), con
+               límite de requests por segundo compartido entre workers.
+- Las claves pendientes se resuelven en paralelo (ThreadPoolExecutor); los
+  workers no tocan la BD, solo el proveedor.
+"""
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.conf import settings
+
+from .models import GeocodeCache
+from .refdata import all_communes, normalize
+
+# Partes de la dirección que no ayudan a ubicarla
+_NOISE_PARTS = {"chile", "region metropolitana", "region metropolitana de santiago", "rm"}
+_POSTAL_RE = re.compile(r"\b\d{7}\b")
+_ABBREVIATIONS = {"av": "avenida", "avda": "avenida", "pje": "pasaje", "psje": "pasaje"}
+
+
+class GeocodeError(Exception):
+    """Falla transitoria del proveedor: no se guarda en caché, se reintenta."""
+
+
+@dataclass(frozen=True)
+class GeocodeResult:
+    latitude: Decimal
+    longitude: Decimal
+    precision: str
+
+
+def address_parts(address: str):
+    parts = []
+    for raw in (address or "").split(","):
+        part = _POSTAL_RE.sub(" ", normalize(raw))
+        words = [_ABBREVIATIONS.get(w, w) for w in re.findall(r"[a-z0-9]+", part)]
+        part = " ".join(words)
+        if part and part not in _NOISE_PARTS and (not parts or parts[-1] != part):
+            parts.append(part)
+    return parts
+
+
+def normalize_address(address: str) -> str:
+    """Clave de caché: "Av. del Mar 5200, 1710620 La Serena, Chile" -> "avenida del mar 5200, la serena"."""
+    return ", ".join(address_parts(address))[:255]
+
+
+def with_commune(address: str, commune_name: str) -> str:
+    """Agrega la comuna del venue si la dirección no la nombra ("Raúl Bitrán 1502" -> "..., La Serena")."""
+    if commune_name and normalize(commune_name) not in address_parts(address):
+        return f"{address}, {commune_name}"
+    return address
+
+
+def _coord(value):
+    return Decimal(str(value)).quantize(Decimal("0.000001"))
+
+
+# -------------------------
+# Proveedores
+# -------------------------
+class GazetteerProvider:
+    """Offline: coordenadas de la primera comuna conocida que aparezca en la dirección."""
+    name = "gazetteer"
+
+    def __init__(self, path=None):
+        self._places = {}
+        for c in all_communes():
+            if c.lat is not None and c.lon is not None:
+                self._places[normalize(c.name)] = (c.lat, c.lon)
+        path = path or getattr(settings, "GEOCODER_GAZETTEER", "")
+        if path:
+            with open(path, encoding="utf-8") as fh:
+                for row in json.load(fh):
+                    if row.get("lat") is not None and row.get("lon") is not None:
+                        self._places.setdefault(normalize(row["name"]), (row["lat"], row["lon"]))
+
+    def geocode(self, address):
+        parts = address_parts(address)
+        for part in parts[1:] or parts:  # la primera parte suele ser la calle
+            hit = self._places.get(part)
+            if hit:
+                return GeocodeResult(_coord(hit[0]), _coord(hit[1]), "commune")
+        return None
+
+
+class RateLimiter:
+    """Al menos `min_interval` segundos entre llamadas, compartido entre hilos."""
+
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._next_at = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next_at - now
+            self._next_at = max(now, self._next_at) + self.min_interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HttpProvider:
+    """Servicio estilo Nominatim (/search?format=json)."""
+    name = "http"
+
+    def __init__(self, url=None, min_interval=None):
+        import requests
+
+        self._session = requests.Session()
+        self._session.headers.update({
+            "User-Agent": settings.GEOCODER_USER_AGENT,
+            "Accept-Language": "es",
+        })
+        self.url = url or settings.GEOCODER_URL
+        self._limiter = RateLimiter(
+            settings.GEOCODER_MIN_INTERVAL if min_interval is None else min_interval
+        )
+
+    def geocode(self, address):
+        import requests
+
+        self._limiter.wait()
+        try:
+            res = self._session.get(
+                self.url,
+                params={"q": address, "format": "json", "limit": 1, "countrycodes": "cl"},
+                timeout=10,
+            )
+            res.raise_for_status()
+            data = res.json()
+        except (requests.RequestException, ValueError) as e:
+            raise GeocodeError(str(e)) from e
+        if not data:
+            return None
+        return GeocodeResult(_coord(data[0]["lat"]), _coord(data[0]["lon"]), "street")
+
+
+PROVIDERS = {
+    GazetteerProvider.name: GazetteerProvider,
+    HttpProvider.name: HttpProvider,
+}
+
+
+def get_provider(name=None):
+    name = name or settings.GEOCODER_PROVIDER
+    try:
+        return PROVIDERS[name]()
+    except KeyError:
+        raise ValueError(f"Proveedor de geocodificación desconocido: {name}") from None
+
+
+# -------------------------
+# Lotes con caché
+# -------------------------
+def geocode_addresses(addresses, provider, workers=4, retry_misses=False):
+    """
+    {clave normalizada: GeocodeResult | None} para `addresses`. Las claves
+    con falla transitoria del proveedor no aparecen en el resultado.
+    """
+    pending = {}
+    for address in addresses:
+        key = normalize_address(address)
+        if key:
+            pending.setdefault(key, address)
+
+    results = {}
+    for row in GeocodeCache.objects.filter(key__in=pending.keys()):
+        if row.latitude is None and retry_misses:
+            continue
+        results[row.key] = (
+            GeocodeResult(row.latitude, row.longitude, row.precision)
+            if row.latitude is not None else None
+        )
+        pending.pop(row.key)
+
+    def _lookup(item):
+        key, address = item
+        try:
+            return key, address, provider.geocode(address)
+        except GeocodeError:
+            return key, address, GeocodeError
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for key, address, result in pool.map(_lookup, pending.items()):
+            if result is GeocodeError:
+                continue
+            results[key] = result
+            rows.append(GeocodeCache(
+                key=key,
+                address=address[:255],
+                latitude=result.latitude if result else None,
+                longitude=result.longitude if result else None,
+                precision=result.precision if result else "",
+                provider=provider.name,
+            ))
+
+    GeocodeCache.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=["key"],
+        update_fields=["latitude", "longitude", "precision", "provider"],
+        batch_size=500,
+    )
+    return results
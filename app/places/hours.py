@@ -0,0 +1,142 @@
+# app/places/hours.py
+"""
+Horarios estructurados de venues y filtro "abierto ahora".
+
+Venue.hours_short sigue siendo el texto que escribe el dueño ("Vie–Sáb
+21:00–04:00"); parse_hours() lo convierte en intervalos semanales que se
+guardan en OpeningInterval como minutos de la semana (lunes 00:00 = 0).
+
+- Un cierre pasada la medianoche sigue en el día siguiente: viernes
+  22:00–05:00 es [4*1440 + 1320, 5*1440 + 300).
+- Lo que pasa del domingo a la noche se parte en dos intervalos (hasta
+  el fin de la semana y desde el lunes 00:00), así start < end siempre.
+- Los intervalos de un venue se fusionan y no se solapan.
+
+"Abierto a las T" es un EXISTS con start_minute <= T < end_minute sobre el
+índice (start_minute, end_minute).
+"""
+import re
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import OpeningInterval, Venue
+from .refdata import normalize
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_DAYS = ["lun", "mar", "mie", "jue", "vie", "sab", "dom"]
+_ALL_DAYS_RE = re.compile(r"todos los dias|diario|todos los dias de la semana")
+
+# "vie-sab 22:00-05:00", "lun, mie y vie 20 a 2", "jueves 23:00 - 04:30"
+_SEGMENT_RE = re.compile(
+    r"(?P<days>[a-z][a-z ,\-y]*?)\s*"
+    r"(?P<open>\d{1,2})(?:[:.h](?P<open_m>\d{2}))?\s*h?\s*"
+    r"(?:-|a|hasta)\s*"
+    r"(?P<close>\d{1,2})(?:[:.h](?P<close_m>\d{2}))?"
+)
+
+
+def minute_of_week(dt=None):
+    """Minuto de la semana local (lunes 00:00 = 0) de un datetime aware."""
+    dt = timezone.localtime(dt or timezone.now(), timezone.get_default_timezone())
+    return dt.weekday() * MINUTES_PER_DAY + dt.hour * 60 + dt.minute
+
+
+def _day_index(word):
+    prefix = word[:3]
+    return _DAYS.index(prefix) if prefix in _DAYS else None
+
+
+def _parse_days(text):
+    """"vie-sab" -> [4, 5]; "lun, mie y vie" -> [0, 2, 4]; None si no reconoce días."""
+    if _ALL_DAYS_RE.search(text):
+        return list(range(7))
+    text = re.sub(r"\s+a\s+", "-", text)  # "lunes a viernes"
+    days = []
+    for chunk in re.split(r",|\by\b", text):
+        ends = [_day_index(w) for w in re.findall(r"[a-z]+", chunk)]
+        ends = [d for d in ends if d is not None]
+        if len(ends) >= 2 and "-" in chunk:
+            first, last = ends[0], ends[-1]
+            span = (last - first) % 7
+            days.extend((first + i) % 7 for i in range(span + 1))
+        else:
+            days.extend(ends)
+    return sorted(set(days)) or None
+
+
+def merge_intervals(intervals):
+    """Ordena y fusiona intervalos que se tocan o solapan."""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(i) for i in merged]
+
+
+def parse_hours(text):
+    """
+    Intervalos [(start_minute, end_minute), ...] del texto libre, o [] si
+    no se entiende. Cierre <= apertura = cierra al día siguiente.
+    """
+    text = normalize(text).replace("–", "-").replace("—", "-")
+    intervals = []
+    for m in _SEGMENT_RE.finditer(text):
+        days = _parse_days(m.group("days"))
+        if not days:
+            continue
+        open_h, close_h = int(m.group("open")), int(m.group("close"))
+        open_m, close_m = int(m.group("open_m") or 0), int(m.group("close_m") or 0)
+        if open_h > 24 or close_h > 24 or open_m > 59 or close_m > 59:
+            continue
+        opens = open_h * 60 + open_m
+        closes = close_h * 60 + close_m
+        length = (closes - opens) % MINUTES_PER_DAY or MINUTES_PER_DAY
+
+        for day in days:
+            start = day * MINUTES_PER_DAY + opens
+            end = start + length
+            if end <= MINUTES_PER_WEEK:
+                intervals.append((start, end))
+            else:
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+    return merge_intervals(intervals)
+
+
+@transaction.atomic
+def set_venue_hours(venue):
+    """Reemplaza los OpeningInterval del venue según su hours_short."""
+    OpeningInterval.objects.filter(venue=venue).delete()
+    OpeningInterval.objects.bulk_create(
+        OpeningInterval(venue=venue, start_minute=start, end_minute=end)
+        for start, end in parse_hours(venue.hours_short)
+    )
+
+
+@transaction.atomic
+def rebuild_opening_intervals():
+    """Reparsea hours_short de todos los venues. Devuelve cuántos intervalos quedaron."""
+    rows = [
+        OpeningInterval(venue_id=venue_id, start_minute=start, end_minute=end)
+        for venue_id, text in Venue.objects.exclude(hours_short="").values_list("id", "hours_short")
+        for start, end in parse_hours(text)
+    ]
+    OpeningInterval.objects.all().delete()
+    OpeningInterval.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def open_at(qs, when=None):
+    """Filtra `qs` (Venue) a los abiertos en el instante `when` (por defecto ahora)."""
+    minute = minute_of_week(when)
+    return qs.filter(Exists(
+        OpeningInterval.objects.filter(
+            venue=OuterRef("pk"), start_minute__lte=minute, end_minute__gt=minute
+        )
+    ))
@@ -0,0 +1,52 @@
+# app/places/listing.py
+"""
+Venue.is_listed: copia desnormalizada de "el dueño tiene suscripción activa".
+
+Se recalcula con UPDATEs por conjunto (Exists sobre Subscription.active_Q)
+cada vez que cambia una Subscription (signals) y periódicamente con
+`python manage.py sweep_listings`, que apaga los periodos vencidos
+(current_period_end / override_until) sin que nadie haya guardado nada.
+"""
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from app.account.models import Subscription
+
+from .caching import bump_on_commit
+from .models import Venue
+from .stats import refresh_commune_stats
+
+
+def active_owner_exists(now=None):
+    """Subquery: ¿el owner_user del venue tiene suscripción efectiva?"""
+    return Exists(
+        Subscription.objects
+        .filter(Subscription.active_Q(now))
+        .filter(user_id=OuterRef("owner_user_id"))
+    )
+
+
+def refresh_listing(user_ids=None, now=None) -> int:
+    """
+    Recalcula is_listed de los venues de `user_ids` (o de todos si es None).
+    Solo toca las filas que cambian; devuelve cuántas cambiaron.
+    """
+    now = now or timezone.now()
+    qs = Venue.objects.all()
+    if user_ids is not None:
+        qs = qs.filter(owner_user_id__in=user_ids)
+
+    active = active_owner_exists(now)
+    to_list = qs.filter(active, is_listed=False)
+    to_unlist = qs.filter(~active, is_listed=True)
+
+    # Comunas afectadas, para invalidar sus payloads cacheados
+    communes = set(to_list.values_list("Commune_id", flat=True))
+    communes.update(to_unlist.values_list("Commune_id", flat=True))
+    if not communes:
+        return 0
+
+    changed = to_list.update(is_listed=True) + to_unlist.update(is_listed=False)
+    refresh_commune_stats(communes, now=now)
+    bump_on_commit(commune_ids=communes, catalogs=["venues"])  # + "Ciudades destacadas"
+    return changed
@@ -0,0 +1,61 @@
+# app/places/management/commands/build_media_variants.py
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from app.places.media import IMAGE_FIELDS, record_variants, write_variants
+from app.places.models import MediaVariant
+
+
+def _build(source):
+    # Corre en un proceso hijo: solo storage + Pillow, sin BD
+    try:
+        return source, write_variants(source), None
+    except Exception as e:  # un archivo roto no detiene el lote
+        return source, None, str(e)
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las variantes WebP/AVIF de todas las imágenes subidas que aún "
+        "no las tienen (portadas, logos, galería de venues, flyers, fotos de "
+        "galería y comunas)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers", type=int, default=4,
+            help="Procesos en paralelo (default: 4).",
+        )
+        parser.add_argument(
+            "--force", action="store_true",
+            help="Regenera también las que ya tienen variantes.",
+        )
+
+    def handle(self, *args, **opts):
+        sources = set()
+        for model, fields in IMAGE_FIELDS.items():
+            for field in fields:
+                sources.update(
+                    model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+                    .values_list(field, flat=True)
+                )
+        if not opts["force"]:
+            sources -= set(MediaVariant.objects.values_list("source", flat=True).distinct())
+
+        # Los hijos heredan el proceso (fork): no deben compartir conexiones abiertas
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=max(1, opts["workers"])) as pool:
+            futures = [pool.submit(_build, source) for source in sorted(sources)]
+            for future in as_completed(futures):
+                source, written, error = future.result()
+                if error:
+                    failed += 1
+                    self.stderr.write(f"{source}: {error}")
+                    continue
+                record_variants(source, written)
+                done += 1
+
+        self.stdout.write(f"Originales procesados: {done} · con error: {failed}")
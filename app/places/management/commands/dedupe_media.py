@@ -0,0 +1,57 @@
+# app/places/management/commands/dedupe_media.py
+from django.core.management.base import BaseCommand
+
+from app.places.media import CONTENT_FIELDS, delete_variants, move_variants
+from app.places.storage import CONTENT_PREFIX, content_storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Pasa las imágenes subidas antes del storage por contenido (galería, "
+        "portadas, logos y flyers) a claves cas/<sha256>: las copias idénticas "
+        "quedan en un solo archivo con refcount en Blob. Las variantes WebP/AVIF "
+        "se reasignan sin regenerarlas y los archivos viejos se borran cuando "
+        "ninguna fila los usa."
+    )
+
+    def handle(self, *args, **opts):
+        storage = content_storage()
+        moved = missing = 0
+        old_names = set()
+
+        for model, fields in CONTENT_FIELDS.items():
+            for field in fields:
+                rows = (
+                    model.objects
+                    .exclude(**{field: ""})
+                    .exclude(**{f"{field}__startswith": CONTENT_PREFIX + "/"})
+                    .values_list("pk", field)
+                )
+                for pk, name in rows.iterator():
+                    try:
+                        with storage.open(name, "rb") as fh:
+                            key = storage.save(name, fh)
+                    except OSError as e:
+                        missing += 1
+                        self.stderr.write(f"{model.__name__} {pk}: {name} ({e})")
+                        continue
+                    # update(): sin signals, el refcount ya lo sumó storage.save
+                    model.objects.filter(pk=pk).update(**{field: key})
+                    move_variants(name, key)
+                    old_names.add(name)
+                    moved += 1
+
+        still_used = set()
+        for model, fields in CONTENT_FIELDS.items():
+            for field in fields:
+                still_used.update(
+                    model.objects.filter(**{f"{field}__in": old_names}).values_list(field, flat=True)
+                )
+        removed = old_names - still_used
+        for name in removed:
+            storage.delete(name)
+            delete_variants(name)
+
+        self.stdout.write(
+            f"Archivos movidos: {moved}, originales borrados: {len(removed)}, faltantes: {missing}"
+        )
@@ -0,0 +1,16 @@
+# app/places/management/commands/expire_upload_sessions.py
+from django.core.management.base import BaseCommand
+
+from app.places.resumable import expire_sessions
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra las subidas reanudables abandonadas (sin partes nuevas en "
+        "UPLOAD_SESSION_TTL) y sus .part en UPLOAD_SESSION_DIR. Pensado "
+        "para cron cada hora."
+    )
+
+    def handle(self, *args, **opts):
+        expired = expire_sessions()
+        self.stdout.write(f"Sesiones expiradas: {expired}")
@@ -0,0 +1,38 @@
+# app/places/management/commands/flush_clicks.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from app.places.clicks import flush_pending_clicks
+
+
+class Command(BaseCommand):
+    help = "Aplica los clicks pendientes (PendingClick) a clicks_count de Venue/Event."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=5000,
+            help="Máximo de clicks por transacción (default: 5000).",
+        )
+        parser.add_argument(
+            "--every", type=int, default=0,
+            help="Si se indica, queda corriendo y hace flush cada N segundos.",
+        )
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+        every = opts["every"]
+
+        while True:
+            total = 0
+            while True:
+                n = flush_pending_clicks(batch_size=batch_size)
+                total += n
+                if n < batch_size:
+                    break
+
+            if total or not every:
+                self.stdout.write(f"Clicks aplicados: {total}")
+            if not every:
+                return
+            time.sleep(every)
@@ -0,0 +1,67 @@
+# app/places/management/commands/gc_media.py
+from collections import Counter
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from app.places.gc import DELETE_BATCH, delete_names, find_orphans, stale_variants
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra del storage de media (filesystem o R2) los archivos que ninguna "
+        "fila referencia: portadas reemplazadas, fotos de venues borrados, "
+        "menús y avatares eliminados, variantes de originales que ya no están "
+        "y catálogos viejos. Recorre el listado del storage y los nombres de la "
+        "BD en orden, sin cargarlos en memoria."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Solo informa qué borraría (con -v 2 lista cada archivo).",
+        )
+        parser.add_argument(
+            "--grace-hours", type=int, default=48,
+            help="No toca archivos modificados hace menos de N horas (default: 48).",
+        )
+        parser.add_argument(
+            "--prefix", default="",
+            help='Limita el recorrido a un prefijo, ej: "venues/".',
+        )
+
+    def handle(self, *args, **opts):
+        dry_run = opts["dry_run"]
+        cutoff = timezone.now() - timedelta(hours=opts["grace_hours"])
+
+        variants = stale_variants(cutoff)
+        if dry_run:
+            self.stdout.write(f"Variantes sin original: {variants.count()}")
+        else:
+            deleted, _ = variants.delete()
+            self.stdout.write(f"Variantes sin original borradas: {deleted}")
+
+        count = total_bytes = 0
+        by_prefix = Counter()
+        batch = []
+        for name, size in find_orphans(default_storage, cutoff, opts["prefix"]):
+            count += 1
+            total_bytes += size
+            by_prefix[name.split("/", 1)[0] + "/" if "/" in name else "(raíz)"] += 1
+            if opts["verbosity"] >= 2:
+                self.stdout.write(f"  {name} ({size} B)")
+            if dry_run:
+                continue
+            batch.append(name)
+            if len(batch) >= DELETE_BATCH:
+                delete_names(default_storage, batch)
+                batch = []
+        if batch:
+            delete_names(default_storage, batch)
+
+        for prefix, n in sorted(by_prefix.items()):
+            self.stdout.write(f"  {prefix}: {n}")
+        verb = "Huérfanos" if dry_run else "Huérfanos borrados"
+        self.stdout.write(f"{verb}: {count} ({total_bytes / (1024 * 1024):.1f} MB)")
@@ -0,0 +1,83 @@
+# app/places/management/commands/geocode_venues.py
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+
+from app.places.geo import geohash_encode
+from app.places.geocoding import (
+    PROVIDERS, geocode_addresses, get_provider, normalize_address, with_commune
+)
+from app.places.models import Venue
+
+
+class Command(BaseCommand):
+    help = (
+        "Completa Venue.latitude/longitude desde la dirección. Solo procesa "
+        "venues cuya dirección cambió desde la última corrida; los resultados "
+        "quedan en GeocodeCache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--provider", choices=sorted(PROVIDERS),
+            help="Proveedor (default: settings.GEOCODER_PROVIDER).",
+        )
+        parser.add_argument(
+            "--workers", type=int, default=4,
+            help="Consultas en paralelo al proveedor (default: 4).",
+        )
+        parser.add_argument(
+            "--all", action="store_true",
+            help="Reprocesa todos los venues, no solo los con dirección nueva.",
+        )
+        parser.add_argument(
+            "--retry-misses", action="store_true",
+            help="Vuelve a consultar direcciones que antes no se encontraron.",
+        )
+
+    def handle(self, *args, **opts):
+        try:
+            provider = get_provider(opts["provider"])
+        except (ValueError, OSError) as e:
+            raise CommandError(str(e))
+
+        venues = (
+            Venue.objects.exclude(address="")
+            .select_related("Commune")
+            .only(
+                "id", "address", "latitude", "longitude", "geohash", "geocoded_address",
+                "Commune__name",
+            )
+        )
+        if not opts["all"]:
+            venues = venues.exclude(geocoded_address=F("address"))
+        venues = list(venues)
+        queries = {v.pk: with_commune(v.address, v.Commune.name) for v in venues}
+
+        results = geocode_addresses(
+            queries.values(), provider,
+            workers=opts["workers"], retry_misses=opts["retry_misses"],
+        )
+
+        changed, found = [], 0
+        for v in venues:
+            key = normalize_address(queries[v.pk])
+            if key not in results:
+                continue  # falla transitoria: queda para la próxima corrida
+            result = results[key]
+            if result:
+                found += 1
+                v.latitude, v.longitude = result.latitude, result.longitude
+                v.geohash = geohash_encode(float(v.latitude), float(v.longitude))
+            else:
+                # Dirección nueva no encontrada: sin pin antes que el de la dirección vieja
+                v.latitude = v.longitude = None
+                v.geohash = ""
+            v.geocoded_address = v.address
+            changed.append(v)
+
+        Venue.objects.bulk_update(
+            changed, ["latitude", "longitude", "geohash", "geocoded_address"], batch_size=500
+        )
+        self.stdout.write(
+            f"Venues procesados: {len(changed)} de {len(venues)} · con coordenadas: {found}"
+        )
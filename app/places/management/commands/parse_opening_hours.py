@@ -0,0 +1,15 @@
+# app/places/management/commands/parse_opening_hours.py
+from django.core.management.base import BaseCommand
+
+from app.places.hours import rebuild_opening_intervals
+
+
+class Command(BaseCommand):
+    help = (
+        "Regenera OpeningInterval desde Venue.hours_short para todos los "
+        "venues (después de loaddata o de cambiar el parser)."
+    )
+
+    def handle(self, *args, **opts):
+        n = rebuild_opening_intervals()
+        self.stdout.write(f"Intervalos de apertura: {n}")
@@ -0,0 +1,19 @@
+# app/places/management/commands/rebuild_search_vectors.py
+from django.core.management.base import BaseCommand
+
+from app.places.models import Commune, Venue
+from app.places.search import fts_enabled, refresh_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Recalcula Venue.search_vector (full-text) para todos los venues."
+
+    def handle(self, *args, **opts):
+        if not fts_enabled():
+            self.stdout.write("La base de datos no es PostgreSQL: no hay nada que recalcular.")
+            return
+
+        total = 0
+        for commune in Commune.objects.only("id", "name").iterator():
+            total += refresh_search_vectors(Venue.objects.filter(Commune=commune), commune.name)
+        self.stdout.write(f"Venues actualizados: {total}")
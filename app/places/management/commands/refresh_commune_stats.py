@@ -0,0 +1,15 @@
+# app/places/management/commands/refresh_commune_stats.py
+from django.core.management.base import BaseCommand
+
+from app.places.stats import refresh_commune_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcilia CommuneStats (venues listados, eventos próximos y de esta "
+        "noche) para todas las comunas; pensado para correr por cron."
+    )
+
+    def handle(self, *args, **opts):
+        n = refresh_commune_stats()
+        self.stdout.write(f"Comunas actualizadas: {n}")
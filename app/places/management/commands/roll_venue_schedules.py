@@ -0,0 +1,17 @@
+# app/places/management/commands/roll_venue_schedules.py
+from django.core.management.base import BaseCommand
+
+from app.places.schedule import refresh_venue_schedules
+
+
+class Command(BaseCommand):
+    help = (
+        "Corre la ventana de agenda de todos los venues (next_event_at y "
+        "máscara de días) al día local actual. Pensado para cron diario "
+        "pasada la medianoche; mientras no corra, el filtro por fecha del "
+        "listado usa la consulta directa sobre events."
+    )
+
+    def handle(self, *args, **opts):
+        written = refresh_venue_schedules()
+        self.stdout.write(f"Venues actualizados: {written}")
@@ -0,0 +1,26 @@
+# app/places/management/commands/rollup_clicks.py
+from django.core.management.base import BaseCommand
+
+from app.places.clicks import HOURLY_RETENTION_DAYS, prune_hourly, rollup_clicks
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los rollups diarios/semanales de clicks desde ClickHourly "
+        "y poda las horas fuera de la retención."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days", type=int, default=2,
+            help="Días locales a recalcular, incluido hoy (default: 2).",
+        )
+        parser.add_argument(
+            "--retention-days", type=int, default=HOURLY_RETENTION_DAYS,
+            help=f"Días de ClickHourly a conservar (default: {HOURLY_RETENTION_DAYS}).",
+        )
+
+    def handle(self, *args, **opts):
+        n = rollup_clicks(days=opts["days"])
+        pruned = prune_hourly(retention_days=max(opts["retention_days"], opts["days"] + 7))
+        self.stdout.write(f"Rollups actualizados: {n} · horas podadas: {pruned}")
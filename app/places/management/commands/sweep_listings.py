@@ -0,0 +1,16 @@
+# app/places/management/commands/sweep_listings.py
+from django.core.management.base import BaseCommand
+
+from app.places.listing import refresh_listing
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula Venue.is_listed según las suscripciones vigentes. "
+        "Apaga los periodos vencidos (current_period_end / override_until); "
+        "pensado para correr por cron cada pocos minutos."
+    )
+
+    def handle(self, *args, **opts):
+        changed = refresh_listing()
+        self.stdout.write(f"Venues actualizados: {changed}")
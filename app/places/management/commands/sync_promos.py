@@ -0,0 +1,19 @@
+# app/places/management/commands/sync_promos.py
+from django.core.management.base import BaseCommand
+
+from app.places.models import Venue
+from app.places.promos import LEGACY_FIELDS, sync_legacy_promos
+
+
+class Command(BaseCommand):
+    help = (
+        "Refleja Venue.vgt_promos_1..3 en el modelo Promo para todos los "
+        "venues (después de loaddata o de editar los campos por SQL)."
+    )
+
+    def handle(self, *args, **opts):
+        n = 0
+        for venue in Venue.objects.only("id", "Commune", *LEGACY_FIELDS):
+            sync_legacy_promos(venue)
+            n += 1
+        self.stdout.write(f"Venues sincronizados: {n}")
@@ -0,0 +1,227 @@
+# app/places/media.py
+"""
+Derivados responsivos de imágenes subidas (portadas, logos, flyers,
+galería y comunas): las que los templates muestran con {% responsive_image %}.
+
+Por cada original se generan anchos fijos (VARIANT_WIDTHS, sin agrandar)
+en WebP y, si Pillow trae el codec, AVIF:
+- orientación EXIF aplicada y metadatos fuera (no se copia el EXIF);
+- JPEG con draft(): el decoder reduce por 1/2, 1/4 o 1/8 al leer, así una
+  foto de teléfono de 12 MP no se descomprime completa en memoria;
+- cada variante queda en MediaVariant con su ancho y alto, y el template
+  tag {% responsive_image %} arma <picture> con srcset/sizes.
+
+Los signals generan los derivados solo cuando el archivo del campo cambió:
+tras el commit, en un hilo aparte (la respuesta del formulario no espera
+el encode; un error no rompe el upload). Si el proceso se reinicia antes
+de terminar, esas imágenes quedan sin variantes hasta que
+`build_media_variants` (pool de procesos) las complete; los templates usan
+el original mientras tanto.
+"""
+import hashlib
+import io
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from PIL import Image, ImageOps, features
+
+from .models import Commune, Event, MediaVariant, Photo, Venue
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 640, 1024, 1600)
+VARIANT_DIR = "variants"
+
+WEBP_QUALITY = 80
+AVIF_QUALITY = 60
+
+# Orientaciones EXIF que intercambian ancho y alto
+_SWAPPED_ORIENTATIONS = {5, 6, 7, 8}
+
+# Campos de imagen con derivados (signals y build_media_variants)
+IMAGE_FIELDS = {
+    Photo: ("image",),
+    Venue: ("cover_image", "logo", "gallery_venue"),
+    Event: ("flyer_image",),
+    Commune: ("image",),
+}
+
+# Campos guardados por contenido (storage.content_storage, refcount en Blob)
+CONTENT_FIELDS = {
+    Photo: ("image",),
+    Venue: ("cover_image", "logo"),
+    Event: ("flyer_image",),
+}
+
+# Hilos por proceso para generar variantes fuera de la respuesta
+BACKGROUND_WORKERS = 2
+
+# Las variantes de un original casi nunca cambian: el template tag las lee de caché
+VARIANTS_CACHE_FOR = 24 * 60 * 60
+
+
+def variant_formats():
+    """("avif", "webp") o ("webp",) según los codecs de esta instalación de Pillow."""
+    try:
+        has_avif = features.check("avif")
+    except ValueError:
+        has_avif = False
+    return ("avif", "webp") if has_avif else ("webp",)
+
+
+def variant_name(source, width, fmt):
+    """"venues/covers/2025/10/a.jpg" -> "variants/venues/covers/2025/10/a.640w.webp"."""
+    stem, _ext = posixpath.splitext(source)
+    return f"{VARIANT_DIR}/{stem}.{width}w.{fmt}"
+
+
+def render_variants(data: bytes, widths=VARIANT_WIDTHS, formats=None):
+    """
+    [(width, height, fmt, bytes)] para la imagen `data`. Función pura (sin
+    BD ni storage) para poder correrla en otro proceso.
+    """
+    formats = formats or variant_formats()
+    img = Image.open(io.BytesIO(data))
+
+    swapped = img.getexif().get(0x0112) in _SWAPPED_ORIENTATIONS
+    full_width = img.height if swapped else img.width
+    targets = sorted({min(w, full_width) for w in widths}, reverse=True)
+
+    if img.format == "JPEG":
+        # Solo limita el ancho (en la orientación guardada)
+        img.draft("RGB", (1, targets[0]) if swapped else (targets[0], 1))
+
+    img = ImageOps.exif_transpose(img)
+    has_alpha = img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+    img = img.convert("RGBA" if has_alpha else "RGB")
+
+    out = []
+    current = img
+    for width in targets:
+        height = max(1, round(img.height * width / img.width))
+        if current.width != width:
+            current = current.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            buf = io.BytesIO()
+            if fmt == "webp":
+                current.save(buf, "WEBP", quality=WEBP_QUALITY, method=4)
+            else:
+                current.save(buf, "AVIF", quality=AVIF_QUALITY)
+            out.append((width, current.height, fmt, buf.getvalue()))
+    return out
+
+
+def write_variants(source, storage=None, data=None):
+    """
+    Genera y sube las variantes de `source` (leído del storage, salvo que
+    ya venga en `data`). Devuelve [(width, height, fmt, name)]; no toca la
+    BD (se usa desde pools de hilos/procesos).
+    """
+    storage = storage or default_storage
+    if data is None:
+        with storage.open(source, "rb") as fh:
+            data = fh.read()
+    written = []
+    for width, height, fmt, payload in render_variants(data):
+        name = variant_name(source, width, fmt)
+        if storage.exists(name):
+            storage.delete(name)
+        storage.save(name, ContentFile(payload))
+        written.append((width, height, fmt, name))
+    return written
+
+
+def record_variants(source, written):
+    """Reemplaza las filas MediaVariant de `source`."""
+    MediaVariant.objects.filter(source=source).delete()
+    MediaVariant.objects.bulk_create([
+        MediaVariant(source=source, width=w, height=h, format=fmt, name=name)
+        for w, h, fmt, name in written
+    ])
+    cache.delete(_cache_key(source))
+
+
+def delete_variants(source, storage=None):
+    """Borra archivos y filas de las variantes de `source`."""
+    storage = storage or default_storage
+    rows = MediaVariant.objects.filter(source=source)
+    for name in rows.values_list("name", flat=True):
+        storage.delete(name)
+    rows.delete()
+    cache.delete(_cache_key(source))
+
+
+def move_variants(source, target):
+    """Pasa las variantes de `source` a `target` (mismo contenido, otro nombre) si este no tiene."""
+    if not MediaVariant.objects.filter(source=target).exists():
+        MediaVariant.objects.filter(source=source).update(source=target)
+    cache.delete(_cache_key(source))
+    cache.delete(_cache_key(target))
+
+
+def ensure_variants(sources):
+    """Genera variantes de los originales que aún no tienen. No lanza excepciones."""
+    sources = {s for s in sources if s}
+    if not sources:
+        return
+    done = set(
+        MediaVariant.objects.filter(source__in=sources).values_list("source", flat=True).distinct()
+    )
+    for source in sources - done:
+        try:
+            record_variants(source, write_variants(source))
+        except Exception:
+            logger.exception("No se pudieron generar variantes de %s", source)
+
+
+_background = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix="variants")
+
+
+def _ensure_variants_job(sources):
+    try:
+        ensure_variants(sources)
+    except Exception:
+        logger.exception("No se pudieron generar variantes de %s", sorted(sources))
+    finally:
+        connection.close()  # conexión propia de este hilo
+
+
+def ensure_variants_later(sources):
+    """
+    ensure_variants() en un hilo de fondo (MEDIA_VARIANTS_IN_BACKGROUND,
+    por defecto True); con False corre en el mismo hilo.
+    """
+    sources = {s for s in sources if s}
+    if not sources:
+        return
+    if getattr(settings, "MEDIA_VARIANTS_IN_BACKGROUND", True):
+        _background.submit(_ensure_variants_job, sources)
+    else:
+        ensure_variants(sources)
+
+
+# -------------------------
+# Lectura (template tag)
+# -------------------------
+def _cache_key(source):
+    return "variants:" + hashlib.md5(source.encode()).hexdigest()
+
+
+def variants_for(source):
+    """{fmt: [(width, height, url), ...]} ordenado por ancho; {} si no hay."""
+    if not source:
+        return {}
+    key = _cache_key(source)
+    found = cache.get(key)
+    if found is None:
+        found = {}
+        for v in MediaVariant.objects.filter(source=source).order_by("format", "width"):
+            found.setdefault(v.format, []).append((v.width, v.height, default_storage.url(v.name)))
+        cache.set(key, found, timeout=VARIANTS_CACHE_FOR)
+    return found
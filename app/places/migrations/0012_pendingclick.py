@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-17 00:59
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0011_alter_venue_highlights_1_alter_venue_highlights_2_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingClick',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('venue', 'Venue'), ('event', 'Evento')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('clicked_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='flyer_image',
+            field=models.ImageField(blank=True, max_length=500, upload_to=''),
+        ),
+    ]
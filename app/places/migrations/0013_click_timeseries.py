@@ -0,0 +1,44 @@
+# Generated by Django 5.1 on 2026-10-17 01:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0012_pendingclick'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClickHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('venue', 'Venue'), ('event', 'Evento')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('hour', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['hour'], name='clickhourly_hour_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'hour'), name='uniq_click_hourly')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ClickRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('venue', 'Venue'), ('event', 'Evento')], max_length=10)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('period', models.CharField(choices=[('day', 'Día'), ('week', 'Semana')], max_length=5)),
+                ('bucket', models.DateField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('commune', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='click_rollups', to='places.commune')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['commune', 'kind', 'period', 'bucket'], name='clickrollup_commune_idx')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'object_id', 'period', 'bucket'), name='uniq_click_rollup')],
+            },
+        ),
+    ]
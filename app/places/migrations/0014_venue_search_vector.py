@@ -0,0 +1,76 @@
+# Generated by Django 5.1 on 2026-10-17 01:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import UnaccentExtension
+from django.conf import settings
+from django.db import migrations
+
+SEARCH_CONFIG = "spanish_unaccent"
+
+
+def create_search_config(apps, schema_editor):
+    """Config de texto en español que además ignora tildes (solo PostgreSQL)."""
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(
+        f"""
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM pg_ts_config WHERE cfgname = '{SEARCH_CONFIG}') THEN
+                CREATE TEXT SEARCH CONFIGURATION {SEARCH_CONFIG} (COPY = spanish);
+                ALTER TEXT SEARCH CONFIGURATION {SEARCH_CONFIG}
+                    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, spanish_stem;
+            END IF;
+        END
+        $$;
+        """
+    )
+
+
+def drop_search_config(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute(f"DROP TEXT SEARCH CONFIGURATION IF EXISTS {SEARCH_CONFIG}")
+
+
+def backfill_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    from django.contrib.postgres.search import SearchVector
+    from django.db.models import Value
+
+    Commune = apps.get_model("places", "Commune")
+    Venue = apps.get_model("places", "Venue")
+    for commune in Commune.objects.only("id", "name"):
+        Venue.objects.filter(Commune=commune).update(
+            search_vector=(
+                SearchVector("name", weight="A", config=SEARCH_CONFIG)
+                + SearchVector(Value(commune.name), weight="B", config=SEARCH_CONFIG)
+                + SearchVector("address", weight="C", config=SEARCH_CONFIG)
+                + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0013_click_timeseries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        UnaccentExtension(),
+        migrations.RunPython(create_search_config, drop_search_config),
+        migrations.AddField(
+            model_name='venue',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='venue_search_vector_gin'),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.1 on 2026-10-17 02:00
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+# (índice, tabla, columna) — índices GIN gin_trgm_ops para búsquedas por similitud
+TRIGRAM_INDEXES = [
+    ("commune_name_trgm", "places_commune", "name"),
+    ("commune_slug_trgm", "places_commune", "slug"),
+    ("venue_name_trgm", "places_venue", "name"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _table, _column in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0014_venue_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
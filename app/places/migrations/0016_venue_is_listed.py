@@ -0,0 +1,43 @@
+# Generated by Django 5.1 on 2026-10-17 01:05
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+
+def backfill_is_listed(apps, schema_editor):
+    """Marca los venues cuyo dueño tiene suscripción efectiva (misma regla que Subscription.active_Q)."""
+    Venue = apps.get_model("places", "Venue")
+    Subscription = apps.get_model("account", "Subscription")
+    now = timezone.now()
+    active = (
+        Q(status="ACTIVE", current_period_end__gt=now) |
+        Q(override_status="ACTIVE", override_until__gt=now) |
+        Q(override_status="ACTIVE", override_until__isnull=True)
+    )
+    Venue.objects.filter(
+        Exists(Subscription.objects.filter(active, user_id=OuterRef("owner_user_id")))
+    ).update(is_listed=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0015_trigram_indexes'),
+        ('account', '0011_guestprofile_commune_alter_guestprofile_city'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='is_listed',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='venue',
+            index=models.Index(condition=models.Q(('is_listed', True)), fields=['Commune', 'name'], name='venue_listed_commune_idx'),
+        ),
+        migrations.RunPython(backfill_is_listed, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.1 on 2026-10-17 01:07
+
+import django.db.models.deletion
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.utils import timezone
+
+
+def backfill_commune_stats(apps, schema_editor):
+    """Primera carga; luego la mantienen los signals y `refresh_commune_stats`."""
+    Commune = apps.get_model("places", "Commune")
+    CommuneStats = apps.get_model("places", "CommuneStats")
+    Venue = apps.get_model("places", "Venue")
+    Event = apps.get_model("places", "Event")
+
+    now = timezone.now()
+    local = timezone.localtime(now)
+    night_end = local.replace(hour=6, minute=0, second=0, microsecond=0)
+    if local >= night_end:
+        night_end += timedelta(days=1)
+
+    def counts(qs):
+        return dict(qs.values("Commune_id").annotate(n=Count("id")).values_list("Commune_id", "n"))
+
+    upcoming = Event.objects.filter(is_published=True, start_at__gte=now)
+    venues = counts(Venue.objects.filter(is_listed=True))
+    events = counts(upcoming)
+    tonight = counts(upcoming.filter(start_at__lt=night_end))
+
+    CommuneStats.objects.bulk_create(
+        [
+            CommuneStats(
+                commune_id=pk,
+                venues_count=venues.get(pk, 0),
+                upcoming_events_count=events.get(pk, 0),
+                tonight_events_count=tonight.get(pk, 0),
+            )
+            for pk in Commune.objects.values_list("pk", flat=True)
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0016_venue_is_listed'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommuneStats',
+            fields=[
+                ('commune', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='places.commune')),
+                ('venues_count', models.PositiveIntegerField(default=0)),
+                ('upcoming_events_count', models.PositiveIntegerField(default=0)),
+                ('tonight_events_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-venues_count', 'commune'], name='communestats_venues_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_commune_stats, migrations.RunPython.noop),
+    ]
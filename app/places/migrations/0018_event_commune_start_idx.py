@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-17 01:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0017_commune_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['Commune', 'start_at', 'id'], name='event_commune_start_idx'),
+        ),
+    ]
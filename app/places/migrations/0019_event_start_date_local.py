@@ -0,0 +1,41 @@
+# Generated by Django 5.1 on 2026-10-17 01:12
+
+from django.conf import settings as django_settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_start_date_local(apps, schema_editor):
+    Event = apps.get_model("places", "Event")
+    if schema_editor.connection.vendor == "postgresql":
+        # Un solo UPDATE en la BD
+        schema_editor.execute(
+            "UPDATE places_event SET start_date_local = (start_at AT TIME ZONE %s)::date",
+            [django_settings.TIME_ZONE],
+        )
+        return
+    tz = timezone.get_default_timezone()
+    events = list(Event.objects.only("id", "start_at"))
+    for e in events:
+        e.start_date_local = timezone.localtime(e.start_at, tz).date()
+    Event.objects.bulk_update(events, ["start_date_local"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0018_event_commune_start_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='start_date_local',
+            field=models.DateField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='event',
+            index=models.Index(fields=['Commune', 'is_published', 'start_date_local'], name='event_commune_day_idx'),
+        ),
+        migrations.RunPython(backfill_start_date_local, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-17 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0019_event_start_date_local'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='venue',
+            name='event_days_anchor',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='event_days_mask',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='venue',
+            name='next_event_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
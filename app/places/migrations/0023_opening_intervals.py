@@ -0,0 +1,112 @@
+# Generated by Django 5.1 on 2026-10-17 01:19
+
+import re
+import unicodedata
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Copia congelada del parser de places/hours.py (al momento de esta migración):
+# los cambios posteriores a hours.py no deben alterar este backfill.
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+_DAYS = ["lun", "mar", "mie", "jue", "vie", "sab", "dom"]
+_ALL_DAYS_RE = re.compile(r"todos los dias|diario|todos los dias de la semana")
+_SEGMENT_RE = re.compile(
+    r"(?P<days>[a-z][a-z ,\-y]*?)\s*"
+    r"(?P<open>\d{1,2})(?:[:.h](?P<open_m>\d{2}))?\s*h?\s*"
+    r"(?:-|a|hasta)\s*"
+    r"(?P<close>\d{1,2})(?:[:.h](?P<close_m>\d{2}))?"
+)
+
+
+def _normalize(value):
+    value = unicodedata.normalize("NFKD", value or "")
+    return "".join(ch for ch in value if not unicodedata.combining(ch)).lower().strip()
+
+
+def _parse_days(text):
+    if _ALL_DAYS_RE.search(text):
+        return list(range(7))
+    text = re.sub(r"\s+a\s+", "-", text)
+    days = []
+    for chunk in re.split(r",|\by\b", text):
+        ends = [_DAYS.index(w[:3]) for w in re.findall(r"[a-z]+", chunk) if w[:3] in _DAYS]
+        if len(ends) >= 2 and "-" in chunk:
+            first, last = ends[0], ends[-1]
+            days.extend((first + i) % 7 for i in range((last - first) % 7 + 1))
+        else:
+            days.extend(ends)
+    return sorted(set(days)) or None
+
+
+def _merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(i) for i in merged]
+
+
+def parse_hours(text):
+    text = _normalize(text).replace("–", "-").replace("—", "-")
+    intervals = []
+    for m in _SEGMENT_RE.finditer(text):
+        days = _parse_days(m.group("days"))
+        if not days:
+            continue
+        open_h, close_h = int(m.group("open")), int(m.group("close"))
+        open_m, close_m = int(m.group("open_m") or 0), int(m.group("close_m") or 0)
+        if open_h > 24 or close_h > 24 or open_m > 59 or close_m > 59:
+            continue
+        opens = open_h * 60 + open_m
+        length = (close_h * 60 + close_m - opens) % MINUTES_PER_DAY or MINUTES_PER_DAY
+        for day in days:
+            start = day * MINUTES_PER_DAY + opens
+            end = start + length
+            if end <= MINUTES_PER_WEEK:
+                intervals.append((start, end))
+            else:
+                intervals.append((start, MINUTES_PER_WEEK))
+                intervals.append((0, end - MINUTES_PER_WEEK))
+    return _merge_intervals(intervals)
+
+
+def parse_existing_hours(apps, schema_editor):
+    Venue = apps.get_model("places", "Venue")
+    OpeningInterval = apps.get_model("places", "OpeningInterval")
+    OpeningInterval.objects.bulk_create(
+        [
+            OpeningInterval(venue_id=venue_id, start_minute=start, end_minute=end)
+            for venue_id, text in Venue.objects.exclude(hours_short="").values_list("id", "hours_short")
+            for start, end in parse_hours(text)
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0022_geocode_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OpeningInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_minute', models.PositiveIntegerField()),
+                ('end_minute', models.PositiveIntegerField()),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='opening_intervals', to='places.venue')),
+            ],
+            options={
+                'ordering': ['venue', 'start_minute'],
+                'indexes': [models.Index(fields=['start_minute', 'end_minute'], name='opening_interval_range_idx')],
+            },
+        ),
+        migrations.RunPython(parse_existing_hours, migrations.RunPython.noop),
+    ]
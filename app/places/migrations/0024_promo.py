@@ -0,0 +1,51 @@
+# Generated by Django 5.1 on 2026-10-17 01:21
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def copy_legacy_promos(apps, schema_editor):
+    Venue = apps.get_model("places", "Venue")
+    Promo = apps.get_model("places", "Promo")
+    fields = ("vgt_promos_1", "vgt_promos_2", "vgt_promos_3")
+    rows = []
+    for venue_id, commune_id, *texts in Venue.objects.values_list("id", "Commune_id", *fields):
+        for slot, text in enumerate(texts, start=1):
+            text = (text or "").strip()
+            if text:
+                rows.append(Promo(
+                    venue_id=venue_id, Commune_id=commune_id, text=text,
+                    sort_order=slot, legacy_slot=slot,
+                ))
+    Promo.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0023_opening_intervals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Promo',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('text', models.CharField(max_length=120)),
+                ('valid_from', models.DateTimeField(default=django.utils.timezone.now)),
+                ('valid_until', models.DateTimeField(blank=True, null=True)),
+                ('weekdays', models.PositiveSmallIntegerField(default=127)),
+                ('sort_order', models.PositiveSmallIntegerField(default=0)),
+                ('legacy_slot', models.PositiveSmallIntegerField(blank=True, editable=False, null=True)),
+                ('Commune', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='promos', to='places.commune')),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='promos', to='places.venue')),
+            ],
+            options={
+                'ordering': ['sort_order', 'pk'],
+                'indexes': [models.Index(fields=['Commune', 'valid_from', 'valid_until'], name='promo_commune_window_idx')],
+                'constraints': [models.UniqueConstraint(fields=('venue', 'legacy_slot'), name='uniq_promo_legacy_slot')],
+            },
+        ),
+        migrations.RunPython(copy_legacy_promos, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.1 on 2026-10-17 01:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0024_promo'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaVariant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(db_index=True, max_length=255)),
+                ('name', models.CharField(max_length=255)),
+                ('format', models.CharField(max_length=8)),
+                ('width', models.PositiveIntegerField()),
+                ('height', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('source', 'format', 'width'), name='uniq_media_variant')],
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1 on 2026-10-17 01:26
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0025_media_variant'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(choices=[('gallery', 'Galería'), ('flyer', 'Flyer de evento')], max_length=10)),
+                ('filename', models.CharField(max_length=255)),
+                ('caption', models.CharField(blank=True, max_length=160)),
+                ('length', models.PositiveBigIntegerField()),
+                ('offset', models.PositiveBigIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('event', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='places.event')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to=settings.AUTH_USER_MODEL)),
+                ('venue', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='places.venue')),
+            ],
+        ),
+    ]
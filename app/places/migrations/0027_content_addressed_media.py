@@ -0,0 +1,44 @@
+# Generated by Django 5.1 on 2026-10-17 01:29
+
+import app.places.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0026_upload_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('size', models.PositiveBigIntegerField()),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='event',
+            name='flyer_image',
+            field=models.ImageField(blank=True, max_length=500, storage=app.places.storage.content_storage, upload_to=''),
+        ),
+        migrations.AlterField(
+            model_name='photo',
+            name='image',
+            field=models.ImageField(storage=app.places.storage.content_storage, upload_to='venues/gallery/%Y/%m/'),
+        ),
+        migrations.AlterField(
+            model_name='venue',
+            name='cover_image',
+            field=models.ImageField(blank=True, storage=app.places.storage.content_storage, upload_to='venues/covers/%Y/%m/'),
+        ),
+        migrations.AlterField(
+            model_name='venue',
+            name='logo',
+            field=models.ImageField(blank=True, storage=app.places.storage.content_storage, upload_to='venues/logos/%Y/%m/'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1 on 2026-10-17 01:57
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_names(apps, schema_editor):
+    Commune = apps.get_model("places", "Commune")
+    CommuneStats = apps.get_model("places", "CommuneStats")
+    CommuneStats.objects.update(
+        name=Subquery(Commune.objects.filter(pk=OuterRef("commune_id")).values("name")[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0027_content_addressed_media'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='communestats',
+            name='communestats_venues_idx',
+        ),
+        migrations.AddField(
+            model_name='communestats',
+            name='name',
+            field=models.CharField(blank=True, max_length=120),
+        ),
+        migrations.RunPython(backfill_names, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='communestats',
+            index=models.Index(fields=['-venues_count', 'name'], name='communestats_venues_idx'),
+        ),
+    ]
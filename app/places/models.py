@@ -1,6 +1,14 @@
 # app/core/models.py
+import uuid
+
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.utils import timezone
+
+from .geo import geohash_encode
+from .storage import content_storage
 
 # -------------------------
 # City (para armar URLs tipo /ciudad/santiago y filtrar)
@@ -62,9 +70,9 @@ class Venue(models.Model):
     name = models.CharField(max_length=180)
     slug = models.SlugField(max_length=210, unique=True)  # ej: "club-midnight-santiago"
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
-    cover_image = models.ImageField(upload_to="venues/covers/%Y/%m/", blank=True)
+    cover_image = models.ImageField(upload_to="venues/covers/%Y/%m/", storage=content_storage, blank=True)
     vibe_tags = models.ManyToManyField(Tag, blank=True, related_name="venues")  # chips como "Bailable"
-    logo = models.ImageField(upload_to="venues/logos/%Y/%m/", blank=True)
+    logo = models.ImageField(upload_to="venues/logos/%Y/%m/", storage=content_storage, blank=True)
 
     # INFO del lugar (sección "Sobre el lugar")
     description = models.TextField(blank=True)
@@ -75,6 +83,12 @@ class Venue(models.Model):
 
     # CONTACTO & REDES (sidebar)
     address = models.CharField(max_length=220, blank=True)
+    # Ubicación para el mapa; geohash se calcula en save() (ver places/geo.py)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    geohash = models.CharField(max_length=12, blank=True, default="", editable=False, db_index=True)
+    # Dirección con la que geocode_venues calculó lat/lon (re-corridas solo tocan cambios)
+    geocoded_address = models.CharField(max_length=220, blank=True, default="", editable=False)
     phone = models.CharField(max_length=30, blank=True)
     website = models.URLField(blank=True)
     instagram = models.URLField(blank=True)
@@ -102,9 +116,43 @@ class Venue(models.Model):
     clicks_count = models.PositiveIntegerField(default=0)
     last_clicked_at = models.DateTimeField(null=True, blank=True)
 
+    # Listado público: True si el dueño tiene suscripción efectiva.
+    # Desnormalizado desde Subscription (ver places/listing.py); no editar a mano.
+    is_listed = models.BooleanField(default=False, editable=False)
+
+    # Agenda resumida (ver places/schedule.py); la mantienen signals y cron.
+    # Bit i de event_days_mask = hay evento publicado el día event_days_anchor + i.
+    next_event_at = models.DateTimeField(null=True, blank=True, editable=False)
+    event_days_mask = models.PositiveIntegerField(default=0, editable=False)
+    event_days_anchor = models.DateField(null=True, blank=True, editable=False)
+
+    # Búsqueda full-text (PostgreSQL): la mantienen los signals, ver places/search.py
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=["search_vector"], name="venue_search_vector_gin"),
+            # Índice parcial: solo los venues listados, ya ordenados por nombre
+            models.Index(
+                fields=["Commune", "name"],
+                condition=models.Q(is_listed=True),
+                name="venue_listed_commune_idx",
+            ),
+        ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        if self.latitude is not None and self.longitude is not None:
+            self.geohash = geohash_encode(float(self.latitude), float(self.longitude))
+        else:
+            self.geohash = ""
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and {"latitude", "longitude"} & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "geohash"}
+        super().save(*args, **kwargs)
+
 
 # -------------------------
 # Event (para "Line-up destacado" y "Próximos eventos")
@@ -128,8 +176,11 @@ class Event(models.Model):
     # Agenda / flyer (lo que muestras en carruseles y grillas)
     start_at = models.DateTimeField()
     end_at = models.DateTimeField(null=True, blank=True)
+    # Día local (America/Santiago) de start_at, para filtros por día y calendario
+    start_date_local = models.DateField(null=True, editable=False)
     flyer_image = models.ImageField(
     blank=True,
+    storage=content_storage,
     max_length=500,  # por ejemplo
 )
 
@@ -148,18 +199,300 @@ class Event(models.Model):
     clicks_count = models.PositiveIntegerField(default=0)
     last_clicked_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Listado por ciudad ordenado por (start_at, id): cursor de EventFeedView
+            models.Index(fields=["Commune", "start_at", "id"], name="event_commune_start_idx"),
+            models.Index(
+                fields=["Commune", "is_published", "start_date_local"], name="event_commune_day_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
+    def save(self, *args, **kwargs):
+        if self.start_at:
+            self.start_date_local = timezone.localtime(
+                self.start_at, timezone.get_default_timezone()
+            ).date()
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "start_at" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "start_date_local"}
+        super().save(*args, **kwargs)
+
+
+# -------------------------
+# Horarios estructurados (derivados de Venue.hours_short, ver places/hours.py)
+# -------------------------
+class OpeningInterval(models.Model):
+    """
+    Intervalo semanal de apertura en minutos desde el lunes 00:00 (hora
+    local), fin exclusivo. Los cierres pasada la medianoche ya vienen sumados
+    al día siguiente y lo que cruza el domingo se parte en dos filas.
+    """
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name="opening_intervals")
+    start_minute = models.PositiveIntegerField()
+    end_minute = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ["venue", "start_minute"]
+        indexes = [
+            models.Index(fields=["start_minute", "end_minute"], name="opening_interval_range_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.venue_id}: {self.start_minute}-{self.end_minute}"
+
+
+# -------------------------
+# Promos con vigencia (sección "Ofertas" del home y ficha del venue)
+# -------------------------
+class Promo(models.Model):
+    """
+    Promo de un venue con ventana de vigencia y días de la semana. Commune
+    se copia del venue para filtrar por comuna sin JOIN. Las filas con
+    legacy_slot reflejan Venue.vgt_promos_1..3 (ver places/promos.py).
+    """
+    ALL_WEEKDAYS = 0b1111111  # bit 0 = lunes ... bit 6 = domingo
+
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name="promos")
+    Commune = models.ForeignKey(Commune, on_delete=models.CASCADE, related_name="promos", editable=False)
+    text = models.CharField(max_length=120)
+    valid_from = models.DateTimeField(default=timezone.now)
+    valid_until = models.DateTimeField(null=True, blank=True)  # vacío = sin vencimiento
+    weekdays = models.PositiveSmallIntegerField(default=ALL_WEEKDAYS)
+    sort_order = models.PositiveSmallIntegerField(default=0)
+    legacy_slot = models.PositiveSmallIntegerField(null=True, blank=True, editable=False)
+
+    class Meta:
+        ordering = ["sort_order", "pk"]
+        indexes = [
+            models.Index(fields=["Commune", "valid_from", "valid_until"], name="promo_commune_window_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=["venue", "legacy_slot"], name="uniq_promo_legacy_slot"),
+        ]
+
+    def __str__(self):
+        return f"{self.venue_id}: {self.text}"
+
+    def save(self, *args, **kwargs):
+        # Siempre la comuna del venue (el venue pudo cambiar en el admin);
+        # si el venue cambia de comuna, sync_legacy_promos mueve sus promos
+        if self.venue_id:
+            self.Commune_id = self.venue.Commune_id
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "venue" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "Commune"}
+        super().save(*args, **kwargs)
+
 
 # -------------------------
 # Galería de fotos del venue (para la sección "Galería")
 # -------------------------
 class Photo(models.Model):
     venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name="photos")
-    image = models.ImageField(upload_to="venues/gallery/%Y/%m/")
+    image = models.ImageField(upload_to="venues/gallery/%Y/%m/", storage=content_storage)
     caption = models.CharField(max_length=160, blank=True)
     sort_order = models.PositiveSmallIntegerField(default=0)
 
     def __str__(self):
         return self.caption or f"Foto {self.pk}"
+
+
+# -------------------------
+# Buffer de clicks (write-behind de clicks_count)
+# -------------------------
+class PendingClick(models.Model):
+    """
+    Un click aún no aplicado a Venue/Event.clicks_count. track_click solo
+    inserta aquí (append-only, sin lock sobre la fila del venue) y el comando
+    flush_clicks los agrega y aplica en lote.
+    """
+    KIND_CHOICES = [
+        ("venue", "Venue"),
+        ("event", "Evento"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    clicked_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id} @ {self.clicked_at:%Y-%m-%d %H:%M}"
+
+
+# -------------------------
+# Series de tiempo de clicks (insights para dueños)
+# -------------------------
+class ClickHourly(models.Model):
+    """Clicks por hora (UTC) y objeto. Lo llena flush_clicks; se poda por retención."""
+    kind = models.CharField(max_length=10, choices=PendingClick.KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    hour = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["kind", "object_id", "hour"], name="uniq_click_hourly"),
+        ]
+        indexes = [
+            models.Index(fields=["hour"], name="clickhourly_hour_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id} {self.hour:%Y-%m-%d %H}h: {self.count}"
+
+
+class ClickRollup(models.Model):
+    """
+    Agregados diarios/semanales (fecha local America/Santiago) calculados
+    desde ClickHourly por rollup_clicks. Los dashboards leen solo de aquí.
+    """
+    DAY, WEEK = "day", "week"
+    PERIOD_CHOICES = [
+        (DAY, "Día"),
+        (WEEK, "Semana"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=PendingClick.KIND_CHOICES)
+    object_id = models.PositiveBigIntegerField()
+    commune = models.ForeignKey(Commune, on_delete=models.CASCADE, related_name="click_rollups")
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    bucket = models.DateField()  # día, o lunes de la semana
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["kind", "object_id", "period", "bucket"], name="uniq_click_rollup"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["commune", "kind", "period", "bucket"], name="clickrollup_commune_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}#{self.object_id} {self.period} {self.bucket}: {self.count}"
+
+
+# -------------------------
+# Estadísticas por comuna (desnormalizadas)
+# -------------------------
+class CommuneStats(models.Model):
+    """
+    Contadores por comuna para el índice de ciudades y "Ciudades destacadas".
+    Los mantienen los signals de Venue/Event y `refresh_commune_stats`
+    (cron) los reconcilia; ver places/stats.py.
+    """
+    commune = models.OneToOneField(
+        Commune, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    name = models.CharField(max_length=120, blank=True)              # copia de Commune.name (desempate)
+    venues_count = models.PositiveIntegerField(default=0)           # venues listados
+    upcoming_events_count = models.PositiveIntegerField(default=0)  # publicados, desde ahora
+    tonight_events_count = models.PositiveIntegerField(default=0)   # publicados, esta noche
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-venues_count", "name"], name="communestats_venues_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.commune_id}: {self.venues_count} venues, {self.upcoming_events_count} eventos"
+
+
+# -------------------------
+# Caché persistente de geocodificación (direcciones -> coordenadas)
+# -------------------------
+class GeocodeCache(models.Model):
+    """
+    Resultado por dirección normalizada (ver places/geocoding.py). Guarda
+    también los "no encontrados" (latitude/longitude nulos) para no volver
+    a consultar al proveedor en cada corrida de geocode_venues.
+    """
+    key = models.CharField(max_length=255, unique=True)  # dirección normalizada
+    address = models.CharField(max_length=255)            # primera dirección cruda vista
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    provider = models.CharField(max_length=20)
+    precision = models.CharField(max_length=20, blank=True)  # "commune", "street", ...
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key} -> {self.latitude},{self.longitude} ({self.provider})"
+
+
+# -------------------------
+# Archivos guardados por contenido (ver places/storage.py)
+# -------------------------
+class Blob(models.Model):
+    """Un archivo "cas/…" del storage; refcount = cuántos campos lo usan."""
+    key = models.CharField(max_length=255, unique=True)
+    size = models.PositiveBigIntegerField()
+    refcount = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key} ×{self.refcount}"
+
+
+# -------------------------
+# Derivados responsivos de imágenes (ver places/media.py)
+# -------------------------
+class MediaVariant(models.Model):
+    """Versión redimensionada (WebP/AVIF) de un archivo subido, por ruta en el storage."""
+    source = models.CharField(max_length=255, db_index=True)  # nombre del original
+    name = models.CharField(max_length=255)                    # nombre de la variante
+    format = models.CharField(max_length=8)                    # "webp", "avif"
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["source", "format", "width"], name="uniq_media_variant"),
+        ]
+
+    def __str__(self):
+        return f"{self.source} {self.width}w {self.format}"
+
+
+# -------------------------
+# Subidas reanudables por partes (ver places/resumable.py)
+# -------------------------
+class UploadSession(models.Model):
+    """
+    Archivo que el cliente sube en varios PATCH. Los bytes recibidos van a
+    un .part en UPLOAD_SESSION_DIR; `offset` es cuánto de ese archivo ya
+    pasó la verificación de checksum.
+    """
+    TARGET_GALLERY = "gallery"
+    TARGET_FLYER = "flyer"
+    TARGET_CHOICES = [
+        (TARGET_GALLERY, "Galería"),
+        (TARGET_FLYER, "Flyer de evento"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="upload_sessions"
+    )
+    venue = models.ForeignKey(Venue, on_delete=models.CASCADE, related_name="upload_sessions")
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, null=True, blank=True)
+    target = models.CharField(max_length=10, choices=TARGET_CHOICES)
+    filename = models.CharField(max_length=255)
+    caption = models.CharField(max_length=160, blank=True)
+    length = models.PositiveBigIntegerField()          # tamaño total declarado
+    offset = models.PositiveBigIntegerField(default=0)  # bytes verificados
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.length})"
+
+    @property
+    def is_complete(self):
+        return self.offset == self.length
@@ -0,0 +1,101 @@
+# app/places/nearby.py
+"""
+"Cerca de mí": venues y próximos eventos ordenados por distancia.
+
+1. El círculo (lat, lon, radio) se convierte en bbox y este en unos pocos
+   prefijos de geohash (geo.in_bbox): la query toca solo esas celdas del
+   índice, no la tabla completa.
+2. Sobre ese conjunto acotado se calcula la distancia exacta (haversine)
+   en una pasada y se descarta lo que cae fuera del radio.
+3. Venues y eventos se mezclan en un solo orden (distancia, tipo, id) y se
+   paginan con el cursor firmado de pagination.py.
+"""
+from datetime import timedelta
+
+from django.urls import reverse
+from django.utils import timezone
+
+from .geo import haversine_km, in_bbox, radius_bbox
+from .models import Event, Venue
+from .pagination import InvalidCursor, decode_cursor, encode_cursor
+
+# Radio por defecto y máximo (km)
+DEFAULT_RADIUS_KM = 2.0
+MAX_RADIUS_KM = 20.0
+
+# Eventos "próximos": desde ahora hasta N días
+UPCOMING_DAYS = 14
+
+
+def nearby_items(lat, lon, radius_km, now=None):
+    """Lista ordenada por (distance_km, type, id) de venues y eventos dentro del radio."""
+    now = now or timezone.now()
+    candidates = in_bbox(
+        Venue.objects.filter(is_listed=True, latitude__isnull=False, longitude__isnull=False),
+        radius_bbox(lat, lon, radius_km),
+    ).values("id", "slug", "name", "address", "category", "latitude", "longitude")
+
+    venues = {}
+    for v in candidates:
+        distance = haversine_km(lat, lon, float(v["latitude"]), float(v["longitude"]))
+        if distance <= radius_km:
+            venues[v["id"]] = (round(distance, 4), v)
+
+    items = [
+        {
+            "type": "venue",
+            "id": v["id"],
+            "distance_km": distance,
+            "name": v["name"],
+            "address": v["address"],
+            "category": v["category"],
+            "lat": float(v["latitude"]),
+            "lon": float(v["longitude"]),
+            "href": reverse("venue-detail", kwargs={"slug": v["slug"]}),
+        }
+        for distance, v in venues.values()
+    ]
+
+    if venues:
+        events = (
+            Event.objects
+            .filter(
+                venue_id__in=venues.keys(),
+                is_published=True,
+                start_at__gte=now,
+                start_at__lt=now + timedelta(days=UPCOMING_DAYS),
+            )
+            .values("id", "title", "start_at", "external_ticket_url", "venue_id")
+        )
+        for e in events:
+            distance, v = venues[e["venue_id"]]
+            items.append({
+                "type": "event",
+                "id": e["id"],
+                "distance_km": distance,
+                "name": e["title"],
+                "venue": v["name"],
+                "start_at": timezone.localtime(e["start_at"]).isoformat(),
+                "lat": float(v["latitude"]),
+                "lon": float(v["longitude"]),
+                "href": e["external_ticket_url"] or reverse("venue-detail", kwargs={"slug": v["slug"]}),
+            })
+
+    items.sort(key=lambda item: (item["distance_km"], item["type"], item["id"]))
+    return items
+
+
+def nearby_page(lat, lon, radius_km, cursor=None, limit=20):
+    """(items, next_cursor) después del cursor; InvalidCursor si no es válido."""
+    items = nearby_items(lat, lon, radius_km)
+    if cursor:
+        after = decode_cursor(cursor)
+        if len(after) != 3:
+            raise InvalidCursor("cursor de otro listado")
+        after = tuple(after)
+        items = [i for i in items if (i["distance_km"], i["type"], i["id"]) > after]
+
+    if len(items) <= limit:
+        return items, None
+    last = items[limit - 1]
+    return items[:limit], encode_cursor([last["distance_km"], last["type"], last["id"]])
@@ -0,0 +1,82 @@
+# app/places/pagination.py
+"""
+Paginación por cursor (keyset) para los listados JSON / scroll infinito.
+
+En vez de OFFSET + COUNT(*) en cada página, se ordena por una clave única
+(ej. start_at, id) y cada página pide "lo que viene después del último
+elemento visto": el costo no crece con la profundidad de la página.
+
+El cursor es opaco y firmado (django.core.signing), así que el cliente no
+puede fabricarlo ni depende de su formato. El total se calcula solo en la
+primera página y con tope (capped_count).
+"""
+from datetime import datetime
+
+from django.core import signing
+from django.db.models import Q
+
+CURSOR_SALT = "places.cursor"
+
+# Hasta cuántas filas contamos; sobre esto el total se informa como "N+"
+COUNT_CAP = 1000
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def _dump(value):
+    return {"dt": value.isoformat()} if isinstance(value, datetime) else value
+
+
+def _load(value):
+    return datetime.fromisoformat(value["dt"]) if isinstance(value, dict) else value
+
+
+def encode_cursor(values) -> str:
+    return signing.dumps([_dump(v) for v in values], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(token: str):
+    try:
+        return [_load(v) for v in signing.loads(token, salt=CURSOR_SALT)]
+    except (signing.BadSignature, TypeError, ValueError, KeyError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def _after(fields, values):
+    """(a, b, c) > (va, vb, vc) expandido a ORs (todas las claves ascendentes)."""
+    condition = Q()
+    for i, field in enumerate(fields):
+        step = Q(**{f"{field}__gt": values[i]})
+        for prev_field, prev_value in zip(fields[:i], values[:i]):
+            step &= Q(**{prev_field: prev_value})
+        condition |= step
+    return condition
+
+
+def keyset_page(qs, fields, cursor=None, limit=24):
+    """
+    Devuelve (items, next_cursor) ordenando `qs` por `fields` (ascendente,
+    el último debe ser único, ej. "id"). next_cursor es None en la última página.
+    """
+    qs = qs.order_by(*fields)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(fields):
+            raise InvalidCursor("cursor de otro listado")
+        qs = qs.filter(_after(fields, values))
+
+    items = list(qs[:limit + 1])
+    if len(items) <= limit:
+        return items, None
+
+    items = items[:limit]
+    last = items[-1]
+    return items, encode_cursor([getattr(last, f) for f in fields])
+
+
+def capped_count(qs, cap=COUNT_CAP):
+    """(total, es_mayor) contando como máximo cap+1 filas."""
+    n = qs.order_by()[:cap + 1].count()
+    return min(n, cap), n > cap
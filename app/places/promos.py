@@ -0,0 +1,48 @@
+# app/places/promos.py
+"""
+Promos vigentes (modelo Promo) y sincronización con los campos legacy.
+
+Los formularios de dueño siguen editando Venue.vgt_promos_1..3; cada campo
+se refleja en una Promo con legacy_slot 1..3 (sin vencimiento, todos los
+días), así el home y la ficha leen solo de Promo. Las promos con ventana
+o días específicos se cargan desde el admin.
+"""
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Promo
+
+LEGACY_FIELDS = ("vgt_promos_1", "vgt_promos_2", "vgt_promos_3")
+
+
+def active_promos(qs=None, now=None):
+    """Promos vigentes en `now`: dentro de la ventana y en su día de la semana (local)."""
+    now = now or timezone.now()
+    weekday_bit = 1 << timezone.localtime(now, timezone.get_default_timezone()).weekday()
+    qs = Promo.objects.all() if qs is None else qs
+    return (
+        qs.filter(valid_from__lte=now)
+        .filter(Q(valid_until__isnull=True) | Q(valid_until__gt=now))
+        .alias(weekday_hit=F("weekdays").bitand(weekday_bit))
+        .filter(weekday_hit__gt=0)
+    )
+
+
+def sync_legacy_promos(venue):
+    """Crea/actualiza/borra las Promo legacy del venue y mantiene su Commune al día."""
+    existing = {p.legacy_slot: p for p in venue.promos.filter(legacy_slot__isnull=False)}
+    for slot, field in enumerate(LEGACY_FIELDS, start=1):
+        text = (getattr(venue, field) or "").strip()
+        promo = existing.get(slot)
+        if not text:
+            if promo:
+                promo.delete()
+        elif promo is None:
+            Promo.objects.create(
+                venue=venue, Commune_id=venue.Commune_id, text=text,
+                sort_order=slot, legacy_slot=slot,
+            )
+        elif promo.text != text:
+            promo.text = text
+            promo.save(update_fields=["text"])
+    venue.promos.exclude(Commune_id=venue.Commune_id).update(Commune_id=venue.Commune_id)
@@ -0,0 +1,112 @@
+# app/places/refdata.py
+"""
+Datos de referencia en memoria (Commune, Tag).
+
+Cada worker carga la tabla completa una vez en un Snapshot inmutable
+(tupla ordenada + mapas por id, slug y nombre normalizado) y lo reutiliza
+mientras la versión del catálogo no cambie. Los signals de post_save /
+post_delete cambian la versión compartida (caching.catalog_version) y cada
+worker recarga de forma perezosa en su siguiente lectura.
+
+Las estructuras derivadas (trie del autocompletado, índice de trigramas)
+se cuelgan del snapshot con `derived()` y se reconstruyen con él.
+
+Las instancias se comparten entre requests: tratarlas como solo lectura.
+"""
+import threading
+import unicodedata
+
+from django.utils.text import slugify
+
+from .caching import catalog_version
+from .models import Commune, Tag
+
+
+def normalize(value: str) -> str:
+    """Minúsculas y sin tildes ("Ñuñoa" -> "nunoa")."""
+    value = unicodedata.normalize("NFKD", value or "")
+    return "".join(ch for ch in value if not unicodedata.combining(ch)).lower().strip()
+
+
+class Snapshot:
+    """Filas de una tabla en un momento dado, con índices de búsqueda."""
+
+    def __init__(self, version, rows):
+        self.version = version
+        self.rows = tuple(rows)
+        self.by_id = {row.pk: row for row in self.rows}
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def derived(self, name, builder):
+        """Estructura calculada una vez por snapshot: builder(snapshot)."""
+        try:
+            return self._derived[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._derived:
+                self._derived[name] = builder(self)
+        return self._derived[name]
+
+
+class Registry:
+    """Snapshot vigente de una tabla, recargado cuando cambia su versión."""
+
+    def __init__(self, name, loader):
+        self.name = name
+        self._loader = loader
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Snapshot:
+        version = catalog_version(self.name)
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = Snapshot(version, self._loader())
+            return self._snapshot
+
+
+communes = Registry("communes", lambda: Commune.objects.order_by("name"))
+tags = Registry("tags", lambda: Tag.objects.order_by("name"))
+
+
+# -------------------------
+# Comunas
+# -------------------------
+def _commune_keys(snapshot):
+    """Mapa slug / nombre normalizado -> Commune."""
+    keys = {}
+    for c in snapshot.rows:
+        keys.setdefault(normalize(c.name), c)
+        keys.setdefault(normalize(c.slug), c)
+    return keys
+
+
+def all_communes():
+    """Todas las comunas ordenadas por nombre."""
+    return communes.get().rows
+
+
+def commune_by_id(pk):
+    return communes.get().by_id.get(pk)
+
+
+def find_commune(value):
+    """Comuna por slug o nombre exacto, sin distinguir mayúsculas ni tildes."""
+    folded = normalize(value)
+    if not folded:
+        return None
+    keys = communes.get().derived("keys", _commune_keys)
+    return keys.get(folded) or keys.get(slugify(folded))
+
+
+# -------------------------
+# Tags
+# -------------------------
+def all_tags():
+    """Todos los tags ordenados por nombre."""
+    return tags.get().rows
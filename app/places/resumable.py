@@ -0,0 +1,244 @@
+# app/places/resumable.py
+"""
+Subidas reanudables por partes (estilo tus) para fotos de galería y flyers.
+
+    POST   /subidas/                  crea la sesión (venue, target, filename, length)
+    HEAD   /subidas/<id>/             Upload-Offset: cuánto ya llegó
+    PATCH  /subidas/<id>/             Upload-Offset + Upload-Checksum + bytes
+    POST   /subidas/<id>/finalizar/   entrega el archivo a Photo / Event.flyer_image
+    DELETE /subidas/<id>/             descarta
+
+- Cada PATCH trae el checksum de su parte ("sha256 <base64>", como tus).
+  Los bytes se escriben al .part mientras se calcula el hash; si no calza,
+  el archivo se trunca al offset anterior y la parte se vuelve a mandar.
+- Un PATCH a la vez por sesión (flock sobre el .part). Si el proceso murió
+  a mitad de una parte, el .part se trunca al último offset verificado.
+- Cada PATCH extiende expires_at; `expire_upload_sessions` borra sesiones
+  vencidas y sus .part.
+- Al finalizar, el .part se abre y se pasa como File al campo de imagen:
+  el storage lo copia por chunks (multipart en R2), sin leerlo a memoria.
+"""
+import base64
+import fcntl
+import hashlib
+import os
+import uuid
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import Photo, UploadSession
+from .storage import sniff_image
+from .uploads import MAX_IMAGE_BYTES
+
+# Máximo por PATCH; el cliente elige el tamaño de parte por debajo de esto
+MAX_CHUNK_BYTES = 8 * 1024 * 1024
+READ_BLOCK = 64 * 1024
+
+_CHECKSUM_ALGORITHMS = {"sha256", "sha1", "md5"}
+
+
+class UploadError(Exception):
+    """Error del protocolo; `status` es el código HTTP que devuelve la vista."""
+    status = 400
+
+
+class OffsetMismatch(UploadError):
+    status = 409
+
+
+class SessionBusy(UploadError):
+    status = 423
+
+
+class TooLarge(UploadError):
+    status = 413
+
+
+class SessionGone(UploadError):
+    status = 404
+
+
+class ChecksumMismatch(UploadError):
+    status = 460  # código de la extensión checksum de tus
+
+
+def part_path(session):
+    return Path(settings.UPLOAD_SESSION_DIR) / f"{session.pk}.part"
+
+
+def _expiry():
+    return timezone.now() + timedelta(seconds=settings.UPLOAD_SESSION_TTL)
+
+
+def create_session(user, venue, target, filename, length, event=None, caption=""):
+    if target not in dict(UploadSession.TARGET_CHOICES):
+        raise UploadError("target inválido")
+    if length <= 0:
+        raise UploadError("length inválido")
+    if length > MAX_IMAGE_BYTES:
+        raise TooLarge(f"supera {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+    if event is not None and event.venue_id != venue.pk:
+        raise UploadError("el evento no es de este venue")
+
+    session = UploadSession.objects.create(
+        user=user,
+        venue=venue,
+        event=event if target == UploadSession.TARGET_FLYER else None,
+        target=target,
+        filename=os.path.basename(filename)[:255] or "foto",
+        caption=caption[:160],
+        length=length,
+        expires_at=_expiry(),
+    )
+    path = part_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return session
+
+
+def parse_checksum(header):
+    """"sha256 <base64>" -> (algoritmo, digest en bytes)."""
+    try:
+        algorithm, encoded = (header or "").split(" ", 1)
+        digest = base64.b64decode(encoded.strip(), validate=True)
+    except ValueError:
+        raise UploadError("Upload-Checksum inválido") from None
+    algorithm = algorithm.lower()
+    if algorithm not in _CHECKSUM_ALGORITHMS:
+        raise UploadError(f"algoritmo de checksum no soportado: {algorithm}")
+    return algorithm, digest
+
+
+def write_chunk(session, offset, stream, size, checksum):
+    """
+    Agrega `size` bytes de `stream` en `offset` y verifica su checksum.
+    Devuelve el nuevo offset; levanta UploadError (y subclases) si no aplica.
+    """
+    if offset != session.offset:
+        raise OffsetMismatch(f"offset esperado {session.offset}")
+    if size > MAX_CHUNK_BYTES or offset + size > session.length:
+        raise TooLarge("la parte excede el tamaño declarado")
+    algorithm, expected = parse_checksum(checksum)
+
+    with open(part_path(session), "r+b") as fh:
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise SessionBusy("otra parte se está escribiendo") from None
+        # Relee el offset con el lock tomado: otro PATCH pudo terminar antes
+        session.refresh_from_db(fields=["offset"])
+        if offset != session.offset:
+            raise OffsetMismatch(f"offset esperado {session.offset}")
+
+        fh.truncate(offset)
+        fh.seek(offset)
+        digest = hashlib.new(algorithm)
+        received = 0
+        while received < size:
+            block = stream.read(min(READ_BLOCK, size - received))
+            if not block:
+                break
+            digest.update(block)
+            fh.write(block)
+            received += len(block)
+
+        if received != size or digest.digest() != expected:
+            fh.truncate(offset)
+            raise ChecksumMismatch("la parte llegó incompleta o con otro checksum")
+        fh.flush()
+        os.fsync(fh.fileno())
+
+        session.offset = offset + size
+        session.expires_at = _expiry()
+        session.save(update_fields=["offset", "expires_at"])
+    return session.offset
+
+
+def finalize_upload(session, event=None):
+    """
+    Entrega el archivo completo a su destino y borra la sesión. Devuelve la
+    Photo creada o el Event actualizado.
+    """
+    event = event or session.event
+    if not session.is_complete:
+        raise OffsetMismatch(f"faltan {session.length - session.offset} bytes")
+    if session.target == UploadSession.TARGET_FLYER:
+        if event is None:
+            raise UploadError("falta el evento del flyer")
+        if event.venue_id != session.venue_id:
+            raise UploadError("el evento no es de este venue")
+
+    path = part_path(session)
+    with transaction.atomic():
+        # Dos finalizar de la misma sesión (reintento tras timeout): el
+        # segundo espera el lock y ya no encuentra la sesión
+        if not UploadSession.objects.select_for_update().filter(pk=session.pk).exists():
+            raise SessionGone("la subida ya se finalizó o expiró")
+
+        with open(path, "rb") as fh:
+            ext = sniff_image(fh.read(16))
+            if ext is None:
+                raise UploadError("no es una imagen JPG, PNG, GIF, WebP o AVIF")
+            fh.seek(0)
+            base = os.path.splitext(session.filename)[0] or "foto"
+            upload = File(fh, name=f"{base}.{ext}")
+
+            if session.target == UploadSession.TARGET_GALLERY:
+                last = Photo.objects.filter(venue=session.venue).aggregate(m=Max("sort_order"))["m"]
+                result = Photo.objects.create(
+                    venue=session.venue,
+                    image=upload,
+                    caption=session.caption,
+                    sort_order=0 if last is None else last + 1,
+                )
+            else:
+                event.flyer_image.save(upload.name, upload, save=True)
+                result = event
+        session.delete()
+    path.unlink(missing_ok=True)
+    return result
+
+
+def discard_session(session):
+    part_path(session).unlink(missing_ok=True)
+    session.delete()
+
+
+def expire_sessions(now=None):
+    """Borra sesiones vencidas y .part sin sesión. Devuelve cuántas sesiones borró."""
+    now = now or timezone.now()
+    expired = 0
+    for session in UploadSession.objects.filter(expires_at__lt=now).iterator():
+        discard_session(session)
+        expired += 1
+
+    # .part huérfanos (sesión borrada por cascade, proceso caído al finalizar)
+    directory = Path(settings.UPLOAD_SESSION_DIR)
+    if directory.is_dir():
+        live = {str(pk) for pk in UploadSession.objects.values_list("pk", flat=True)}
+        cutoff = now.timestamp() - settings.UPLOAD_SESSION_TTL
+        for path in directory.glob("*.part"):
+            if path.stem not in live and path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
+    return expired
+
+
+def pending_flyer(user, venue, upload_id):
+    """Sesión de flyer completa de `user` para `venue` (la usa EventCreateView), o None."""
+    try:
+        upload_id = uuid.UUID(str(upload_id))
+    except ValueError:
+        return None
+    return UploadSession.objects.filter(
+        pk=upload_id,
+        user=user,
+        venue=venue,
+        target=UploadSession.TARGET_FLYER,
+        expires_at__gte=timezone.now(),
+    ).first()
@@ -0,0 +1,104 @@
+# app/places/schedule.py
+"""
+Resumen de agenda por venue para el filtro "when" del listado por ciudad.
+
+Cada venue guarda:
+- next_event_at: inicio del próximo evento publicado.
+- event_days_mask: bit i encendido si hay un evento publicado el día local
+  event_days_anchor + i (ventana de SCHEDULE_DAYS días).
+
+Así "venues con algo hoy / la próxima semana" es un AND de bits sobre las
+filas del listado, sin JOIN + DISTINCT contra events. Los signals de Event
+recalculan los venues afectados y `python manage.py roll_venue_schedules`
+(cron, pasada la medianoche) corre la ventana para todos. Si la ventana no
+está al día (el cron no corrió), venues_with_events_between() vuelve al
+EXISTS sobre events, que siempre es correcto.
+"""
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import Exists, F, Min, OuterRef
+from django.utils import timezone
+
+from .dates import today_local
+from .models import Event, Venue
+
+SCHEDULE_DAYS = 14
+
+# Día local con el que quedó anclada la ventana de todos los venues
+SCHEDULE_ANCHOR_KEY = "venueschedule:anchor"
+
+
+def refresh_venue_schedules(venue_ids=None, today=None) -> int:
+    """
+    Recalcula next_event_at y la máscara de días de `venue_ids` (o de
+    todos). Devuelve cuántos venues escribió.
+    """
+    today = today or today_local()
+    window_end = today + timedelta(days=SCHEDULE_DAYS)
+
+    venues = Venue.objects.all()
+    events = Event.objects.filter(is_published=True, venue__isnull=False)
+    if venue_ids is not None:
+        venue_ids = {pk for pk in venue_ids if pk}
+        if not venue_ids:
+            return 0
+        venues = venues.filter(pk__in=venue_ids)
+        events = events.filter(venue_id__in=venue_ids)
+
+    next_at = dict(
+        events.filter(start_at__gte=timezone.now())
+        .values("venue_id").annotate(next_at=Min("start_at"))
+        .values_list("venue_id", "next_at")
+    )
+    masks = {}
+    days = (
+        events.filter(start_date_local__gte=today, start_date_local__lt=window_end)
+        .values_list("venue_id", "start_date_local").distinct()
+    )
+    for venue_id, day in days:
+        masks[venue_id] = masks.get(venue_id, 0) | (1 << (day - today).days)
+
+    rows = []
+    for venue in venues.only("id"):
+        venue.next_event_at = next_at.get(venue.pk)
+        venue.event_days_mask = masks.get(venue.pk, 0)
+        venue.event_days_anchor = today
+        rows.append(venue)
+    Venue.objects.bulk_update(
+        rows, ["next_event_at", "event_days_mask", "event_days_anchor"], batch_size=500
+    )
+
+    if venue_ids is None:
+        cache.set(SCHEDULE_ANCHOR_KEY, today.isoformat(), timeout=None)
+    return len(rows)
+
+
+def days_mask(start, end, anchor):
+    """Bits de los días [start, end) relativos a anchor, o None si salen de la ventana."""
+    first, last = (start - anchor).days, (end - anchor).days
+    if first < 0 or last > SCHEDULE_DAYS or first >= last:
+        return None
+    return ((1 << last) - 1) ^ ((1 << first) - 1)
+
+
+def venues_with_events_between(qs, start, end):
+    """Filtra `qs` (Venue) a los que tienen eventos publicados en los días locales [start, end)."""
+    today = today_local()
+    bits = days_mask(start, end, today)
+    if bits is not None and cache.get(SCHEDULE_ANCHOR_KEY) == today.isoformat():
+        return (
+            qs.filter(event_days_anchor=today)
+            .alias(event_days_hit=F("event_days_mask").bitand(bits))
+            .filter(event_days_hit__gt=0)
+        )
+
+    # Ventana vencida o fuera de rango: EXISTS directo sobre events
+    return qs.filter(Exists(
+        Event.objects.filter(
+            venue=OuterRef("pk"),
+            is_published=True,
+            start_date_local__gte=start,
+            start_date_local__lt=end,
+        )
+    ))
@@ -0,0 +1,77 @@
+# app/places/search.py
+"""
+Búsqueda full-text de venues.
+
+En PostgreSQL cada Venue mantiene `search_vector` (config `spanish_unaccent`:
+stemming en español y sin tildes) con pesos nombre > comuna > dirección >
+descripción, indexado con GIN. Los signals lo recalculan al guardar un Venue
+o al renombrar su comuna. En otros motores (db.sqlite3 de desarrollo) se usa
+el filtro con icontains de siempre.
+"""
+import re
+
+from django.db import connection
+from django.db.models import F, Q, Value
+
+SEARCH_CONFIG = "spanish_unaccent"
+
+# Campos del fallback sin full-text
+FALLBACK_FIELDS = [
+    "name__icontains",
+    "description__icontains",
+    "address__icontains",
+    "Commune__name__icontains",
+]
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def fts_enabled() -> bool:
+    return connection.vendor == "postgresql"
+
+
+def venue_search_vector(commune_name: str):
+    from django.contrib.postgres.search import SearchVector
+
+    return (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(Value(commune_name or ""), weight="B", config=SEARCH_CONFIG)
+        + SearchVector("address", weight="C", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+    )
+
+
+def refresh_search_vectors(venues_qs, commune_name: str):
+    """Recalcula search_vector de los venues (todos de la misma comuna) en un UPDATE."""
+    if not fts_enabled():
+        return 0
+    return venues_qs.update(search_vector=venue_search_vector(commune_name))
+
+
+def _prefix_tsquery(raw_q: str) -> str:
+    """'club elec' -> 'club:* & elec:*' (cada término como prefijo, AND entre términos)."""
+    return " & ".join(f"{t}:*" for t in _TERM_RE.findall(raw_q))
+
+
+def search_venues(qs, raw_q: str):
+    """Filtra `qs` por el texto `raw_q`, ordenado por relevancia cuando hay FTS."""
+    if fts_enabled():
+        from django.contrib.postgres.search import SearchQuery, SearchRank
+
+        tsquery = _prefix_tsquery(raw_q)
+        if not tsquery:
+            return qs.none()
+        query = SearchQuery(tsquery, config=SEARCH_CONFIG, search_type="raw")
+        return (
+            qs.filter(search_vector=query)
+            .annotate(rank=SearchRank(F("search_vector"), query))
+            .order_by("-rank", "name")
+        )
+
+    # Fallback: cada término debe calzar en al menos un campo (AND entre términos)
+    for term in raw_q.split():
+        term_q = Q()
+        for f in FALLBACK_FIELDS:
+            term_q |= Q(**{f: term})
+        qs = qs.filter(term_q)
+    return qs.order_by("name")
@@ -0,0 +1,239 @@
+# app/places/signals.py
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from app.account.models import Subscription
+
+from .caching import bump_on_commit
+from .hours import set_venue_hours
+from .listing import refresh_listing
+from .media import CONTENT_FIELDS, IMAGE_FIELDS, ensure_variants_later
+from .models import Commune, CommuneStats, Event, Photo, Tag, Venue
+from .promos import sync_legacy_promos
+from .schedule import refresh_venue_schedules
+from .search import refresh_search_vectors
+from .stats import refresh_commune_stats
+from .storage import release_blob
+
+
+# -------------------------
+# Invalidación de cachés por comuna
+# -------------------------
+@receiver(pre_save, sender=Venue)
+@receiver(pre_save, sender=Event)
+@receiver(pre_save, sender=Photo)
+def remember_previous_state(sender, instance, raw=False, **kwargs):
+    """
+    Guarda la comuna anterior para invalidar también esa si cambió; y en el
+    mismo SELECT el venue anterior (Event), el horario anterior (Venue) y
+    los archivos anteriores (refcount de Blob).
+    """
+    instance._previous_commune_id = None
+    instance._previous_venue_id = None
+    instance._previous_hours_short = None
+    instance._previous_files = {}
+    files = CONTENT_FIELDS[sender]
+    # Campos con archivo nuevo en este save: storage.save sumará una referencia
+    # aunque el contenido (y por lo tanto la clave) sea el mismo de antes
+    instance._resaved_files = {
+        f for f in files if getattr(instance, f) and not getattr(instance, f)._committed
+    }
+    if raw or not instance.pk:
+        return
+    if sender is Photo:
+        previous = sender.objects.filter(pk=instance.pk).values_list(*files).first()
+        instance._previous_files = dict(zip(files, previous or ()))
+        return
+    if sender is Event:
+        previous = sender.objects.filter(pk=instance.pk).values_list("Commune_id", "venue_id", *files).first()
+        instance._previous_commune_id, instance._previous_venue_id = previous[:2] if previous else (None, None)
+    else:
+        previous = sender.objects.filter(pk=instance.pk).values_list("Commune_id", "hours_short", *files).first()
+        instance._previous_commune_id, instance._previous_hours_short = previous[:2] if previous else (None, None)
+    instance._previous_files = dict(zip(files, previous[2:] if previous else ()))
+
+
+@receiver(post_save, sender=Venue)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Venue)
+@receiver(post_delete, sender=Event)
+def invalidate_commune_caches(sender, instance, **kwargs):
+    bump_on_commit(commune_ids={instance.Commune_id, getattr(instance, "_previous_commune_id", None)})
+
+
+# -------------------------
+# CommuneStats (conteos por comuna)
+# -------------------------
+@receiver(post_save, sender=Venue)
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Venue)
+@receiver(post_delete, sender=Event)
+def refresh_stats_for_communes(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: se reconcilia con `refresh_commune_stats`
+    refresh_commune_stats({instance.Commune_id, getattr(instance, "_previous_commune_id", None)})
+
+
+# -------------------------
+# Horarios estructurados (OpeningInterval desde hours_short)
+# -------------------------
+@receiver(post_save, sender=Venue)
+def refresh_opening_intervals(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return  # loaddata: se reconcilia con `parse_opening_hours`
+    if created or instance.hours_short != getattr(instance, "_previous_hours_short", None):
+        set_venue_hours(instance)
+
+
+# -------------------------
+# Promos (Venue.vgt_promos_1..3 -> Promo)
+# -------------------------
+@receiver(post_save, sender=Venue)
+def refresh_legacy_promos(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: las migra `sync_promos`
+    sync_legacy_promos(instance)
+
+
+# -------------------------
+# Agenda por venue (next_event_at / máscara de días)
+# -------------------------
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def refresh_schedule_for_venues(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: se reconcilia con `roll_venue_schedules`
+    refresh_venue_schedules({instance.venue_id, getattr(instance, "_previous_venue_id", None)})
+
+
+@receiver(post_save, sender=Commune)
+def sync_commune_stats(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    if created:
+        refresh_commune_stats([instance.pk])
+    else:
+        # El nombre desempata "Ciudades destacadas" (ver CommuneStats.name)
+        CommuneStats.objects.filter(commune=instance).exclude(name=instance.name).update(name=instance.name)
+
+
+@receiver(post_save, sender=Commune)
+@receiver(post_delete, sender=Commune)
+def invalidate_commune(sender, instance, **kwargs):
+    bump_on_commit(commune_ids=[instance.pk], catalogs=["communes"])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tags(sender, instance, **kwargs):
+    bump_on_commit(catalogs=["tags"])  # refdata.tags se recarga en cada worker
+
+
+# -------------------------
+# Catálogos de venues: índice de "¿Quisiste decir...?" (fuzzy.py)
+# y conteos de "Ciudades destacadas"
+# -------------------------
+@receiver(post_save, sender=Venue)
+@receiver(post_delete, sender=Venue)
+def invalidate_venue_catalogs(sender, instance, **kwargs):
+    bump_on_commit(catalogs=["venue_names", "venues"])
+
+
+# -------------------------
+# Búsqueda full-text (search_vector)
+# -------------------------
+@receiver(post_save, sender=Venue)
+def refresh_venue_search_vector(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: se recalcula con `rebuild_search_vectors`
+    refresh_search_vectors(Venue.objects.filter(pk=instance.pk), instance.Commune.name)
+
+
+@receiver(post_save, sender=Commune)
+def refresh_commune_search_vectors(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    refresh_search_vectors(Venue.objects.filter(Commune=instance), instance.name)
+
+
+# -------------------------
+# Venue.is_listed (suscripción del dueño)
+# -------------------------
+@receiver(pre_save, sender=Venue)
+def set_venue_listed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: lo corrige `sweep_listings`
+    instance.is_listed = bool(instance.owner_user_id) and (
+        Subscription.objects
+        .filter(Subscription.active_Q(), user_id=instance.owner_user_id)
+        .exists()
+    )
+
+
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def refresh_owner_listing(sender, instance, raw=False, **kwargs):
+    # Cubre Subscription.save, OwnerProfile.save (update_or_create),
+    # el webhook de Mercado Pago y las acciones del admin.
+    if raw:
+        return
+    refresh_listing([instance.user_id])
+
+
+# -------------------------
+# Derivados responsivos de imágenes (WebP/AVIF, ver places/media.py)
+# -------------------------
+@receiver(pre_save, sender=Photo)
+@receiver(pre_save, sender=Venue)
+@receiver(pre_save, sender=Event)
+@receiver(pre_save, sender=Commune)
+def remember_new_images(sender, instance, raw=False, **kwargs):
+    # Archivo recién asignado (upload): el storage lo guarda en este save
+    instance._new_images = {
+        f for f in IMAGE_FIELDS[sender] if getattr(instance, f) and not getattr(instance, f)._committed
+    }
+
+
+@receiver(post_save, sender=Photo)
+@receiver(post_save, sender=Venue)
+@receiver(post_save, sender=Event)
+@receiver(post_save, sender=Commune)
+def build_image_variants(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return  # loaddata: los genera `build_media_variants`
+    new = getattr(instance, "_new_images", set())
+    previous = getattr(instance, "_previous_files", {})
+    names = []
+    for f in IMAGE_FIELDS[sender]:
+        name = getattr(instance, f).name
+        # Solo si el campo cambió: upload nuevo, alta, o nombre distinto al
+        # anterior (FieldFile.save() ya guardó antes del save del modelo)
+        if name and (created or f in new or (f in previous and previous[f] != name)):
+            names.append(name)
+    if names:
+        # Después del commit: el archivo ya está en el storage; el encode va en otro hilo
+        transaction.on_commit(lambda: ensure_variants_later(names))
+
+
+# -------------------------
+# Refcount de archivos por contenido (Blob, ver places/storage.py)
+# -------------------------
+@receiver(post_save, sender=Photo)
+@receiver(post_save, sender=Venue)
+@receiver(post_save, sender=Event)
+def release_replaced_files(sender, instance, raw=False, **kwargs):
+    if raw:
+        return  # loaddata: no pasa por el storage, no hay refcount que mover
+    resaved = getattr(instance, "_resaved_files", set())
+    for field, previous in getattr(instance, "_previous_files", {}).items():
+        if previous and (previous != getattr(instance, field).name or field in resaved):
+            release_blob(previous)
+
+
+@receiver(post_delete, sender=Photo)
+@receiver(post_delete, sender=Venue)
+@receiver(post_delete, sender=Event)
+def release_deleted_files(sender, instance, **kwargs):
+    for field in CONTENT_FIELDS[sender]:
+        release_blob(getattr(instance, field).name)
@@ -0,0 +1,78 @@
+# app/places/stats.py
+"""
+CommuneStats: contadores por comuna sin agregaciones en el request.
+
+- venues_count: venues listados (is_listed).
+- upcoming_events_count: eventos publicados que empiezan desde ahora.
+- tonight_events_count: eventos publicados entre ahora y las 06:00 locales.
+- name: copia de Commune.name, para ordenar el top por (-venues_count, name)
+  con un solo índice.
+
+Los signals de Venue/Event recalculan solo las comunas afectadas (un COUNT
+por comuna sobre índices). Los contadores de eventos caducan con la hora,
+así que `python manage.py refresh_commune_stats` los reconcilia por cron.
+"""
+from datetime import timedelta
+
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Commune, CommuneStats, Event, Venue
+
+# La "noche" termina a esta hora local del día siguiente
+NIGHT_ENDS_AT_HOUR = 6
+
+
+def tonight_end(now=None):
+    """Fin de "esta noche": las próximas 06:00 locales."""
+    local = timezone.localtime(now or timezone.now())
+    end = local.replace(hour=NIGHT_ENDS_AT_HOUR, minute=0, second=0, microsecond=0)
+    if local >= end:
+        end += timedelta(days=1)
+    return end
+
+
+def _counts_by_commune(qs, commune_ids):
+    if commune_ids is not None:
+        qs = qs.filter(Commune_id__in=commune_ids)
+    return dict(qs.values("Commune_id").annotate(n=Count("id")).values_list("Commune_id", "n"))
+
+
+def refresh_commune_stats(commune_ids=None, now=None) -> int:
+    """
+    Recalcula CommuneStats de `commune_ids` (o de todas si es None) con un
+    upsert en lote. Devuelve cuántas filas escribió.
+    """
+    now = now or timezone.now()
+    if commune_ids is not None:
+        commune_ids = {pk for pk in commune_ids if pk}
+        if not commune_ids:
+            return 0
+        names = dict(Commune.objects.filter(pk__in=commune_ids).values_list("pk", "name"))
+    else:
+        names = dict(Commune.objects.values_list("pk", "name"))
+
+    upcoming = Event.objects.filter(is_published=True, start_at__gte=now)
+    venues = _counts_by_commune(Venue.objects.filter(is_listed=True), commune_ids)
+    events = _counts_by_commune(upcoming, commune_ids)
+    tonight = _counts_by_commune(upcoming.filter(start_at__lt=tonight_end(now)), commune_ids)
+
+    rows = [
+        CommuneStats(
+            commune_id=pk,
+            name=name,
+            venues_count=venues.get(pk, 0),
+            upcoming_events_count=events.get(pk, 0),
+            tonight_events_count=tonight.get(pk, 0),
+            updated_at=now,
+        )
+        for pk, name in names.items()
+    ]
+    CommuneStats.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=["commune"],
+        update_fields=["name", "venues_count", "upcoming_events_count", "tonight_events_count", "updated_at"],
+    )
+    return len(rows)
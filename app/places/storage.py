@@ -0,0 +1,222 @@
+# app/places/storage.py
+"""
+Storage por contenido para imágenes subidas (fotos de galería, portadas,
+logos y flyers).
+
+- El nombre del archivo es el SHA-256 de sus bytes:
+  "cas/ab/cd/abcd…ef.jpg". Un mismo flyer subido diez veces se guarda una
+  sola vez; cada uso suma 1 al refcount de su fila Blob y los signals lo
+  restan al borrar o reemplazar la imagen. En 0 se borra el archivo.
+- El hash se calcula mientras el upload llega (handlers Hashing* en
+  FILE_UPLOAD_HANDLERS); si el contenido no trae `sha256` (subidas por
+  partes, comandos), se hashea por chunks antes de guardar.
+- Como la URL de un contenido nunca cambia, en R2 los objetos llevan
+  Cache-Control de un año con `immutable` (CONTENT_CACHE_CONTROL).
+
+Los campos usan `storage=content_storage` (alias "content" de STORAGES).
+
+En R2 las URLs públicas se arman sin boto (CdnUrlMixin): prefijo del CDN +
+nombre, memoizado en un LRU; solo los prefijos de MEDIA_PRIVATE_PREFIXES
+van por URL firmada.
+"""
+import hashlib
+import posixpath
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import File
+from django.core.files.storage import FileSystemStorage, storages
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+from django.db import transaction
+from django.db.models import F
+from django.utils.encoding import filepath_to_uri
+from storages.backends.s3boto3 import S3Boto3Storage
+from storages.utils import clean_name
+
+CONTENT_PREFIX = "cas"
+CONTENT_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+_HASH_BLOCK = 64 * 1024
+
+# URLs de media por proceso (nombre -> URL nunca cambia para un prefijo dado)
+URL_CACHE_SIZE = 8192
+
+
+def sniff_image(head: bytes):
+    """Extensión según los magic bytes, o None si no es una imagen soportada."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    if head[4:8] == b"ftyp" and head[8:12] in (b"avif", b"avis"):
+        return "avif"
+    return None
+
+
+def content_key(digest, ext):
+    """"cas/ab/cd/abcd….jpg": dos niveles de carpetas para no tener millones en una."""
+    return f"{CONTENT_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}.{ext}"
+
+
+def is_content_key(name):
+    return bool(name) and name.startswith(CONTENT_PREFIX + "/")
+
+
+def content_storage():
+    """Callable para `storage=` de los campos (así la migración no fija el backend)."""
+    return storages["content"]
+
+
+# -------------------------
+# Hash durante el upload
+# -------------------------
+class HashingUploadHandlerMixin:
+    """Deja el SHA-256 del archivo en `uploaded_file.sha256` al terminar de recibirlo."""
+
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        if getattr(self, "activated", True):
+            self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self._sha256.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(HashingUploadHandlerMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(HashingUploadHandlerMixin, TemporaryFileUploadHandler):
+    pass
+
+
+# -------------------------
+# Refcount (Blob)
+# -------------------------
+def acquire_blob(key, size):
+    """Suma una referencia a `key`. True si la fila es nueva (hay que subir el archivo)."""
+    from .models import Blob
+
+    blob, created = Blob.objects.get_or_create(key=key, defaults={"size": size, "refcount": 1})
+    if not created:
+        Blob.objects.filter(pk=blob.pk).update(refcount=F("refcount") + 1)
+    return created
+
+
+def release_blob(name):
+    """Resta una referencia; en 0 borra la fila y, tras el commit, el archivo y sus variantes."""
+    from .models import Blob
+
+    if not is_content_key(name):
+        return  # archivos anteriores al storage por contenido: no llevan refcount
+    with transaction.atomic():
+        if not Blob.objects.filter(key=name, refcount__gt=0).update(refcount=F("refcount") - 1):
+            return
+        deleted, _ = Blob.objects.filter(key=name, refcount=0).delete()
+    if deleted:
+        transaction.on_commit(lambda: _delete_unreferenced(name))
+
+
+def _delete_unreferenced(name):
+    from .media import delete_variants
+    from .models import Blob
+
+    if Blob.objects.filter(key=name).exists():
+        return  # alguien volvió a subir el mismo contenido entre medio
+    content_storage().delete(name)
+    delete_variants(name)
+
+
+# -------------------------
+# Backends
+# -------------------------
+class ContentAddressedMixin:
+    """save() ignora el nombre propuesto (upload_to) y guarda bajo content_key."""
+
+    def save(self, name, content, max_length=None):
+        if content is None:
+            raise ValueError("content no puede ser None")
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        content.seek(0)
+        head = content.read(16)
+        digest = getattr(content, "sha256", None)
+        if digest is None:
+            content.seek(0)
+            hasher = hashlib.sha256()
+            for chunk in content.chunks(_HASH_BLOCK):
+                hasher.update(chunk)
+            digest = hasher.hexdigest()
+        content.seek(0)
+
+        ext = sniff_image(head) or posixpath.splitext(name)[1].lstrip(".").lower() or "bin"
+        key = content_key(digest, ext)
+        # Fila nueva: puede que el archivo exista igual (commit revertido antes)
+        if acquire_blob(key, content.size) and not self.exists(key):
+            self._save(key, content)
+        return key
+
+
+class ContentAddressedFileSystemStorage(ContentAddressedMixin, FileSystemStorage):
+    pass
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _cdn_url(prefix, name):
+    return prefix + filepath_to_uri(clean_name(name).lstrip("/"))
+
+
+class CdnUrlMixin:
+    """
+    url() de S3Boto3Storage sin pasar por boto ni safe_join: con
+    AWS_S3_CUSTOM_DOMAIN público la URL es prefijo + nombre. Los nombres
+    bajo MEDIA_PRIVATE_PREFIXES (o con parámetros) usan la URL firmada de
+    siempre.
+    """
+
+    def __init__(self, **settings_overrides):
+        super().__init__(**settings_overrides)
+        location = self.location.strip("/")
+        self._cdn_prefix = (
+            f"{self.url_protocol}//{self.custom_domain}/{location + '/' if location else ''}"
+            if self.custom_domain else None
+        )
+        self._private_prefixes = tuple(getattr(settings, "MEDIA_PRIVATE_PREFIXES", ()))
+
+    def _is_private(self, name):
+        return bool(self._private_prefixes) and clean_name(name).startswith(self._private_prefixes)
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        if self._cdn_prefix is None or parameters or http_method:
+            return super().url(name, parameters, expire, http_method)
+        if self._is_private(name):
+            params = {"Bucket": self.bucket.name, "Key": self._normalize_name(clean_name(name))}
+            return self.bucket.meta.client.generate_presigned_url(
+                "get_object", Params=params, ExpiresIn=expire or self.querystring_expire
+            )
+        return _cdn_url(self._cdn_prefix, name)
+
+
+class CdnS3Storage(CdnUrlMixin, S3Boto3Storage):
+    """Storage "default" en R2."""
+
+
+class ContentAddressedS3Storage(CdnUrlMixin, ContentAddressedMixin, S3Boto3Storage):
+    """R2: mismo esquema de nombres y Cache-Control inmutable en cada objeto."""
+
+    def get_object_parameters(self, name):
+        params = super().get_object_parameters(name)
+        params.setdefault("CacheControl", CONTENT_CACHE_CONTROL)
+        return params
@@ -0,0 +1,43 @@
+# app/places/templatetags/media_tags.py
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html, format_html_join
+
+from app.places.media import variants_for
+
+register = template.Library()
+
+_MIME = {"avif": "image/avif", "webp": "image/webp"}
+
+
+@register.simple_tag
+def responsive_image(field, alt="", sizes="100vw", **attrs):
+    """
+    <picture> con srcset AVIF/WebP de las variantes del archivo y el
+    original como <img> de respaldo. Sin variantes emite solo el <img>.
+
+        {% load media_tags %}
+        {% responsive_image v.cover_image alt=v.name sizes="(min-width: 992px) 33vw, 100vw" %}
+    """
+    if not field:
+        return ""
+    variants = variants_for(field.name)
+
+    img_attrs = {"src": field.url, "alt": alt, "loading": "lazy", **attrs}
+    widest = max((v for rows in variants.values() for v in rows), default=None)
+    if widest:
+        img_attrs.setdefault("width", widest[0])
+        img_attrs.setdefault("height", widest[1])
+    img = format_html("<img{}>", flatatt(img_attrs))
+    if not variants:
+        return img
+
+    sources = format_html_join(
+        "",
+        '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (_MIME[fmt], ", ".join(f"{url} {width}w" for width, _h, url in variants[fmt]), sizes)
+            for fmt in ("avif", "webp") if fmt in variants
+        ),
+    )
+    return format_html("<picture>{}{}</picture>", sources, img)
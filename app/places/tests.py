@@ -1,3 +1,184 @@
-from django.test import TestCase
+import io
+import os
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest import mock
 
-# Create your tests here.
+from django.core.files.base import ContentFile
+from django.core.files.storage import storages
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .gc import find_orphans, list_storage
+from .media import CONTENT_FIELDS
+from .models import Blob, Commune, MediaVariant, Photo, Venue
+from .storage import is_content_key
+
+FS_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "content": {"BACKEND": "app.places.storage.ContentAddressedFileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+
+
+def png_bytes(color):
+    buf = io.BytesIO()
+    Image.new("RGB", (4, 4), color).save(buf, "PNG")
+    return buf.getvalue()
+
+
+# -------------------------
+# Media en una carpeta temporal (FileSystemStorage, nunca R2)
+# -------------------------
+class TempMediaMixin:
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root, STORAGES=FS_STORAGES, MEDIA_VARIANTS_IN_BACKGROUND=False,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        # Los campos resuelven `storage=content_storage` al importar: se apuntan al temporal
+        self.content = storages["content"]
+        for model, fields in CONTENT_FIELDS.items():
+            for name in fields:
+                patcher = mock.patch.object(model._meta.get_field(name), "storage", self.content)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+
+    def write(self, name, data=b"x", age=None):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(data)
+        if age is not None:
+            ts = (datetime.now(dt_timezone.utc) - age).timestamp()
+            os.utime(path, (ts, ts))
+        return name
+
+    def make_venue(self):
+        commune = Commune.objects.create(name="Santiago", slug="santiago")
+        return Venue.objects.create(Commune=commune, name="Club", slug="club", category="pub")
+
+
+# -------------------------
+# gc_media: merge del listado con las referencias
+# -------------------------
+class FindOrphansTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        old = timedelta(days=30)
+        for name in ("a-b.jpg", "a/x.jpg", "Zona/a.jpg", "zeta.jpg", "ñandú.jpg", "ñu/viejo.jpg"):
+            self.write(name, age=old)
+        self.write("nuevo.jpg")  # dentro del período de gracia
+
+        # Referencias desde columnas distintas (heapq.merge) y con mayúsculas/no ASCII
+        Commune.objects.create(name="Valparaíso", slug="valparaiso", image="a-b.jpg")
+        for width, name in enumerate(("ñandú.jpg", "Zona/a.jpg"), start=1):
+            MediaVariant.objects.create(source="x.jpg", name=name, format="webp", width=width, height=1)
+        self.cutoff = datetime.now(dt_timezone.utc) - timedelta(days=1)
+
+    def test_listing_is_in_byte_order(self):
+        names = [name for name, _, _ in list_storage(storages["default"])]
+        self.assertEqual(names, sorted(names))
+        # "a-b" antes que "a/x" ("-" < "/"), como en S3
+        self.assertLess(names.index("a-b.jpg"), names.index("a/x.jpg"))
+
+    def test_orphans(self):
+        orphans = [name for name, _ in find_orphans(storages["default"], self.cutoff)]
+        self.assertEqual(orphans, ["a/x.jpg", "zeta.jpg", "ñu/viejo.jpg"])
+
+    def test_prefix(self):
+        orphans = [name for name, _ in find_orphans(storages["default"], self.cutoff, prefix="ñu/")]
+        self.assertEqual(orphans, ["ñu/viejo.jpg"])
+
+
+# -------------------------
+# Refcount de Blob al reemplazar y borrar
+# -------------------------
+class BlobRefcountTests(TempMediaMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.venue = self.make_venue()
+
+    def photo(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Photo.objects.create(venue=self.venue, image=ContentFile(data, name="foto.png"))
+
+    def test_same_content_shares_one_file(self):
+        first = self.photo(png_bytes("red"))
+        second = self.photo(png_bytes("red"))
+        self.assertTrue(is_content_key(first.image.name))
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertEqual(Blob.objects.get(key=first.image.name).refcount, 2)
+
+    def test_replace_and_delete(self):
+        first = self.photo(png_bytes("red"))
+        second = self.photo(png_bytes("red"))
+        red = first.image.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.image = ContentFile(png_bytes("blue"), name="otra.png")
+            second.save()
+        blue = second.image.name
+        self.assertEqual(Blob.objects.get(key=red).refcount, 1)
+        self.assertEqual(Blob.objects.get(key=blue).refcount, 1)
+
+        # Volver a guardar el mismo contenido no suma referencias
+        with self.captureOnCommitCallbacks(execute=True):
+            second.image = ContentFile(png_bytes("blue"), name="otra.png")
+            second.save()
+        self.assertEqual(Blob.objects.get(key=blue).refcount, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertFalse(Blob.objects.filter(key=red).exists())
+        self.assertFalse(self.content.exists(red))
+        self.assertTrue(self.content.exists(blue))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(Blob.objects.exists())
+        self.assertFalse(self.content.exists(blue))
+
+
+# -------------------------
+# dedupe_media: archivos anteriores a cas/ pasan a su clave por contenido
+# -------------------------
+class DedupeMediaTests(TempMediaMixin, TestCase):
+    def test_rehome(self):
+        venue = self.make_venue()
+        data = png_bytes("green")
+        self.write("venues/gallery/2024/01/a.png", data)
+        self.write("venues/gallery/2024/05/b.png", data)
+        self.write("variants/a-320.webp")
+        # update(): filas "viejas" sin pasar por el storage ni los signals
+        first, second = (Photo.objects.create(venue=venue, image="tmp") for _ in range(2))
+        Photo.objects.filter(pk=first.pk).update(image="venues/gallery/2024/01/a.png")
+        Photo.objects.filter(pk=second.pk).update(image="venues/gallery/2024/05/b.png")
+        MediaVariant.objects.create(
+            source="venues/gallery/2024/01/a.png", name="variants/a-320.webp",
+            format="webp", width=320, height=320,
+        )
+
+        out = io.StringIO()
+        call_command("dedupe_media", stdout=out)
+
+        first.refresh_from_db()
+        second.refresh_from_db()
+        key = first.image.name
+        self.assertTrue(is_content_key(key))
+        self.assertEqual(second.image.name, key)
+        self.assertEqual(Blob.objects.get(key=key).refcount, 2)
+        self.assertTrue(self.content.exists(key))
+        self.assertFalse(self.content.exists("venues/gallery/2024/01/a.png"))
+        self.assertFalse(self.content.exists("venues/gallery/2024/05/b.png"))
+        # La variante se reasigna sin regenerarla
+        self.assertEqual(MediaVariant.objects.get().source, key)
+        self.assertTrue(self.content.exists("variants/a-320.webp"))
+        self.assertIn("Archivos movidos: 2, originales borrados: 2, faltantes: 0", out.getvalue())
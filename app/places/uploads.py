@@ -0,0 +1,153 @@
+# app/places/uploads.py
+"""
+Subida en lote de fotos de galería (VenueGalleryUploadView).
+
+1. Cada archivo se copia por chunks a un archivo temporal, validando tipo
+   por los bytes de cabecera (no por el content-type del navegador) y el
+   tamaño máximo mientras se copia.
+2. Los válidos se suben al storage por contenido en paralelo (pool de
+   hilos acotado); en R2/S3 boto3 usa multipart sobre
+   AWS_S3_TRANSFER_CONFIG. El mismo worker genera las variantes WebP/AVIF
+   desde el temporal, sin volver a bajar el original (salvo que ese
+   contenido ya estuviera subido y tenga variantes). El SHA-256 se calcula
+   al copiar: si el lote trae dos veces el mismo contenido, solo la
+   primera copia genera variantes (la otra solo suma su referencia).
+3. Recién con los archivos arriba se crean las filas Photo con un solo
+   bulk_create; la transacción dura lo que dura ese INSERT.
+
+Cada archivo termina en `saved` o en `errors` con su motivo.
+"""
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from django.core.files import File
+from django.db import connection, transaction
+from django.db.models import Max
+
+from .media import write_variants
+from .models import MediaVariant, Photo
+from .storage import content_storage, release_blob, sniff_image
+
+MAX_IMAGE_BYTES = 15 * 1024 * 1024
+UPLOAD_WORKERS = 4
+
+
+@dataclass
+class SpooledImage:
+    original_name: str
+    path: str
+    ext: str
+    size: int
+    sha256: str
+
+
+@dataclass
+class UploadResult:
+    saved: list = field(default_factory=list)    # Photo creadas
+    errors: list = field(default_factory=list)   # (nombre de archivo, motivo)
+
+
+def spool(upload, max_bytes=MAX_IMAGE_BYTES):
+    """Copia el UploadedFile a un temporal validando cabecera y tamaño. ValueError si no sirve."""
+    fd, path = tempfile.mkstemp(prefix="gallery-")
+    size, ext = 0, None
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for chunk in upload.chunks():
+                if ext is None:
+                    ext = sniff_image(chunk[:16])
+                    if ext is None:
+                        raise ValueError("no es una imagen JPG, PNG, GIF, WebP o AVIF")
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ValueError(f"supera {max_bytes // (1024 * 1024)} MB")
+                digest.update(chunk)
+                out.write(chunk)
+        if ext is None:
+            raise ValueError("archivo vacío")
+    except Exception:
+        os.unlink(path)
+        raise
+    return SpooledImage(upload.name, path, ext, size, digest.hexdigest())
+
+
+def _store(spooled, storage, with_variants=True):
+    """Sube el original y (si `with_variants`) sus variantes. Corre en el pool de hilos."""
+    base = os.path.splitext(os.path.basename(spooled.original_name))[0] or "foto"
+    try:
+        with open(spooled.path, "rb") as fh:
+            content = File(fh, name=f"{base}.{spooled.ext}")
+            content.sha256 = spooled.sha256  # storage.save no vuelve a hashear
+            name = storage.save(content.name, content)
+            if not with_variants or MediaVariant.objects.filter(source=name).exists():
+                return name, []  # copia repetida en el lote o contenido que ya tiene variantes
+            fh.seek(0)
+            data = fh.read()
+        try:
+            variants = write_variants(name, data=data)
+        except Exception:
+            variants = []  # el original ya está; build_media_variants lo reintenta
+        return name, variants
+    finally:
+        connection.close()  # conexión propia de este hilo (refcount en Blob)
+
+
+def save_gallery_uploads(venue, uploads, caption="", storage=None, workers=UPLOAD_WORKERS):
+    """Guarda `uploads` como fotos de la galería de `venue`. Devuelve UploadResult."""
+    storage = storage or content_storage()
+    result = UploadResult()
+
+    spooled = []
+    for upload in uploads:
+        try:
+            spooled.append(spool(upload))
+        except ValueError as e:
+            result.errors.append((upload.name, str(e)))
+
+    stored = []
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            # Mismo contenido dos veces: las variantes (mismos nombres) las escribe solo la primera
+            seen = set()
+            futures = []
+            for s in spooled:
+                futures.append((s, pool.submit(_store, s, storage, s.sha256 not in seen)))
+                seen.add(s.sha256)
+            for s, future in futures:
+                try:
+                    stored.append(future.result())
+                except Exception as e:
+                    result.errors.append((s.original_name, f"no se pudo guardar ({e})"))
+    finally:
+        for s in spooled:
+            os.unlink(s.path)
+
+    if not stored:
+        return result
+
+    try:
+        with transaction.atomic():
+            last = Photo.objects.filter(venue=venue).aggregate(m=Max("sort_order"))["m"]
+            next_order = 0 if last is None else last + 1
+            result.saved = Photo.objects.bulk_create([
+                Photo(venue=venue, image=name, caption=caption, sort_order=next_order + i)
+                for i, (name, _variants) in enumerate(stored)
+            ])
+            MediaVariant.objects.bulk_create(
+                [
+                    MediaVariant(source=name, width=w, height=h, format=fmt, name=variant)
+                    for name, variants in stored
+                    for w, h, fmt, variant in variants
+                ],
+                ignore_conflicts=True,  # otra subida del mismo contenido en paralelo
+            )
+    except Exception:
+        # Sin filas no hay referencia a los archivos: se devuelven sus refcounts
+        for name, _variants in stored:
+            release_blob(name)
+        raise
+    return result
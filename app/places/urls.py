@@ -1,6 +1,8 @@
 from django.urls import path
 from .views import HomeView, VenueDetailView, VenueUpdateView, MyVenuesListView, EventCreateView, EventUpdateView, VenueGalleryUploadView, CityVenueListView
-from .views import CityVenueListView, CityVenueListJsonView, FeaturedCitiesView, VenueSearchView, EventListView, CityListView, track_click
+from .views import CityVenueListView, CityVenueListJsonView, FeaturedCitiesView, VenueSearchView, EventListView, CityListView, track_click, cache_stats, communes_autocomplete, commune_catalog_json
+from .views import VenueInsightsView, CityVenueFeedView, EventFeedView, EventCalendarView, venues_geojson, nearby
+from .views import UploadSessionCreateView, UploadSessionView, UploadSessionFinalizeView
 from .views import SubscribeView, SubscribeConfirmView, AccountDeleteView, AccountDeletedView,VenueCreateView
 
 
@@ -8,20 +10,32 @@ urlpatterns = [
     path("", HomeView.as_view(), name="home"),
     path("buscar/", VenueSearchView.as_view(), name="venue_search"),
     path("owner/mis-negocios/", MyVenuesListView.as_view(), name="list_venues-owner"),
+    path("owner/mis-negocios/<slug:slug>/insights/", VenueInsightsView.as_view(), name="venue_insights"),
     path("lugar/<slug:slug>/", VenueDetailView.as_view(), name="venue-detail"),
     path("lugar/<slug:slug>/editar/", VenueUpdateView.as_view(), name="venue-update"),
     path("lugar/<slug:slug>/events/new/", EventCreateView.as_view(), name="event_create"),
     path("lugar/<slug:slug>/events/<int:pk>/editar/", EventUpdateView.as_view(), name="event_edit"),
     path("lugar/<slug:slug>/galeria/subir/", VenueGalleryUploadView.as_view(), name="venue-gallery-upload"),
+    path("subidas/", UploadSessionCreateView.as_view(), name="upload_session_create"),
+    path("subidas/<uuid:pk>/", UploadSessionView.as_view(), name="upload_session"),
+    path("subidas/<uuid:pk>/finalizar/", UploadSessionFinalizeView.as_view(), name="upload_session_finalize"),
    # path("ciudad/", CityVenueListView.as_view(), name="city-detail"),
     path("ciudad/", CityListView.as_view(), name="city_index"),
     path("city/", CityVenueListView.as_view(), name="venue_index"),
     path("city/json/", CityVenueListJsonView.as_view(), name="city_index_json"),
     path("city/featured/", FeaturedCitiesView.as_view(), name="city_featured"),
+    path("city/feed/", CityVenueFeedView.as_view(), name="venue_feed"),
+    path("city/geo/", venues_geojson, name="venues_geojson"),
+    path("cerca/", nearby, name="nearby"),
     path("eventos/", EventListView.as_view(), name="events-detail"),
+    path("eventos/feed/", EventFeedView.as_view(), name="events_feed"),
+    path("eventos/calendario/", EventCalendarView.as_view(), name="events_calendar"),
     path("suscripcion/", SubscribeView.as_view(), name="subscribe"),
     path("suscripcion/confirmar/", SubscribeConfirmView.as_view(), name="subscribe_confirm"),
     path("track-click/", track_click, name="track_click"),
+    path("interno/cache/", cache_stats, name="cache_stats"),
+    path("comunas/autocompletar/", communes_autocomplete, name="communes_autocomplete"),
+    path("comunas/catalogo.<str:digest>.json", commune_catalog_json, name="commune_catalog"),
     path("cuenta/eliminar/", AccountDeleteView.as_view(), name="account_delete"),
     path("cuenta/eliminada/", AccountDeletedView.as_view(), name="account_deleted"),
     path("owner/sucursales/nueva/", VenueCreateView.as_view(), name="venue_create"),
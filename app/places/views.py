@@ -1,10 +1,9 @@
 # ===== Standard library =====
+import hashlib
 import json
-import re
-from functools import reduce
-from operator import and_
+import math
 from urllib.parse import urlparse
-from datetime import datetime, timedelta, time
+from datetime import timedelta
 
 # ===== Third-party =====
 import mercadopago
@@ -12,24 +11,26 @@ import mercadopago
 # ===== Django =====
 from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth import logout
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.core.cache import cache
 from django.core.exceptions import PermissionDenied
-from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models, transaction
 from django.db.models import (
-    Q, F, Count, Case, When, Value, IntegerField
+    Q, F, Count, Case, When, Value, IntegerField, Exists, OuterRef, Prefetch
 )
 from django.http import (
-    JsonResponse, Http404, HttpResponseBadRequest, HttpResponseNotAllowed, QueryDict
+    HttpResponse, JsonResponse, Http404, HttpResponseBadRequest, HttpResponseNotAllowed, QueryDict
 )
 from django.shortcuts import get_object_or_404, redirect
 from django.template.loader import render_to_string
 from django.urls import reverse, reverse_lazy
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.utils.text import slugify
 from django.views import View
+from django.views.decorators.cache import cache_control
 from django.views.decorators.http import require_POST
 from django.views.generic import (
     TemplateView, DetailView, UpdateView, ListView, DeleteView, CreateView
@@ -38,7 +39,25 @@ from django.views.generic.edit import FormMixin
 
 # ===== Local apps =====
 from app.account.models import Subscription, OwnerProfile
-from app.places.models import Venue, Event, Commune, Tag, Photo
+from app.places.models import Venue, Event, Commune, CommuneStats, Photo, Promo, UploadSession
+from app.places.caching import catalog_version, commune_version, get_or_build
+from app.places.catalog import CATALOG_MAX_AGE, autocomplete_communes, commune_catalog
+from app.places.clicks import record_click, venue_insights
+from app.places.dates import month_range, today_local, when_date_range
+from app.places.fuzzy import closest_commune, closest_venue_name
+from app.places.geo import CLUSTER_MAX_ZOOM, MAX_POINTS, clusters, in_bbox, parse_bbox
+from app.places.hours import minute_of_week, open_at
+from app.places.nearby import DEFAULT_RADIUS_KM, MAX_RADIUS_KM, nearby_page
+from app.places.pagination import InvalidCursor, capped_count, encode_cursor, keyset_page
+from app.places.promos import active_promos
+from app.places.refdata import all_communes, all_tags, find_commune
+from app.places.resumable import (
+    SessionGone, UploadError, create_session, discard_session, finalize_upload, pending_flyer,
+    write_chunk,
+)
+from app.places.schedule import venues_with_events_between
+from app.places.search import search_venues
+from app.places.uploads import save_gallery_uploads
 from app.places.forms import (
     VenueCreateForm, VenueForm, VenueUpdateForm, EventForm, VenueGalleryUploadForm
 )
@@ -50,6 +69,10 @@ from .models import Venue, Commune, Event # ajusta import según tu app
 class HomeView(TemplateView):
     template_name = "index.html"
 
+    # Segundos que el payload cacheado de una comuna se sirve sin reconstruir.
+    # Los cambios en Venue/Event/Commune lo invalidan antes vía signals.
+    HOME_PAYLOAD_FRESH_FOR = 60
+
     # =============================
     # --- Métodos auxiliares ---
     # =============================
@@ -57,20 +80,17 @@ class HomeView(TemplateView):
     def _commune_from_string(self, value: str):
         if not value:
             return None
-        value = value.strip()
-        return Commune.objects.filter(
-            Q(slug__iexact=value) | Q(name__iexact=value)
-        ).first()
+        # Exacta (slug/nombre, sin tildes) desde memoria; con typos
+        # ("nunoa", "vina del mr") usamos la comuna más parecida
+        return find_commune(value) or closest_commune(value)
 
     def _get_default_commune(self):
         """Ciudad por defecto: Santiago."""
-        c = Commune.objects.filter(slug__iexact="santiago").first()
-        if c:
-            return c
-        c = Commune.objects.filter(name__iexact="Santiago").first()
+        c = find_commune("santiago")
         if c:
             return c
-        return Commune.objects.order_by("name").first()
+        communes = all_communes()
+        return communes[0] if communes else None
 
     def _commune_from_user(self, request):
         """Detecta comuna según el perfil del usuario."""
@@ -128,17 +148,13 @@ class HomeView(TemplateView):
             return False
 
     # =============================
-    # --- Contexto principal ---
+    # --- Payload cacheado por comuna ---
     # =============================
-    def get_context_data(self, **kwargs):
-        ctx = super().get_context_data(**kwargs)
-        city = self._get_city(self.request)
-
-        # Ciudad activa (siempre hay una: por defecto Santiago)
-        ctx["city"] = city
-        ctx["active_city_label"] = city.name if city else "Chile"
-        ctx["active_city"] = city.slug if city else ""
-
+    def _build_home_payload(self, city):
+        """
+        Arma las secciones del home para una comuna. El resultado no depende
+        del request (se cachea por comuna).
+        """
         # ====================================================
         # 1️⃣ TRENDING — Eventos próximos (7 días)
         # ====================================================
@@ -189,9 +205,8 @@ class HomeView(TemplateView):
                     "img": img,
                     "tags": getattr(e, "tags_list", []),
                 })
-
-        # siempre defino la clave en el contexto, aunque esté vacía
-        ctx["trending_items"] = trending_items[:8]
+                if len(trending_items) == 8:
+                    break
 
         # ====================================================
         # 2️⃣ VENUES DESTACADOS
@@ -207,28 +222,20 @@ class HomeView(TemplateView):
             ordering.append("-is_featured")
         ordering.append("name")
 
-        ctx["featured_venues"] = featured_qs.order_by(*ordering)[:3]
+        featured_venues = list(featured_qs.order_by(*ordering)[:3])
 
         # ====================================================
         # 3️⃣ OFERTAS — Promos visibles (agrupadas por venue)
         # ====================================================
-        offers_items = []
-
-        venues_with_promos = (
+        # Una query con LIMIT 6 (EXISTS sobre promos vigentes) + prefetch de sus promos
+        offers_venues = (
             Venue.objects
             .select_related("Commune")
             .filter(Commune=city)
-            .only(
-                "slug",
-                "name",
-                "address",
-                "Commune",
-                "cover_image",
-                "gallery_venue",
-                "vgt_promos_1",
-                "vgt_promos_2",
-                "vgt_promos_3",
-            )
+            .filter(Exists(active_promos(Promo.objects.filter(venue=OuterRef("pk"), Commune=city))))
+            .prefetch_related(Prefetch("promos", queryset=active_promos(), to_attr="active_promos"))
+            .only("slug", "name", "address", "Commune", "cover_image", "gallery_venue")
+            .order_by("name")[:6]
         )
 
         def _venue_image(v):
@@ -238,76 +245,60 @@ class HomeView(TemplateView):
                 return v.gallery_venue.url
             return ""
 
-        for v in venues_with_promos:
-            promos = []
-            for promo_field in ["vgt_promos_1", "vgt_promos_2", "vgt_promos_3"]:
-                promo_text = getattr(v, promo_field, None)
-                if promo_text:
-                    promos.append(promo_text)
-
-            # si no tiene promos, lo saltamos
-            if not promos:
-                continue
-
-            offers_items.append({
+        offers_items = [
+            {
                 "href": reverse("venue-detail", kwargs={"slug": v.slug}),
                 "title": v.name,
                 "subtitle": v.Commune.name,
                 "img": _venue_image(v),
                 "address": v.address or "",
-                "promos": promos,   # 👈 lista con 1–3 promos
-                # si quieres luego: "dist": ..., "vigencia_iso": ...
-            })
-
-        ctx["offers_items"] = offers_items[:6]
-
-        # ====================================================
-        # 4️⃣ MINI MAPA — Solo comuna activa
-        # ====================================================
-        mini_qs = Venue.objects.select_related("Commune")
-        if city:
-            mini_qs = mini_qs.filter(Commune=city)
+                "promos": [p.text for p in v.active_promos],   # 👈 lista con las promos vigentes
+            }
+            for v in offers_venues
+        ]
+
+        return {
+            "trending_items": trending_items,
+            "featured_venues": featured_venues,
+            "offers_items": offers_items,
+        }
 
-        def _lat(v):
-            for f in ("lat", "latitude", "geo_lat"):
-                if hasattr(v, f) and getattr(v, f) not in (None, ""):
-                    return float(getattr(v, f))
-            return None
+    def _get_home_payload(self, city):
+        if not city:
+            return self._build_home_payload(city)
+        return get_or_build(
+            f"home:{city.pk}",
+            commune_version(city.pk),
+            lambda: self._build_home_payload(city),
+            fresh_for=self.HOME_PAYLOAD_FRESH_FOR,
+        )
 
-        def _lng(v):
-            for f in ("lon", "lng", "longitude", "geo_lng"):
-                if hasattr(v, f) and getattr(v, f) not in (None, ""):
-                    return float(getattr(v, f))
-            return None
+    # =============================
+    # --- Contexto principal ---
+    # =============================
+    def get_context_data(self, **kwargs):
+        ctx = super().get_context_data(**kwargs)
+        city = self._get_city(self.request)
 
-        mini_map_venues = []
-        for v in mini_qs.only("id", "slug", "name", "address", "Commune"):
-            mini_map_venues.append({
-                "id": v.id,
-                "name": v.name,
-                "slug": v.slug,
-                "address": v.address or "",
-                "commune": v.Commune.name if getattr(v, "Commune", None) else "",
-                "lat": _lat(v),
-                "lng": _lng(v),
-                "href": self.request.build_absolute_uri(
-                    reverse("venue-detail", kwargs={"slug": v.slug})
-                ),
-            })
+        # Ciudad activa (siempre hay una: por defecto Santiago)
+        ctx["city"] = city
+        ctx["active_city_label"] = city.name if city else "Chile"
+        ctx["active_city"] = city.slug if city else ""
 
-        ctx["mini_map_venues"] = mini_map_venues
+        payload = self._get_home_payload(city)
 
-        # ====================================================
-        # Debug
-        # ====================================================
-        user = self.request.user
-        print(f"[DEBUG] Usuario: {'anon' if not user.is_authenticated else user.username}")
-        print(f"[DEBUG] Ciudad activa: {city}")
-        print(f"[DEBUG] Eventos próximos: {len(trending_items)}")
-        print(f"[DEBUG] Venues destacados: {featured_qs.count()}")
-        print(f"[DEBUG] Ofertas (venues con promos): {len(offers_items)}")
-        print(f"[DEBUG] Venues para mini-mapa: {len(mini_map_venues)}")
+        # siempre defino las claves en el contexto, aunque estén vacías
+        ctx["trending_items"] = payload["trending_items"]
+        ctx["featured_venues"] = payload["featured_venues"]
 
+        # ?abierto_ahora=1: destacados abiertos en este momento (no va al payload cacheado)
+        ctx["abierto_ahora"] = bool(self.request.GET.get("abierto_ahora"))
+        if ctx["abierto_ahora"] and city:
+            ctx["featured_venues"] = list(
+                open_at(Venue.objects.select_related("Commune").filter(Commune=city))
+                .order_by("name")[:3]
+            )
+        ctx["offers_items"] = payload["offers_items"]
         return ctx
 
 
@@ -317,45 +308,33 @@ class VenueSearchView(ListView):
     model = Venue
     paginate_by = 24
 
-    # Campos en los que buscar
-    SEARCH_FIELDS = [
-        "name__icontains",
-        "description__icontains",
-        "address__icontains",
-        "Commune__name__icontains",
-    ]
-
-    def _build_term_q(self, term: str) -> Q:
-        """Crea una Q (OR) entre los campos para un término individual."""
-        q = Q()
-        for f in self.SEARCH_FIELDS:
-            q |= Q(**{f: term})
-        return q
-
     def get_queryset(self):
-        """Filtra los venues según el término de búsqueda."""
+        """Filtra los venues según el término de búsqueda (por relevancia si hay FTS)."""
         raw_q = (self.request.GET.get("q") or "").strip()
         qs = Venue.objects.select_related("Commune").all()  # 👈 quitamos el filtro is_published=True
+        if self.request.GET.get("abierto_ahora"):
+            qs = open_at(qs)
 
         if not raw_q:
             return qs.order_by("name")
 
-        # Divide la búsqueda en palabras separadas por espacios
-        terms = [t for t in re.split(r"\s+", raw_q) if t]
-
-        # Aplica un AND entre términos (cada palabra debe calzar en al menos un campo)
-        term_qs = [self._build_term_q(t) for t in terms]
-        if term_qs:
-            qs = qs.filter(reduce(and_, term_qs))
-
-        return qs.order_by("name")
+        return search_venues(qs, raw_q)
 
     def get_context_data(self, **kwargs):
         """Agrega el término buscado y el total de resultados al contexto."""
         ctx = super().get_context_data(**kwargs)
         q = (self.request.GET.get("q") or "").strip()
         ctx["q"] = q
-        ctx["total"] = self.get_queryset().count()
+        ctx["abierto_ahora"] = bool(self.request.GET.get("abierto_ahora"))
+        # El paginador ya contó el queryset: no repetimos la query
+        paginator = ctx.get("paginator")
+        ctx["total"] = paginator.count if paginator else len(ctx["object_list"])
+
+        # Sin resultados: sugerimos el nombre de venue más parecido
+        if q and not ctx["total"]:
+            suggestion = closest_venue_name(q)
+            if suggestion and suggestion.lower() != q.lower():
+                ctx["did_you_mean"] = suggestion
         return ctx
 
 class MyVenuesListView(ListView, LoginRequiredMixin):
@@ -372,6 +351,26 @@ class MyVenuesListView(ListView, LoginRequiredMixin):
             .order_by("-id", "name")              # <- aquí el fix
         )
 
+class VenueInsightsView(LoginRequiredMixin, View):
+    """
+    JSON con la serie de clicks de un venue del dueño (diaria y semanal) y su
+    comparación con el promedio de la comuna. Solo lee rollups.
+    """
+
+    def get(self, request, *args, **kwargs):
+        qs = Venue.objects.all()
+        u = request.user
+        if not (u.is_staff or u.is_superuser):
+            qs = qs.filter(owner_user=u)
+        venue = get_object_or_404(qs, slug=kwargs["slug"])
+
+        try:
+            days = min(max(int(request.GET.get("days", 30)), 7), 90)
+        except ValueError:
+            days = 30
+
+        return JsonResponse(venue_insights(venue, days=days))
+
 class VenueDetailView(FormMixin, DetailView):
     model = Venue
     slug_field = "slug"
@@ -426,12 +425,15 @@ class VenueDetailView(FormMixin, DetailView):
             .order_by("start_at")[:10]
         )
 
+        # Promos vigentes (Promo; incluye las legacy vgt_promos_1..3)
+        ctx["active_promos"] = list(active_promos(v.promos.all()))
+
         # Galería
         ctx["gallery"] = v.photos.all().order_by("sort_order", "pk")[:12]
         ctx["is_owner"] = self.is_owner()
 
         # Tags para chips
-        ctx["all_tags"] = Tag.objects.order_by("name")
+        ctx["all_tags"] = all_tags()
         if self.request.method == "POST":
             # Si hubo error de validación, conserva lo que el usuario marcó
             try:
@@ -502,7 +504,7 @@ class VenueUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
         ctx = super().get_context_data(**kwargs)
         v = self.object
 
-        ctx["all_tags"] = Tag.objects.order_by("name")
+        ctx["all_tags"] = all_tags()
 
         # Si venimos de POST con errores, conserva lo que el usuario marcó
         if self.request.method == "POST":
@@ -552,7 +554,22 @@ class EventCreateView(CreateView):
         v = self.get_venue()
         form.instance.venue = v
         form.instance.Commune = v.Commune
-        return super().form_valid(form)
+        response = super().form_valid(form)
+
+        # Flyer subido antes por partes (/subidas/), si el form no trajo archivo
+        upload_id = self.request.POST.get("flyer_upload")
+        if upload_id and not form.cleaned_data.get("flyer_image") and self.request.user.is_authenticated:
+            session = pending_flyer(self.request.user, v, upload_id)
+            try:
+                if session is None:
+                    raise UploadError("la subida del flyer expiró")
+                finalize_upload(session, event=self.object)
+            except UploadError as e:
+                messages.error(self.request, f"El evento se creó sin flyer: {e}.")
+            except OSError:
+                # .part borrado (expire_upload_sessions) o storage caído: el evento ya existe
+                messages.error(self.request, "El evento se creó sin flyer: no se pudo leer la subida.")
+        return response
 
 class EventUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     model = Event
@@ -595,29 +612,153 @@ class VenueGalleryUploadView(LoginRequiredMixin, UserPassesTestMixin, View):
             messages.error(request, "Debes seleccionar al menos una imagen.")
             return redirect(reverse("venue-detail", kwargs={"slug": venue.slug}))
 
-        # (Opcional) validaciones básicas por archivo
-        for f in files:
-            if not getattr(f, "content_type", "").startswith("image/"):
-                messages.error(request, f"El archivo «{f.name}» no es una imagen.")
-                return redirect(reverse("venue-detail", kwargs={"slug": venue.slug}))
-            # if f.size > 8 * 1024 * 1024:  # 8 MB
-            #     messages.error(request, f"El archivo «{f.name}» supera 8MB.")
-            #     return redirect(reverse("venue-detail", kwargs={"slug": venue.slug}))
-
-        # calcular sort_order incremental
-        last = Photo.objects.filter(venue=venue).order_by("-sort_order").first()
-        next_order = (last.sort_order + 1) if last else 0
-
-        created = 0
-        with transaction.atomic():
-            for i, f in enumerate(files):
-                p = Photo(venue=venue, caption=caption, sort_order=next_order + i)
-                # guardar el archivo físicamente en MEDIA_ROOT
-                p.image.save(f.name, f, save=True)
-                created += 1
-
-        messages.success(request, f"Se subieron {created} foto(s) a la galería.")
+        # Temporales + subida en paralelo + un bulk_create (ver places/uploads.py)
+        result = save_gallery_uploads(venue, files, caption=caption)
+
+        for name, reason in result.errors:
+            messages.error(request, f"«{name}»: {reason}.")
+        if result.saved:
+            messages.success(request, f"Se subieron {len(result.saved)} foto(s) a la galería.")
         return redirect(reverse("venue-detail", kwargs={"slug": venue.slug}))
+# -------------------------
+# Subidas reanudables por partes (ver places/resumable.py)
+# -------------------------
+def _upload_state(session):
+    return {
+        "id": str(session.pk),
+        "url": reverse("upload_session", kwargs={"pk": session.pk}),
+        "finalize_url": reverse("upload_session_finalize", kwargs={"pk": session.pk}),
+        "offset": session.offset,
+        "length": session.length,
+        "expires_at": session.expires_at.isoformat(),
+    }
+
+
+def _upload_error(error, session=None):
+    res = JsonResponse({"error": str(error)}, status=error.status)
+    if session is not None:
+        res["Upload-Offset"] = session.offset
+    return res
+
+
+class UploadSessionCreateView(LoginRequiredMixin, View):
+    """
+    Crea una subida reanudable:
+    POST venue=<slug>&target=gallery|flyer&filename=&length=<bytes>[&event=<id>&caption=]
+
+    Un flyer sin `event` se entrega mandando su id como `flyer_upload` al
+    formulario de EventCreateView. POST/PATCH/DELETE llevan el header
+    X-CSRFToken (cliente: static/js/resumable-upload.js; contrato en el README).
+    """
+
+    def post(self, request, *args, **kwargs):
+        venue = get_object_or_404(Venue, slug=request.POST.get("venue") or "")
+        u = request.user
+        if not (u.id == venue.owner_user_id or u.is_staff):
+            raise PermissionDenied
+
+        event = None
+        event_id = request.POST.get("event") or ""
+        if event_id:
+            if not event_id.isdigit():
+                return HttpResponseBadRequest("event inválido")
+            event = get_object_or_404(Event, pk=event_id, venue=venue)
+        length = request.POST.get("length") or ""
+
+        try:
+            session = create_session(
+                u, venue,
+                target=request.POST.get("target") or "",
+                filename=request.POST.get("filename") or "",
+                length=int(length) if length.isdigit() else 0,
+                event=event,
+                caption=(request.POST.get("caption") or "").strip(),
+            )
+        except UploadError as e:
+            return _upload_error(e)
+
+        res = JsonResponse(_upload_state(session), status=201)
+        res["Location"] = _upload_state(session)["url"]
+        return res
+
+
+class UploadSessionMixin(LoginRequiredMixin):
+    def get_session(self):
+        return get_object_or_404(
+            UploadSession,
+            pk=self.kwargs["pk"],
+            user=self.request.user,
+            expires_at__gte=timezone.now(),
+        )
+
+
+class UploadSessionView(UploadSessionMixin, View):
+    """
+    HEAD/GET: offset actual. PATCH: agrega una parte
+    (Content-Type: application/offset+octet-stream, Upload-Offset,
+    Upload-Checksum: sha256 <base64>). DELETE: descarta la subida.
+    """
+    http_method_names = ["get", "head", "patch", "delete"]
+
+    def head(self, request, *args, **kwargs):
+        session = self.get_session()
+        res = HttpResponse(status=204)
+        res["Upload-Offset"] = session.offset
+        res["Upload-Length"] = session.length
+        res["Cache-Control"] = "no-store"
+        return res
+
+    def get(self, request, *args, **kwargs):
+        res = JsonResponse(_upload_state(self.get_session()))
+        res["Cache-Control"] = "no-store"
+        return res
+
+    def patch(self, request, *args, **kwargs):
+        session = self.get_session()
+        if request.content_type != "application/offset+octet-stream":
+            return HttpResponse(status=415)
+        try:
+            offset = int(request.headers["Upload-Offset"])
+            size = int(request.META.get("CONTENT_LENGTH") or "")
+        except (KeyError, ValueError):
+            return HttpResponseBadRequest("Upload-Offset / Content-Length inválidos")
+
+        try:
+            # El body se lee por bloques desde el stream (nunca request.body)
+            new_offset = write_chunk(
+                session, offset, request, size, request.headers.get("Upload-Checksum")
+            )
+        except UploadError as e:
+            return _upload_error(e, session)
+
+        res = HttpResponse(status=204)
+        res["Upload-Offset"] = new_offset
+        return res
+
+    def delete(self, request, *args, **kwargs):
+        discard_session(self.get_session())
+        return HttpResponse(status=204)
+
+
+class UploadSessionFinalizeView(UploadSessionMixin, View):
+    """POST: entrega la subida completa a la galería del venue o al flyer del evento."""
+
+    def post(self, request, *args, **kwargs):
+        session = self.get_session()
+        try:
+            result = finalize_upload(session)
+        except UploadError as e:
+            return _upload_error(e, session)
+        except OSError:
+            return _upload_error(SessionGone("no se encontró el archivo de la subida"), session)
+
+        if isinstance(result, Photo):
+            data = {"photo": result.pk, "url": result.image.url}
+        else:
+            data = {"event": result.pk, "url": result.flyer_image.url}
+        return JsonResponse(data, status=201)
+
+
 # app/places/views.py  (imports relevantes arriba del archivo)
 
 
@@ -627,15 +768,13 @@ class CityVenueListView(ListView):
     paginate_by = 24
     model = Venue
 
-    # Próxima semana (lunes a domingo)
-    def _get_week_range_next_monday_to_sunday(self, tz):
-        now = timezone.now().astimezone(tz)
-        days_until_next_monday = (7 - now.weekday()) % 7 or 7
-        next_monday = (now + timedelta(days=days_until_next_monday)).replace(
-            hour=0, minute=0, second=0, microsecond=0
-        )
-        week_end = next_monday + timedelta(days=7)  # exclusivo
-        return next_monday, week_end
+    @staticmethod
+    def _next_cursor(page):
+        """Cursor para seguir con CityVenueFeedView después de esta página."""
+        if not page or not page.has_next():
+            return ""
+        last = page.object_list[len(page.object_list) - 1]
+        return encode_cursor([last.name, last.pk])
 
     def get_queryset(self):
         qs = Venue.objects.select_related("Commune", "owner_user")
@@ -653,10 +792,14 @@ class CityVenueListView(ListView):
             return Venue.objects.none()
 
         # 2) Ciudad por nombre o slug
-        slugguess = slugify(city_raw)
-        commune = Commune.objects.filter(
-            Q(name__iexact=city_raw) | Q(slug__iexact=slugguess)
-        ).first()
+        commune = find_commune(city_raw)
+
+        # 2b) Tolerancia a typos: usamos la comuna más parecida y lo avisamos
+        self.city_corrected_from = ""
+        if not commune:
+            commune = closest_commune(city_raw)
+            if commune:
+                self.city_corrected_from = city_raw
 
         if not commune:
             self.needs_city = True
@@ -672,16 +815,10 @@ class CityVenueListView(ListView):
         # 3) Base: venues por ciudad
         qs = qs.filter(Commune=commune)
 
-        # 4) SOLO dueños con suscripción efectivamente ACTIVA (MP o override)
-        #    Usamos la Q reutilizable del modelo para garantizar coherencia.
-        now = timezone.now()
-        active_owner_user_ids = list(
-            Subscription.objects
-            .filter(Subscription.active_Q(now))
-            .values_list("user_id", flat=True)
-        )
-        qs = qs.filter(owner_user_id__in=active_owner_user_ids)
-        self.active_owner_user_ids = active_owner_user_ids  # lo usamos en el contexto
+        # 4) SOLO dueños con suscripción efectivamente ACTIVA (MP o override).
+        #    is_listed se mantiene desde Subscription (places/listing.py) y
+        #    usa el índice parcial venue_listed_commune_idx.
+        qs = qs.filter(is_listed=True)
 
         # 5) Texto libre
         if q:
@@ -695,24 +832,17 @@ class CityVenueListView(ListView):
         if cat:
             qs = qs.filter(category=cat)
 
-        # 7) Fecha (hoy / esta semana) – filtra por eventos asociados
-        tz = timezone.get_current_timezone()
-        if when == "hoy":
-            today = timezone.localdate()
-            start = timezone.make_aware(datetime.combine(today, time.min), tz)
-            end   = timezone.make_aware(datetime.combine(today + timedelta(days=1), time.min), tz)
-            qs = qs.filter(
-                events__start_at__gte=start,
-                events__start_at__lt=end
-            ).distinct()
-        elif when == "esta_semana":
-            start, end = self._get_week_range_next_monday_to_sunday(tz)
-            qs = qs.filter(
-                events__start_at__gte=start,
-                events__start_at__lt=end
-            ).distinct()
+        # 7) Fecha (hoy / esta semana) – máscara de días precalculada por venue
+        #    (sin JOIN + DISTINCT contra events; ver places/schedule.py).
+        #    Aquí "esta_semana" es la próxima semana (lunes a domingo).
+        days = when_date_range({"hoy": "hoy", "esta_semana": "proxima_semana"}.get(when))
+        if days:
+            qs = venues_with_events_between(qs, *days)
+        elif when == "abierto_ahora":
+            qs = open_at(qs)  # OpeningInterval (ver places/hours.py)
 
-        return qs.order_by("name")
+        # (name, id): orden total, el mismo que usa el cursor de CityVenueFeedView
+        return qs.order_by("name", "id")
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
@@ -726,26 +856,23 @@ class CityVenueListView(ListView):
         ctx["active_cat"]  = (req.get("cat") or "").strip()
         ctx["active_when"] = (req.get("when") or "").strip()
         ctx["city_input_value"] = getattr(self, "city_input_value", "")
+        ctx["city_corrected_from"] = getattr(self, "city_corrected_from", "")
 
-        # Lista de comunas (para datalist/autocomplete)
-        cities_qs = Commune.objects.order_by("name")
-        ctx["city_names_json"] = json.dumps(
-            list(cities_qs.values_list("name", flat=True)),
-            ensure_ascii=False
-        )
-
+        # Lista de comunas: el template la carga desde commune_catalog_url
         ctx["needs_city"]   = getattr(self, "needs_city", False)
         ctx["error_city"]   = getattr(self, "error_city", "")
-        ctx["venues_count"] = ctx["object_list"].count() if not ctx["needs_city"] else 0
+        # El paginador ya contó el queryset: no repetimos el COUNT
+        paginator = ctx.get("paginator")
+        ctx["venues_count"] = paginator.count if paginator and not ctx["needs_city"] else 0
+        ctx["next_cursor"] = self._next_cursor(ctx.get("page_obj"))
 
         # Secciones destacadas (también respetan suscripción activa)
-        active_ids = getattr(self, "active_owner_user_ids", [])
         if city:
             ctx["featured_venues"] = (
                 Venue.objects
                 .filter(
                     Commune=city,
-                    owner_user_id__in=active_ids
+                    is_listed=True
                 )
                 .order_by("name")[:4]
             )
@@ -754,7 +881,7 @@ class CityVenueListView(ListView):
                 .filter(
                     Commune=city,
                     venue__isnull=False,
-                    venue__owner_user_id__in=active_ids
+                    venue__is_listed=True
                 )
                 .select_related("venue")
                 .order_by("start_at")[:8]
@@ -795,31 +922,19 @@ class CityListView(ListView):
 
     def get_queryset(self):
         """
-        Devuelve las comunas que tienen al menos un venue publicado,
-        junto con el conteo de lugares.
+        Devuelve las comunas que tienen al menos un venue listado,
+        junto con el conteo de lugares (desnormalizado en CommuneStats).
         """
         return (
             Commune.objects
-            .annotate(
-                venues_count=Count(
-                    "venues",
-                    filter=Q(),
-                    distinct=True,
-                )
-            )
-            .filter(venues_count__gt=0)
+            .filter(stats__venues_count__gt=0)
+            .annotate(venues_count=F("stats__venues_count"))
             .order_by("name")
         )
 
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
 
-        # ===============================
-        # 🔍 Autocomplete (lista de nombres)
-        # ===============================
-        all_cities = Commune.objects.order_by("name").values_list("name", flat=True)
-        ctx["city_names_json"] = json.dumps(list(all_cities), ensure_ascii=False)
-
         # ===============================
         # 🌆 Adaptar datos al template
         # ===============================
@@ -835,7 +950,7 @@ class CityListView(ListView):
                 "name": c.name,
                 "slug": c.slug,
                 "venues_count": getattr(c, "venues_count", 0),
-                "hero_url": c.image.url if c.image else "",
+                "image": c.image,
                 # 👉 Link directo al listado de venues filtrado por ciudad
                 "url": f"{venues_index_url}?city={c.slug}",
             })
@@ -859,68 +974,136 @@ class CityListView(ListView):
     
         
 class CityVenueListJsonView(CityVenueListView):
-    """Devuelve sólo fragmentos renderizados del mismo city_index.html."""
-
-    def render_to_response(self, context, **response_kwargs):
-        try:
-            full_html = render_to_string("city_index.html", context, request=self.request)
+    """
+    Devuelve sólo los fragmentos del filtro en vivo (destacados + grid),
+    renderizando los parciales en vez de la página completa.
+    Cacheado por (ciudad, cat, when, q, página) y versionado por comuna.
+    """
 
-            def extract_block(block_name):
-                pattern = rf"<!-- \[START {block_name}\] -->(.*?)<!-- \[END {block_name}\] -->"
-                match = re.search(pattern, full_html, re.S)
-                return match.group(1).strip() if match else ""
+    FRAGMENTS_FRESH_FOR = 60
 
-            featured_html = extract_block("featured_venues")
-            grid_html = extract_block("venues_grid")
+    def get(self, request, *args, **kwargs):
+        self.object_list = self.get_queryset()
+        city = getattr(self, "filter_city", None)
+        if city is None:
+            return JsonResponse({"featured": "", "grid": "", "count": 0})
+
+        params = {
+            "cat": (request.GET.get("cat") or "").strip(),
+            "when": (request.GET.get("when") or "cualquier_dia").strip(),
+            "q": (request.GET.get("q") or "").strip(),
+            "page": (request.GET.get("page") or "1").strip(),
+        }
+        if params["when"] == "abierto_ahora":
+            params["at"] = minute_of_week()  # cambia minuto a minuto
+        digest = hashlib.md5(json.dumps(params, sort_keys=True).encode()).hexdigest()
+        data = get_or_build(
+            f"cityjson:{city.pk}:{digest}",
+            commune_version(city.pk),
+            lambda: self._build_fragments(city),
+            fresh_for=self.FRAGMENTS_FRESH_FOR,
+        )
+        return JsonResponse(data)
 
-            return JsonResponse({
-                "featured": featured_html,
-                "grid": grid_html,
-                "count": context.get("venues_count", 0),
-            })
+    def _build_fragments(self, city):
+        paginator, page, venues, _ = self.paginate_queryset(
+            self.object_list.prefetch_related("vibe_tags"), self.paginate_by
+        )
+        featured_venues = (
+            Venue.objects
+            .filter(Commune=city, is_listed=True)
+            .select_related("Commune")
+            .order_by("name")[:4]
+        )
+        # Sin request: los parciales no dependen del usuario y se comparten en caché
+        return {
+            "featured": render_to_string("partials/featured_venues.html", {
+                "featured_venues": featured_venues,
+            }).strip(),
+            "grid": render_to_string("partials/venues_grid.html", {
+                "venues": venues,
+                "active_city_label": city.name,
+            }).strip(),
+            "count": paginator.count,
+            "next_cursor": self._next_cursor(page),
+        }
 
-        except Exception as e:
-            return JsonResponse({"error": str(e)}, status=500)
 
 class FeaturedCitiesView(View):
     """Devuelve HTML del bloque 'Ciudades destacadas' (4 con más venues publicados)."""
-    template_name = "city_index.html"
+    template_name = "partials/featured_cities.html"
 
-    def get(self, request, *args, **kwargs):
-        from django.db.models import Count, Q
-        from django.template.loader import render_to_string
-        import re
+    # Cambia solo con venues (conteos) o comunas (nombre/imagen): ver signals
+    FEATURED_FRESH_FOR = 10 * 60
 
-        communes = (
-            Commune.objects
-            .annotate(venues_count=Count("venues",  filter=Q(), distinct=True))
+    def _build_html(self):
+        # Top 4 por índice (communestats_venues_idx), sin agregaciones; empates por nombre
+        top_stats = (
+            CommuneStats.objects
             .filter(venues_count__gt=0)
+            .select_related("commune")
             .order_by("-venues_count", "name")[:4]
         )
 
         featured_cities = []
-        for c in communes:
-            # 👇 prioriza la imagen del modelo Commune
-            hero_url = c.image.url if getattr(c, "image", None) else ""
+        for stats in top_stats:
+            c = stats.commune
+            c.venues_count = stats.venues_count
             city_url = f"{reverse('city_index')}?city={c.slug}"
             featured_cities.append({
                 "name": c.name,
                 "slug": c.slug,
-                "hero_url": hero_url,
+                "image": c.image,  # la imagen del modelo Commune
                 "venues_count": c.venues_count,
                 "url": city_url,
             })
 
-        html = render_to_string(self.template_name, {
+        return render_to_string(self.template_name, {
             "featured_cities": featured_cities,
-        }, request=request)
-
-        m = re.search(r"<!-- \[START featured_cities\] -->(.*?)<!-- \[END featured_cities\] -->", html, re.S)
-        block_html = m.group(1).strip() if m else ""
+        }).strip()
 
+    def get(self, request, *args, **kwargs):
+        block_html = get_or_build(
+            "featured_cities",
+            (catalog_version("venues"), catalog_version("communes")),
+            self._build_html,
+            fresh_for=self.FEATURED_FRESH_FOR,
+        )
         return JsonResponse({"html": block_html})
 
 
+class CityVenueFeedView(CityVenueListView):
+    """
+    Scroll infinito de venues por ciudad: paginación por cursor (name, id).
+    ?city=...&cat=...&when=...&q=...&cursor=<opaco>
+    """
+    feed_limit = 24
+
+    def get(self, request, *args, **kwargs):
+        qs = self.get_queryset()
+        city = getattr(self, "filter_city", None)
+        cursor = request.GET.get("cursor") or None
+        try:
+            venues, next_cursor = keyset_page(
+                qs.prefetch_related("vibe_tags"), ("name", "id"), cursor, self.feed_limit
+            )
+        except InvalidCursor:
+            return HttpResponseBadRequest("cursor inválido")
+
+        data = {
+            "html": render_to_string("partials/venues_grid.html", {
+                "venues": venues,
+                "active_city_label": city.name if city else "",
+            }).strip() if venues or not cursor else "",
+            "items": [{"id": v.pk, "slug": v.slug, "name": v.name} for v in venues],
+            "next_cursor": next_cursor,
+        }
+        if not cursor and city:
+            # Total solo en la primera página, y con tope
+            data["total"], data["total_capped"] = capped_count(qs)
+        return JsonResponse(data)
+
+
 class EventListView(ListView):
     template_name = "events_index.html"       # tu template
     model = Event
@@ -938,44 +1121,33 @@ class EventListView(ListView):
         """Acepta nombre o slug; si no viene, fallback a Santiago."""
         raw = (raw or "").strip()
         if raw:
-            c = Commune.objects.filter(
-                Q(name__iexact=raw) | Q(slug__iexact=slugify(raw))
-            ).first()
+            c = find_commune(raw) or closest_commune(raw)
             if c:
                 return c
-        return Commune.objects.filter(
-            Q(slug__iexact="santiago") | Q(name__iexact="Santiago")
-        ).first()
-
-    def _when_bounds(self, when: str):
-        """Devuelve (start, end) aware para los filtros temporales."""
-        tz = timezone.get_current_timezone()
-        now = timezone.now().astimezone(tz)
-
-        def day_bounds(d):
-            start = timezone.make_aware(datetime.combine(d, time.min), tz)
-            end   = timezone.make_aware(datetime.combine(d + timedelta(days=1), time.min), tz)
-            return start, end
-
-        if when == "hoy":
-            return day_bounds(now.date())
-        if when == "manana":
-            return day_bounds(now.date() + timedelta(days=1))
-        if when == "esta_semana":
-            monday = now - timedelta(days=now.weekday())  # lunes de esta semana
-            start = timezone.make_aware(datetime.combine(monday.date(), time.min), tz)
-            end   = start + timedelta(days=7)
-            return start, end
-        if when == "finde":
-            friday = (now - timedelta(days=now.weekday())) + timedelta(days=4)  # viernes
-            start = timezone.make_aware(datetime.combine(friday.date(), time.min), tz)
-            end   = start + timedelta(days=3)  # hasta lunes 00:00
-            return start, end
-
-        # por defecto: próximos 60 días
-        start = now
-        end   = now + timedelta(days=60)
-        return start, end
+        return find_commune("santiago")
+
+    @staticmethod
+    def _decorate_event(e):
+        """CTA + flag promoted (atributos efímeros que usa la card)."""
+        ext = (getattr(e, "external_ticket_url", "") or "").strip()
+        if ext:
+            e.cta_url = ext
+            e.cta_is_external = True
+            e.cta_label = "Comprar entradas"
+        else:
+            if e.venue:
+                e.cta_url = reverse("venue-detail", kwargs={"slug": e.venue.slug})
+                e.cta_is_external = False
+                e.cta_label = "Ver venue"
+            else:
+                e.cta_url = reverse("home")
+                e.cta_is_external = False
+                e.cta_label = "Ver más"
+
+        # Flag usado por tu JS para “Publicitados”
+        # (tu modelo tiene is_featured; lo exponemos como is_promoted temporalmente)
+        e.is_promoted = bool(getattr(e, "is_featured", False))
+        return e
 
     # -------- queryset --------
     def get_queryset(self):
@@ -995,9 +1167,14 @@ class EventListView(ListView):
         if city:
             qs = qs.filter(Commune=city)
 
-        # rango temporal
-        start, end = self._when_bounds(when)
-        qs = qs.filter(start_at__gte=start, start_at__lt=end)
+        # rango temporal: por días locales (índice event_commune_day_idx);
+        # por defecto, próximos 60 días desde ahora
+        days = when_date_range(when)
+        if days:
+            qs = qs.filter(start_date_local__gte=days[0], start_date_local__lt=days[1])
+        else:
+            now = timezone.now()
+            qs = qs.filter(start_at__gte=now, start_at__lt=now + timedelta(days=60))
 
         # categoría
         if cat:
@@ -1030,25 +1207,7 @@ class EventListView(ListView):
 
         # CTA + flag promoted (efímeros) para los objetos de la página actual
         for e in ctx["page_obj"].object_list:
-            # CTA
-            ext = (getattr(e, "external_ticket_url", "") or "").strip()
-            if ext:
-                e.cta_url = ext
-                e.cta_is_external = True
-                e.cta_label = "Comprar entradas"
-            else:
-                if e.venue:
-                    e.cta_url = reverse("venue-detail", kwargs={"slug": e.venue.slug})
-                    e.cta_is_external = False
-                    e.cta_label = "Ver venue"
-                else:
-                    e.cta_url = reverse("home")
-                    e.cta_is_external = False
-                    e.cta_label = "Ver más"
-
-            # Flag usado por tu JS para “Publicitados”
-            # (tu modelo tiene is_featured; lo exponemos como is_promoted temporalmente)
-            e.is_promoted = bool(getattr(e, "is_featured", False))
+            self._decorate_event(e)
 
         # Filtros activos
         ctx["q"] = q
@@ -1063,14 +1222,6 @@ class EventListView(ListView):
         # Conteo total (de la consulta, no solo de la página)
         ctx["total"] = ctx.get("paginator").count if ctx.get("paginator") else 0
 
-        # JSON de comunas para autocompletar (name + slug)
-        # Usa un subconjunto si tienes muchas comunas para no inflar el HTML.
-        communes_qs = Commune.objects.only("name", "slug").order_by("name")
-        ctx["communes_json"] = json.dumps(
-            [{"name": c.name, "slug": c.slug} for c in communes_qs],
-            ensure_ascii=False
-        )
-
         # URLs de categorías (por si las mantienes)
         def build_url_for_cat(val: str | None):
             params = self.request.GET.copy()
@@ -1093,13 +1244,97 @@ class EventListView(ListView):
         }
 
         return ctx
+
+
+class EventFeedView(EventListView):
+    """
+    Scroll infinito de eventos: paginación por cursor (start_at, id), sin
+    OFFSET ni COUNT(*) por página. Mismos filtros que EventListView.
+    """
+    feed_limit = 24
+
+    def get(self, request, *args, **kwargs):
+        qs = self.get_queryset()
+        cursor = request.GET.get("cursor") or None
+        try:
+            events, next_cursor = keyset_page(qs, ("start_at", "id"), cursor, self.feed_limit)
+        except InvalidCursor:
+            return HttpResponseBadRequest("cursor inválido")
+
+        html = "".join(
+            render_to_string("partials/event_card.html", {"e": self._decorate_event(e)})
+            for e in events
+        )
+        data = {
+            "html": html.strip(),
+            "items": [
+                {"id": e.pk, "slug": e.slug, "title": e.title, "start_at": e.start_at.isoformat()}
+                for e in events
+            ],
+            "next_cursor": next_cursor,
+        }
+        if not cursor:
+            data["total"], data["total_capped"] = capped_count(qs)
+        return JsonResponse(data)
+
+
+class EventCalendarView(View):
+    """
+    Conteo de eventos publicados por día local de un mes, para una comuna.
+    ?city=<nombre|slug>&month=YYYY-MM (por defecto el mes actual)
+    Una sola query agrupada sobre event_commune_day_idx, cacheada por
+    (comuna, mes) y versionada por comuna.
+    """
+    CALENDAR_FRESH_FOR = 5 * 60
+
+    def get(self, request, *args, **kwargs):
+        city = find_commune(request.GET.get("city") or "") or find_commune("santiago")
+        if city is None:
+            raise Http404("Comuna no encontrada")
+
+        raw_month = (request.GET.get("month") or "").strip()
+        if not raw_month:
+            raw_month = f"{today_local():%Y-%m}"
+        try:
+            year, month = (int(x) for x in raw_month.split("-"))
+            first, nxt = month_range(year, month)
+        except ValueError:
+            return HttpResponseBadRequest("month debe ser YYYY-MM")
+
+        def build():
+            rows = (
+                Event.objects
+                .filter(
+                    Commune=city,
+                    is_published=True,
+                    start_date_local__gte=first,
+                    start_date_local__lt=nxt,
+                )
+                .values("start_date_local")
+                .annotate(n=Count("id"))
+                .order_by("start_date_local")
+            )
+            return {r["start_date_local"].isoformat(): r["n"] for r in rows}
+
+        days = get_or_build(
+            f"calendar:{city.pk}:{first:%Y-%m}",
+            commune_version(city.pk),
+            build,
+            fresh_for=self.CALENDAR_FRESH_FOR,
+        )
+        return JsonResponse({
+            "city": city.slug,
+            "month": f"{first:%Y-%m}",
+            "days": days,
+            "total": sum(days.values()),
+        })
     
     
 
 def track_click(request):
     model = request.POST.get("model")   # "venue" | "event"
     pk    = request.POST.get("id")      # id numérico
-    if model not in {"venue", "event"} or not pk:
+    if model not in {"venue", "event"} or not pk or not pk.isdigit():
         raise Http404("Parámetros inválidos")
 
     # Asegura session_key para anónimos
@@ -1118,16 +1353,130 @@ def track_click(request):
     if cache.get(key):
         return JsonResponse({"ok": True, "deduped": True})
 
-    obj = get_object_or_404(Venue if model == "venue" else Event, pk=pk)
-    type(obj).objects.filter(pk=obj.pk).update(
-        clicks_count=F("clicks_count") + 1,
-        last_clicked_at=timezone.now()
-    )
+    # Write-behind: el click queda en el buffer y `flush_clicks` lo aplica a
+    # clicks_count en lote (evita el lock sobre la fila del venue en cada click).
+    # Ids que no existen se descartan en el flush.
+    record_click(model, int(pk))
 
     cache.set(key, 1, timeout=30*60)
     return JsonResponse({"ok": True})
 
 
+@cache_control(public=True, max_age=5 * 60)
+def communes_autocomplete(request):
+    """Sugerencias de comunas por prefijo (sin tildes): ?q=vin&limit=10."""
+    limit = request.GET.get("limit") or "10"
+    limit = min(int(limit), 50) if limit.isdigit() else 10
+    return JsonResponse({"results": autocomplete_communes(request.GET.get("q"), limit=limit)})
+
+
+def commune_catalog_json(request, digest):
+    """
+    Catálogo de comunas (id, name, slug) para los autocompletados. Con el
+    hash vigente en la URL se cachea un año; un hash viejo (página en caché)
+    recibe el catálogo actual con caché corta.
+    """
+    current, payload = commune_catalog()
+    response = HttpResponse(payload, content_type="application/json; charset=utf-8")
+    if digest == current:
+        patch_cache_control(response, public=True, max_age=CATALOG_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, max_age=60)
+    return response
+
+
+@cache_control(public=True, max_age=60)
+def venues_geojson(request):
+    """
+    GeoJSON de venues listados dentro de ?bbox=oeste,sur,este,norte
+    (&zoom=&city=&cat=). Bajo CLUSTER_MAX_ZOOM devuelve una feature por
+    celda de geohash con su conteo (properties.cluster = true).
+    """
+    bbox = parse_bbox(request.GET.get("bbox"))
+    if bbox is None:
+        return HttpResponseBadRequest("bbox inválido")
+    zoom = request.GET.get("zoom") or ""
+    zoom = min(int(zoom), 20) if zoom.isdigit() else CLUSTER_MAX_ZOOM
+
+    qs = Venue.objects.filter(is_listed=True, latitude__isnull=False, longitude__isnull=False)
+    city = find_commune(request.GET.get("city") or "")
+    if city:
+        qs = qs.filter(Commune=city)
+    cat = (request.GET.get("cat") or "").strip()
+    if cat:
+        qs = qs.filter(category=cat)
+    qs = in_bbox(qs, bbox)
+
+    def _point(lon, lat, properties):
+        return {
+            "type": "Feature",
+            "geometry": {"type": "Point", "coordinates": [float(lon), float(lat)]},
+            "properties": properties,
+        }
+
+    if zoom < CLUSTER_MAX_ZOOM:
+        features = [
+            _point(c["lon"], c["lat"], {
+                "cluster": True,
+                "count": c["count"],
+                "cell": c["cell"],
+                "href": reverse("venue-detail", kwargs={"slug": c["slug"]}) if c["slug"] else "",
+            })
+            for c in clusters(qs, zoom)
+        ]
+        truncated = False
+    else:
+        rows = list(
+            qs.order_by("name", "id")
+            .values("slug", "name", "address", "category", "latitude", "longitude")[:MAX_POINTS + 1]
+        )
+        truncated = len(rows) > MAX_POINTS
+        features = [
+            _point(v["longitude"], v["latitude"], {
+                "cluster": False,
+                "name": v["name"],
+                "address": v["address"],
+                "category": v["category"],
+                "href": reverse("venue-detail", kwargs={"slug": v["slug"]}),
+            })
+            for v in rows[:MAX_POINTS]
+        ]
+
+    return JsonResponse({"type": "FeatureCollection", "features": features, "truncated": truncated})
+
+
+def nearby(request):
+    """
+    Venues y próximos eventos cerca de una posición, por distancia:
+    ?lat=&lon=&radius=<km>&cursor=<opaco>
+    """
+    try:
+        lat = float(request.GET["lat"])
+        lon = float(request.GET["lon"])
+        radius = float(request.GET.get("radius") or DEFAULT_RADIUS_KM)
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest("lat/lon/radius inválidos")
+    # float() acepta "nan" e "inf", que pasan las comparaciones de abajo
+    if not all(math.isfinite(x) for x in (lat, lon, radius)):
+        return HttpResponseBadRequest("lat/lon/radius inválidos")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180) or radius <= 0:
+        return HttpResponseBadRequest("lat/lon/radius inválidos")
+    radius = min(radius, MAX_RADIUS_KM)
+
+    try:
+        items, next_cursor = nearby_page(lat, lon, radius, request.GET.get("cursor") or None)
+    except InvalidCursor:
+        return HttpResponseBadRequest("cursor inválido")
+    return JsonResponse({"items": items, "next_cursor": next_cursor, "radius_km": radius})
+
+
+@staff_member_required
+def cache_stats(request):
+    """Hits/misses/evictions por prefijo de clave del caché de este worker."""
+    stats = cache.stats() if hasattr(cache, "stats") else {}
+    return JsonResponse({"backend": type(cache).__name__, "stats": stats})
+
+
 PLAN_TITLE = "Midnight – Plan Mensual"
 PLAN_PRICE = 5990.0  # CLP
 
@@ -1253,8 +1602,6 @@ class VenueCreateView(LoginRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         ctx = super().get_context_data(**kwargs)
         ctx["title"] = "Agregar nueva sucursal"
-        # JSON ligero para el datalist: id, name, slug
-        communes = Commune.objects.order_by("name").values("id", "name", "slug")
-        ctx["communes_json"] = json.dumps(list(communes), cls=DjangoJSONEncoder, ensure_ascii=False)
+        # El datalist (id, name, slug) se carga desde commune_catalog_url
         return ctx
     
@@ -0,0 +1,184 @@
+# midnight/cache.py
+"""
+Backend de caché en dos niveles.
+
+- L1: LRU en memoria del proceso (muy rápido, pero cada worker tiene el suyo).
+- L2: backend compartido entre workers (tabla en la BD o archivos), definido
+  como otro alias en settings.CACHES.
+
+Las lecturas pasan primero por L1; las escrituras van a ambos niveles. Las
+operaciones que tienen que ser consistentes entre workers (add, incr/decr,
+delete) se resuelven siempre en L2. Como L1 no se entera de lo que escriben
+los otros workers, sus entradas viven a lo más LOCAL_TIMEOUT segundos.
+
+Lleva contadores de hits/misses/evictions por prefijo de clave (lo que va
+antes del primer ":", ej. "clickdedupe", "home"), consultables con stats().
+"""
+import pickle
+import threading
+import time
+from collections import Counter, OrderedDict, defaultdict
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+_MISSING = object()
+
+# Django crea una instancia del backend por hilo; el L1 y sus métricas se
+# comparten a nivel de proceso (igual que LocMemCache), indexados por LOCATION.
+_local_stores = {}
+_local_locks = {}
+_local_stats = {}
+
+
+class TwoLevelCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self._shared_alias = options.get("SHARED", "shared")
+        self._local_max_entries = int(options.get("LOCAL_MAX_ENTRIES", 1000))
+        self._local_timeout = float(options.get("LOCAL_TIMEOUT", 5))
+
+        # (key, version) -> (expira_en, valor_pickleado)
+        self._local = _local_stores.setdefault(location, OrderedDict())
+        self._lock = _local_locks.setdefault(location, threading.Lock())
+        self._stats = _local_stats.setdefault(location, defaultdict(Counter))
+
+    @cached_property
+    def shared(self):
+        return caches[self._shared_alias]
+
+    # =============================
+    # --- Métricas ---
+    # =============================
+    @staticmethod
+    def _prefix(key):
+        return str(key).split(":", 1)[0]
+
+    def _count(self, key, metric):
+        with self._lock:
+            self._stats[self._prefix(key)][metric] += 1
+
+    def stats(self):
+        """Contadores de este proceso agrupados por prefijo de clave."""
+        with self._lock:
+            out = {}
+            for prefix, c in self._stats.items():
+                hits = c["local_hits"] + c["shared_hits"]
+                lookups = hits + c["misses"]
+                out[prefix] = {
+                    "local_hits": c["local_hits"],
+                    "shared_hits": c["shared_hits"],
+                    "misses": c["misses"],
+                    "sets": c["sets"],
+                    "evictions": c["evictions"],
+                    "hit_ratio": round(hits / lookups, 4) if lookups else None,
+                }
+            out["_local"] = {"entries": len(self._local), "max_entries": self._local_max_entries}
+            return out
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats.clear()
+
+    # =============================
+    # --- L1 (LRU en memoria) ---
+    # =============================
+    def _local_get(self, key, version):
+        lk = (key, version)
+        with self._lock:
+            item = self._local.get(lk)
+            if item is None:
+                return _MISSING
+            expires, pickled = item
+            if expires <= time.monotonic():
+                del self._local[lk]
+                return _MISSING
+            self._local.move_to_end(lk)
+        return pickle.loads(pickled)
+
+    def _local_set(self, key, value, timeout, version):
+        ttl = self._local_timeout
+        if timeout is not None and timeout != DEFAULT_TIMEOUT:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._local_delete(key, version)
+            return
+        # Guardamos pickleado (igual que LocMemCache) para que nadie mute la copia cacheada
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        lk = (key, version)
+        evicted = []
+        with self._lock:
+            self._local[lk] = (time.monotonic() + ttl, pickled)
+            self._local.move_to_end(lk)
+            while len(self._local) > self._local_max_entries:
+                (old_key, _), _ = self._local.popitem(last=False)
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._count(old_key, "evictions")
+
+    def _local_delete(self, key, version):
+        with self._lock:
+            self._local.pop((key, version), None)
+
+    # =============================
+    # --- API de caché ---
+    # =============================
+    def get(self, key, default=None, version=None):
+        value = self._local_get(key, version)
+        if value is not _MISSING:
+            self._count(key, "local_hits")
+            return value
+
+        value = self.shared.get(key, _MISSING, version=version)
+        if value is _MISSING:
+            self._count(key, "misses")
+            return default
+
+        self._count(key, "shared_hits")
+        self._local_set(key, value, DEFAULT_TIMEOUT, version)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.shared.set(key, value, timeout=timeout, version=version)
+        self._local_set(key, value, timeout, version)
+        self._count(key, "sets")
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        added = self.shared.add(key, value, timeout=timeout, version=version)
+        if added:
+            self._local_set(key, value, timeout, version)
+            self._count(key, "sets")
+        else:
+            # El valor vigente es el de otro worker: no confiamos en L1
+            self._local_delete(key, version)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(key, timeout=timeout, version=version)
+
+    def delete(self, key, version=None):
+        self._local_delete(key, version)
+        return self.shared.delete(key, version=version)
+
+    def has_key(self, key, version=None):
+        if self._local_get(key, version) is not _MISSING:
+            return True
+        return self.shared.has_key(key, version=version)
+
+    def incr(self, key, delta=1, version=None):
+        self._local_delete(key, version)
+        return self.shared.incr(key, delta, version=version)
+
+    def decr(self, key, delta=1, version=None):
+        self._local_delete(key, version)
+        return self.shared.decr(key, delta, version=version)
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+        self.shared.clear()
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -58,6 +58,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
 
     # Apps locales
     "app.places",
@@ -95,6 +96,7 @@ TEMPLATES = [
                 "django.contrib.auth.context_processors.auth",
                 "django.contrib.messages.context_processors.messages",
                 "app.account.context_processors.account_flags",
+                "app.places.context_processors.commune_catalog",
             ],
         },
     },
@@ -117,6 +119,41 @@ DATABASES = {
     }
 }
 
+# =========================
+# Caché (L1 en memoria + L2 compartido entre workers)
+# =========================
+# CACHE_BACKEND=db   -> tabla en la BD (requiere `python manage.py createcachetable`)
+# CACHE_BACKEND=file -> archivos en CACHE_DIR (todos los workers en el mismo servidor)
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "db")
+
+if CACHE_BACKEND == "file":
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / "cache")),
+        "OPTIONS": {"MAX_ENTRIES": 100000, "CULL_FREQUENCY": 10},
+    }
+else:
+    SHARED_CACHE = {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "midnight_cache",
+        "OPTIONS": {"MAX_ENTRIES": 100000, "CULL_FREQUENCY": 10},
+    }
+
+CACHES = {
+    "default": {
+        "BACKEND": "midnight.cache.TwoLevelCache",
+        "LOCATION": "midnight-l1",
+        "OPTIONS": {
+            "SHARED": "shared",
+            # Entradas y segundos máximos que un worker guarda en su L1
+            "LOCAL_MAX_ENTRIES": int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "2000")),
+            "LOCAL_TIMEOUT": int(os.getenv("CACHE_LOCAL_TIMEOUT", "5")),
+        },
+    },
+    "shared": SHARED_CACHE,
+}
+
 # =========================
 # Validación de contraseñas
 # =========================
@@ -174,8 +211,13 @@ if USE_R2:
 
     # Django 5: STORAGES define los backends reales
     STORAGES = {
+        # URLs públicas armadas con el prefijo del CDN, sin boto (places/storage.py)
         "default": {
-            "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+            "BACKEND": "app.places.storage.CdnS3Storage",
+        },
+        # Fotos, portadas, logos y flyers por hash de contenido (mismo bucket)
+        "content": {
+            "BACKEND": "app.places.storage.ContentAddressedS3Storage",
         },
         "staticfiles": {
             "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
@@ -188,8 +230,23 @@ if USE_R2:
     AWS_S3_ENDPOINT_URL = os.getenv("R2_ENDPOINT_URL")
     AWS_S3_REGION_NAME = os.getenv("R2_REGION_NAME", "auto")
 
+    # Subidas grandes en multipart (partes de 8 MB, varias en paralelo)
+    from boto3.s3.transfer import TransferConfig
+
+    AWS_S3_TRANSFER_CONFIG = TransferConfig(
+        multipart_threshold=8 * 1024 * 1024,
+        multipart_chunksize=8 * 1024 * 1024,
+        max_concurrency=4,
+    )
+
     AWS_S3_CUSTOM_DOMAIN = "cdn.midnight.cl"
 
+    # Prefijos que no se sirven por el CDN público: URL firmada por request
+    # (ej: "menus/"). Vacío = todo público, como hasta ahora.
+    MEDIA_PRIVATE_PREFIXES = tuple(
+        p for p in os.getenv("MEDIA_PRIVATE_PREFIXES", "").split(",") if p.strip()
+    )
+
     MEDIA_URL = "https://cdn.midnight.cl/"
 
 else:
@@ -197,6 +254,9 @@ else:
         "default": {
             "BACKEND": "django.core.files.storage.FileSystemStorage",
         },
+        "content": {
+            "BACKEND": "app.places.storage.ContentAddressedFileSystemStorage",
+        },
         "staticfiles": {
             "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
         },
@@ -205,6 +265,12 @@ else:
     MEDIA_URL = "/media/"
     MEDIA_ROOT = BASE_DIR / "media"
 
+# Los uploads llegan con su SHA-256 calculado (storage por contenido)
+FILE_UPLOAD_HANDLERS = [
+    "app.places.storage.HashingMemoryFileUploadHandler",
+    "app.places.storage.HashingTemporaryFileUploadHandler",
+]
+
 
 
 
@@ -283,3 +349,26 @@ else:
 
     # Opcional: timeout para que no se quede colgado si SMTP anda mal
     EMAIL_TIMEOUT = int(os.getenv("EMAIL_TIMEOUT", "15"))
+
+# =========================
+# Geocodificación de direcciones (manage.py geocode_venues)
+# =========================
+# gazetteer -> offline: centro de la comuna (Commune.lat/lon + GEOCODER_GAZETTEER)
+# http      -> servicio compatible con Nominatim en GEOCODER_URL
+
+GEOCODER_PROVIDER = os.getenv("GEOCODER_PROVIDER", "gazetteer")
+GEOCODER_GAZETTEER = os.getenv(
+    "GEOCODER_GAZETTEER", str(BASE_DIR / "json" / "cities_top200_santiago_unificado.json")
+)
+GEOCODER_URL = os.getenv("GEOCODER_URL", "https://nominatim.openstreetmap.org/search")
+GEOCODER_USER_AGENT = os.getenv("GEOCODER_USER_AGENT", "midnight-web/1.0 (contacto@midnight.cl)")
+# Segundos mínimos entre requests al proveedor http (Nominatim pide 1 req/seg)
+GEOCODER_MIN_INTERVAL = float(os.getenv("GEOCODER_MIN_INTERVAL", "1.0"))
+
+# =========================
+# Subidas reanudables (places/resumable.py, manage.py expire_upload_sessions)
+# =========================
+# Disco local del servidor web: los .part se escriben aquí antes de ir al storage
+UPLOAD_SESSION_DIR = os.getenv("UPLOAD_SESSION_DIR", str(BASE_DIR / "tmp" / "uploads"))
+# Segundos sin recibir partes antes de que una sesión se considere abandonada
+UPLOAD_SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 60 * 60)))
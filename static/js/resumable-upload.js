@@ -0,0 +1,97 @@
+// static/js/resumable-upload.js
+// Cliente de las subidas reanudables por partes (/subidas/, ver places/resumable.py
+// y la sección "Subidas por partes" del README).
+//
+//   const session = await MidnightUpload.upload(file, {createUrl, csrf, venue, target});
+//   const result  = await MidnightUpload.finalize(session, csrf);   // galería
+//
+// Cada parte va con su checksum SHA-256; si una falla (red, 409, 423, 460, 5xx)
+// se pregunta el offset al servidor (HEAD) y se sigue desde ahí.
+(function () {
+  const CHUNK_BYTES = 4 * 1024 * 1024;   // bajo MAX_CHUNK_BYTES (8 MB) del servidor
+  const MAX_RETRIES = 4;
+  const RETRY_STATUSES = [409, 423, 460];
+
+  const supported = !!(window.fetch && window.crypto && window.crypto.subtle && window.Blob);
+
+  function base64(buffer) {
+    let bin = '';
+    new Uint8Array(buffer).forEach(b => { bin += String.fromCharCode(b); });
+    return btoa(bin);
+  }
+
+  async function checksum(blob) {
+    const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+    return 'sha256 ' + base64(digest);
+  }
+
+  async function errorFrom(res) {
+    let detail = '';
+    try { detail = (await res.json()).error || ''; } catch (e) { /* no es JSON */ }
+    const err = new Error(detail || ('HTTP ' + res.status));
+    err.status = res.status;
+    return err;
+  }
+
+  function send(url, method, csrf, extra) {
+    const headers = Object.assign({ 'X-CSRFToken': csrf }, (extra && extra.headers) || {});
+    return fetch(url, Object.assign({ method, credentials: 'same-origin', redirect: 'error' }, extra, { headers }));
+  }
+
+  const sleep = ms => new Promise(r => setTimeout(r, ms));
+
+  async function serverOffset(session, csrf) {
+    const res = await send(session.url, 'HEAD', csrf);
+    if (!res.ok) throw await errorFrom(res);
+    return Number(res.headers.get('Upload-Offset'));
+  }
+
+  async function upload(file, opts) {
+    const body = new URLSearchParams({
+      venue: opts.venue, target: opts.target, filename: file.name, length: String(file.size),
+    });
+    if (opts.event) body.set('event', opts.event);
+    if (opts.caption) body.set('caption', opts.caption);
+
+    const created = await send(opts.createUrl, 'POST', opts.csrf, { body });
+    if (!created.ok) throw await errorFrom(created);
+    const session = await created.json();
+
+    let offset = session.offset;
+    let failures = 0;
+    while (offset < file.size) {
+      const part = file.slice(offset, offset + CHUNK_BYTES);
+      let res = null;
+      try {
+        res = await send(session.url, 'PATCH', opts.csrf, {
+          headers: {
+            'Content-Type': 'application/offset+octet-stream',
+            'Upload-Offset': String(offset),
+            'Upload-Checksum': await checksum(part),
+          },
+          body: part,
+        });
+      } catch (e) { /* red caída: se reanuda desde el offset del servidor */ }
+
+      if (res && res.status === 204) {
+        offset = Number(res.headers.get('Upload-Offset'));
+        failures = 0;
+        if (opts.onProgress) opts.onProgress(offset / file.size);
+        continue;
+      }
+      if (res && res.status < 500 && !RETRY_STATUSES.includes(res.status)) throw await errorFrom(res);
+      if (++failures > MAX_RETRIES) throw new Error('la subida se interrumpió');
+      await sleep(1000 * failures);
+      offset = await serverOffset(session, opts.csrf);
+    }
+    return session;
+  }
+
+  async function finalize(session, csrf) {
+    const res = await send(session.finalize_url, 'POST', csrf);
+    if (!res.ok) throw await errorFrom(res);
+    return res.json();
+  }
+
+  window.MidnightUpload = { supported, upload, finalize };
+})();